@@ -37,11 +37,12 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.messages',
     'django.contrib.sessions',
-    'django.contrib.staticfiles',
+    'webapp.apps.StaticFilesConfig',
     'webapp.apps.WebappConfig'
 ]
 
 MIDDLEWARE = [
+    'webapp.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -55,7 +56,7 @@ ROOT_URLCONF = 'django_twitter.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'webapp.metrics.InstrumentedTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -92,6 +93,40 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'template_fragments',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    # Shared by all worker processes so a user forgotten in one is reloaded in
+    # every other. Entries are pickled, so the directory must only be writable
+    # by the app: it is created with mode 0700 and should not live in /tmp.
+    'auth': {
+        'BACKEND': 'webapp.caches.SharedFileBasedCache',
+        'LOCATION': os.environ.get(
+            'DJANGO_TWITTER_AUTH_CACHE', os.path.join(BASE_DIR, 'var', 'cache', 'auth')
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    },
+}
+
+# Tests clear the auth cache, which must not wipe a developer's sessions.
+if 'test' in sys.argv:
+    CACHES['auth'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'auth',
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
@@ -130,7 +165,10 @@ LANGUAGES = (
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/4.1/howto/static-files/
 STATIC_URL = 'assets/'
+STATIC_ROOT = os.path.join(BASE_DIR, 'public', 'assets')
 MEDIA_URL = 'uploads/'
+# Tests copy the fixture uploads to a temporary MEDIA_ROOT and write there.
+TEST_RUNNER = 'webapp.tests.runner.TemporaryMediaRunner'
 if 'test' in sys.argv:
     MEDIA_ROOT = os.path.join(BASE_DIR, 'webapp', 'tests', 'fixtures', 'uploads')
 else:
@@ -142,3 +180,112 @@ else:
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'webapp.User'
+
+# Seconds to buffer like increments in process before writing them to the
+# database in a single UPDATE. Set to 0 to write every like straight away.
+LIKES_FLUSH_INTERVAL = 0
+
+# Processes that generate resized copies of uploaded images in the background.
+# Set to 0 to generate them in the request that uploads the image.
+IMAGE_DERIVATIVE_WORKERS = 2
+
+# Accounts with more followers than this are not copied into every follower's
+# home timeline when they tweet; their tweets are merged in when it is read.
+TIMELINE_FANOUT_LIMIT = 10000
+
+# Dotted path to a callable that encodes a value into JSON bytes for the
+# streaming API. None picks orjson when it is installed and the json module
+# otherwise.
+JSON_ENCODER = None
+
+# Serve the timeline, tweet, profile and like views with their async versions.
+# Only worth enabling when running under ASGI (django_twitter.asgi); under
+# WSGI every async view is run in an event loop of its own.
+ASYNC_VIEWS = False
+
+# Broker that carries like counts to the live update streams. LocalBroker only
+# reaches streams served by the same process; swap in a networked broker with
+# the same subscribe/unsubscribe/publish interface when running several.
+# Streams are only held open under ASGI; under WSGI each request gets the
+# current counts and the browser polls again.
+LIKES_BROKER = 'webapp.events.LocalBroker'
+
+# Directory shared by all worker processes, where each one writes its request
+# metrics every few seconds so /metrics can add them up. None keeps them in
+# memory, which is only correct with a single process.
+METRICS_DIR = None
+
+# Addresses or networks allowed to read /metrics; staff users can read it from
+# anywhere. Behind a reverse proxy REMOTE_ADDR is the proxy's own address, so
+# keep /metrics off the public site there instead.
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
+# Sessions are read from the 'auth' cache and written through to the database,
+# and logged in users are looked up in the same cache, so a warm request makes
+# no queries to authenticate. The file based cache is shared by every process
+# on the host; a LocMemCache only works with a single process, because logging
+# out or editing a user only clears the cache of the process that served it.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'auth'
+AUTHENTICATION_BACKENDS = ['webapp.backends.CachedModelBackend']
+USER_CACHE_ALIAS = 'auth'
+
+# Seconds a user stays cached. Saving or deleting a user clears it straight
+# away; this bounds how stale the counters updated in bulk can get.
+USER_CACHE_TIMEOUT = 300
+
+# Flash messages travel in a cookie so they never write to the session.
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+# Login attempts allowed in a burst from one address and against one username,
+# refilled evenly over LOGIN_THROTTLE_WINDOW seconds. Attempts beyond them are
+# rejected before any password is hashed. LocalBuckets counts per process;
+# 'webapp.throttling.CacheBuckets' shares the counts through the 'auth' cache,
+# which must increment atomically (memcached, redis or SharedFileBasedCache).
+LOGIN_ATTEMPTS_PER_IP = 20
+LOGIN_ATTEMPTS_PER_USERNAME = 5
+LOGIN_THROTTLE_WINDOW = 300
+LOGIN_THROTTLE_BACKEND = 'webapp.throttling.LocalBuckets'
+
+# Behind a reverse proxy REMOTE_ADDR is the proxy's address, so every client
+# would share one login throttle. Set this to the request.META name of the
+# header the proxy puts the client address in, e.g. 'HTTP_X_REAL_IP' or
+# 'HTTP_X_FORWARDED_FOR' (its last address, the one the proxy added, is used).
+# Only set it when every request passes through the proxy, as clients can send
+# the header themselves.
+CLIENT_ADDRESS_HEADER = None
+
+# The test client sends every login from the same address.
+if 'test' in sys.argv:
+    LOGIN_ATTEMPTS_PER_IP = LOGIN_ATTEMPTS_PER_USERNAME = 1000
+
+# collectstatic names every asset after a hash of its content and stores gzip
+# (and brotli, when the brotli package is installed) copies next to it, which
+# webapp.views.assets serves with far-future immutable caching. Tests keep the
+# plain storage so they run without collecting. Uploads go to the content
+# addressed storage described below.
+STORAGES = {
+    'default': {'BACKEND': 'webapp.uploads.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'webapp.staticfiles.CompressedManifestStaticFilesStorage'},
+}
+if 'test' in sys.argv:
+    STORAGES['staticfiles'] = {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}
+
+# How uploads are sent. None streams them from the app, answering Range and
+# conditional requests. 'x-accel-redirect' (nginx) and 'x-sendfile' (Apache,
+# lighttpd) only check the file exists and leave sending it to the front
+# server, so large attachments do not hold up a worker. For nginx, map
+# MEDIA_ACCEL_PREFIX to MEDIA_ROOT in an internal location.
+MEDIA_ACCEL = None
+MEDIA_ACCEL_PREFIX = '/protected-uploads/'
+
+# Uploads are hashed while they stream in and stored under a name made from the
+# hash, so an image posted again is written once and shared. Files larger than
+# MAX_UPLOAD_SIZE bytes or images over MAX_UPLOAD_PIXELS pixels are refused as
+# soon as the limit is crossed, before the rest of the upload is kept.
+FILE_UPLOAD_HANDLERS = [
+    'webapp.uploads.HashingMemoryFileUploadHandler',
+    'webapp.uploads.HashingTemporaryFileUploadHandler',
+]
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+MAX_UPLOAD_PIXELS = 40 * 1000 * 1000
@@ -13,11 +13,12 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
 
 urlpatterns = [
-    path('', include('webapp.urls')),
+    path('', include('webapp.async_urls' if settings.ASYNC_VIEWS else 'webapp.urls')),
     path('admin/', admin.site.urls),
 ]
 
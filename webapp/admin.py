@@ -3,6 +3,8 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin
 
 from webapp.forms.user_forms import CreateUserForm, UpdateUserForm
+from webapp.models.follow import Follow
+from webapp.models.like import Like
 from webapp.models.tweet import Tweet
 
 
@@ -15,3 +17,5 @@ class AdminUser(UserAdmin):
 
 admin.site.register(get_user_model(), AdminUser)
 admin.site.register(Tweet)
+admin.site.register(Like)
+admin.site.register(Follow)
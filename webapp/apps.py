@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.contrib.staticfiles.apps import StaticFilesConfig as BaseStaticFilesConfig
+from django.db.backends.signals import connection_created
 
 
 class WebappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'webapp'
+
+    def ready(self):
+        from webapp.metrics import instrument_connection
+
+        connection_created.connect(instrument_connection)
+
+
+class StaticFilesConfig(BaseStaticFilesConfig):
+    ignore_patterns = BaseStaticFilesConfig.ignore_patterns + ['images/uploads/*']
@@ -0,0 +1,106 @@
+import io
+import zipfile
+from datetime import datetime
+from itertools import chain
+
+from django.core.files.storage import default_storage
+
+from webapp.encoders import dumps
+from webapp.models.tweet import Tweet
+
+CHUNK_SIZE = 500
+COPY_SIZE = 64 * 1024
+FIELDS = ['id', 'message', 'image', 'image_width', 'image_height', 'likes', 'created_at']
+FORMATS = {'zip': 'application/zip', 'jsonl': 'application/x-ndjson'}
+
+
+class _Stream(io.RawIOBase):
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data, self._chunks = b''.join(self._chunks), []
+        return data
+
+
+def stream_archive(user, format):
+    return zip_archive(user) if format == 'zip' else jsonl_archive(user)
+
+
+def jsonl_archive(user):
+    encode = dumps()
+    yield encode({'user': _profile(user, default_storage.url(user.avatar.name))}) + b'\n'
+    for row in _rows(user):
+        image = default_storage.url(row['image']) if row['image'] else None
+        yield encode({'tweet': _tweet(row, image)}) + b'\n'
+
+
+def zip_archive(user):
+    encode, stream = dumps(), _Stream()
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as archive:
+        with archive.open('profile.json', 'w') as entry:
+            entry.write(encode(_profile(user, user.avatar.name)))
+
+        with archive.open('tweets.jsonl', 'w') as entry:
+            for row in _rows(user):
+                entry.write(encode(_tweet(row, row['image'] or None)) + b'\n')
+                if data := stream.drain():
+                    yield data
+
+        # Attachments are content addressed, so tweets with the same image share one file.
+        attachments = (
+            Tweet.objects.filter(user=user).exclude(image='').exclude(image=user.avatar.name)
+            .order_by('image').values_list('image', flat=True).distinct()
+        )
+        for name in chain([user.avatar.name], attachments.iterator(chunk_size=CHUNK_SIZE)):
+            yield from _copy(archive, stream, name)
+    yield stream.drain()
+
+
+def _tweets(user):
+    return Tweet.objects.filter(user=user).order_by('-created_at', '-id')
+
+
+def _rows(user):
+    return _tweets(user).values(*FIELDS).iterator(chunk_size=CHUNK_SIZE)
+
+
+def _copy(archive, stream, name):
+    try:
+        source = default_storage.open(name)
+    except OSError:
+        return
+
+    info = zipfile.ZipInfo(name, datetime.now().timetuple()[:6])
+    with source, archive.open(info, 'w', force_zip64=True) as entry:
+        while chunk := source.read(COPY_SIZE):
+            entry.write(chunk)
+            yield stream.drain()
+
+
+def _profile(user, avatar):
+    return {
+        'username': user.username,
+        'display_name': user.display_name,
+        'avatar': avatar,
+        'created_at': user.created_at.isoformat(),
+    }
+
+
+def _tweet(row, image):
+    return {
+        'id': row['id'],
+        'message': row['message'],
+        'image': image,
+        'image_width': row['image_width'],
+        'image_height': row['image_height'],
+        'likes': row['likes'],
+        'created_at': row['created_at'].isoformat(),
+    }
@@ -0,0 +1,18 @@
+from django.urls import path
+
+from .urls import urlpatterns as sync_urlpatterns
+from .views import async_tweets
+from .views import async_users
+
+ASYNC_VIEWS = {
+    'tweets_index': async_tweets.index,
+    'tweets_show': async_tweets.show,
+    'tweets_likes': async_tweets.likes,
+    'users_show': async_users.show,
+}
+
+urlpatterns = [
+    path(str(pattern.pattern), ASYNC_VIEWS[pattern.name], name=pattern.name)
+    if pattern.name in ASYNC_VIEWS else pattern
+    for pattern in sync_urlpatterns
+]
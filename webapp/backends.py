@@ -0,0 +1,8 @@
+from django.contrib.auth.backends import ModelBackend
+
+from webapp.user_cache import cached_user
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        return cached_user(user_id, super().get_user)
@@ -0,0 +1,33 @@
+import os
+import time
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.files import locks
+
+
+class SharedFileBasedCache(FileBasedCache):
+    # FileBasedCache lists every entry on each set to decide whether to cull,
+    # which gets slow with tens of thousands of sessions and users cached.
+    CULL_INTERVAL = 60
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._culled_at = None
+
+    def _cull(self):
+        now = time.monotonic()
+        if self._culled_at is not None and now - self._culled_at < self.CULL_INTERVAL:
+            return
+        self._culled_at = now
+        super()._cull()
+
+    # FileBasedCache.incr reads and writes the entry separately, so concurrent
+    # increments from other processes could be lost without the lock.
+    def incr(self, key, delta=1, version=None):
+        self._createdir()
+        with open(os.path.join(self._dir, 'incr.lock'), 'ab') as file:
+            locks.lock(file, locks.LOCK_EX)
+            try:
+                return super().incr(key, delta, version)
+            finally:
+                locks.unlock(file)
@@ -0,0 +1,74 @@
+import hashlib
+
+from django.contrib import messages
+from django.contrib.auth import get_user_model
+from django.db.models import DateTimeField, Exists, Func, IntegerField, OuterRef, Subquery
+from django.utils import translation
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from webapp.models.follow import Follow
+from webapp.models.like import Like
+from webapp.models.tweet import Tweet
+from webapp.pagination import KeysetPaginator
+
+
+def tweet_validators(request, tweet):
+    user = tweet.user
+    row = {
+        'updated_at': tweet.updated_at, 'likes': tweet.likes, 'liked': tweet.liked,
+        'user__updated_at': user.updated_at, 'user__avatar_hash': user.avatar_hash,
+    }
+    return _validators(request, row, max(tweet.updated_at, user.updated_at))
+
+
+def profiles(viewer, cursor):
+    page = KeysetPaginator(Tweet.objects.filter(user=OuterRef(OuterRef('pk'))))
+    ids = page.query(cursor).values('pk')
+    tweets = Tweet.objects.filter(pk__in=ids)
+    return get_user_model().objects.annotate(
+        page_tweets=_aggregate(tweets, 'COUNT', 'id'),
+        page_tweet_ids=_aggregate(tweets, 'SUM', 'id'),
+        page_likes=_aggregate(tweets, 'SUM', 'likes'),
+        page_updated_at=_aggregate(tweets, 'MAX', 'updated_at', DateTimeField()),
+        page_liked=_aggregate(Like.objects.filter(user=viewer.pk, tweet__in=ids), 'COUNT', 'id'),
+        is_following=Exists(Follow.objects.filter(follower=viewer.pk, followee=OuterRef('pk'))),
+    )
+
+
+def profile_validators(request, user):
+    row = {
+        'updated_at': user.updated_at, 'avatar_hash': user.avatar_hash,
+        'tweet_count': user.tweet_count, 'likes_received': user.likes_received,
+        'tweets': user.page_tweets, 'tweet_ids': user.page_tweet_ids, 'likes': user.page_likes,
+        'tweets_updated_at': user.page_updated_at, 'liked': user.page_liked,
+        'following': user.is_following,
+    }
+    return _validators(request, row, max(filter(None, [user.updated_at, user.page_updated_at])))
+
+
+def not_modified(request, validators):
+    if validators is None or messages.get_messages(request):
+        return None
+    etag, last_modified = validators
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def add_validators(response, validators):
+    if validators is not None and response.status_code == 200:
+        etag, last_modified = validators
+        response.headers.setdefault('ETag', etag)
+        response.headers.setdefault('Last-Modified', http_date(last_modified))
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def _validators(request, row, last_modified):
+    state = [request.user.pk, translation.get_language(), *row.values()]
+    digest = hashlib.md5(repr(state).encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"', int(last_modified.timestamp())
+
+
+def _aggregate(queryset, function, field, output_field=None):
+    value = Func(field, function=function, output_field=output_field or IntegerField())
+    return Subquery(queryset.order_by().annotate(value=value).values('value'))
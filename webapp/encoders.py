@@ -0,0 +1,23 @@
+import json
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_dumps(value):
+    return json.dumps(value, separators=(',', ':')).encode()
+
+
+def orjson_dumps(value):
+    return orjson.dumps(value)
+
+
+def dumps():
+    if settings.JSON_ENCODER:
+        return import_string(settings.JSON_ENCODER)
+    return orjson_dumps if orjson else json_dumps
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+KEEPALIVE = 15
+STREAM_DURATION = 5 * 60
+RETRY = 3000
+POLL_RETRY = 10000
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+class Subscription:
+    def __init__(self, broker, ids):
+        self.ids = frozenset(ids)
+        self._broker = broker
+        self._updates = {}
+        self._lock = threading.Lock()
+        self._waiter = None
+
+    def push(self, likes):
+        with self._lock:
+            self._updates.update((id, count) for id, count in likes.items() if id in self.ids)
+            if self._waiter is not None:
+                loop, event = self._waiter
+                loop.call_soon_threadsafe(event.set)
+
+    async def aget(self, timeout):
+        event = asyncio.Event()
+        with self._lock:
+            if self._updates:
+                event.set()
+            else:
+                self._waiter = (asyncio.get_running_loop(), event)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._waiter = None
+
+        with self._lock:
+            updates, self._updates = self._updates, {}
+        return updates
+
+    def close(self):
+        self._broker.unsubscribe(self)
+
+
+class LocalBroker:
+    MAX_SUBSCRIBERS = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+        self._active = set()
+
+    def subscribe(self, ids):
+        with self._lock:
+            if len(self._active) >= self.MAX_SUBSCRIBERS:
+                return None
+
+            subscription = Subscription(self, ids)
+            for id in subscription.ids:
+                self._subscriptions.setdefault(id, set()).add(subscription)
+            self._active.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._active.discard(subscription)
+            for id in subscription.ids:
+                subscriptions = self._subscriptions.get(id, set())
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    self._subscriptions.pop(id, None)
+
+    def publish(self, likes):
+        with self._lock:
+            subscriptions = {
+                subscription for id in likes for subscription in self._subscriptions.get(id, ())
+            }
+        for subscription in subscriptions:
+            subscription.push(likes)
+
+
+def like_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(settings.LIKES_BROKER)()
+        return _broker
+
+
+def publish_likes(likes):
+    like_broker().publish(likes)
+
+
+class LikeEvents:
+    def __init__(self, subscription):
+        self._subscription = subscription
+        self._deadline = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._deadline is None:
+            self._deadline = time.monotonic() + STREAM_DURATION
+            return f'retry: {RETRY}\n\n'
+        if time.monotonic() >= self._deadline:
+            self.close()
+            raise StopAsyncIteration
+        return _event(await self._subscription.aget(KEEPALIVE))
+
+    # StreamingHttpResponse.close() calls this, so the subscription goes away
+    # with the response even when the stream is not read to the end.
+    def close(self):
+        self._subscription.close()
+
+
+def like_snapshot(likes):
+    return f'retry: {POLL_RETRY}\n\n' + _event(likes)
+
+
+def _event(updates):
+    if not updates:
+        return ': keepalive\n\n'
+    return f'data: {json.dumps(updates, separators=(",", ":"))}\n\n'
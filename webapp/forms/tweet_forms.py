@@ -1,6 +1,7 @@
 from django import forms
 
 from webapp.models.tweet import Tweet
+from webapp.uploads import UploadImageField
 
 
 class CreateTweetForm(forms.ModelForm):
@@ -9,4 +10,4 @@ class CreateTweetForm(forms.ModelForm):
         fields = Tweet.fields()
 
     message = forms.CharField(label='Message', widget=forms.Textarea)
-    image = forms.ImageField(label='Image', required=False)
+    image = UploadImageField(label='Image', required=False)
@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import AuthenticationForm, UserCreationForm, UserChangeForm
 
+from webapp.uploads import UploadImageField
+
 
 class LoginUserForm(AuthenticationForm):
     class Meta:
@@ -11,9 +13,11 @@ class CreateUserForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
         model = get_user_model()
         fields = UserCreationForm.Meta.fields + tuple(get_user_model().fields())
+        field_classes = {**UserCreationForm.Meta.field_classes, 'avatar': UploadImageField}
 
 
 class UpdateUserForm(UserChangeForm):
     class Meta(UserChangeForm.Meta):
         model = get_user_model()
         fields = get_user_model().update_fields()
+        field_classes = {**UserChangeForm.Meta.field_classes, 'avatar': UploadImageField}
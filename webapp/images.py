@@ -0,0 +1,119 @@
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from PIL import Image
+
+CHUNK_SIZE = 64 * 1024
+
+logger = logging.getLogger(__name__)
+_executor = None
+
+
+def content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def derivative_name(digest, width, name):
+    extension = os.path.splitext(name)[1].lower()
+    return f'derivatives/{digest[:2]}/{digest}-{width}{extension}'
+
+
+def generate_derivatives(root, name, widths):
+    digest = content_hash(os.path.join(root, name))
+    with Image.open(os.path.join(root, name)) as image:
+        for width in widths:
+            path = os.path.join(root, derivative_name(digest, width, name))
+            if os.path.exists(path):
+                continue
+
+            size = min(width, image.width)
+            height = max(1, round(image.height * size / image.width))
+            resized = image.resize((size, height), Image.Resampling.LANCZOS)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            resized.save(f'{path}.tmp', format=image.format)
+            os.replace(f'{path}.tmp', path)
+    return digest
+
+
+def try_generate_derivatives(root, name, widths):
+    try:
+        return generate_derivatives(root, name, widths)
+    except OSError:
+        return None
+
+
+def generate_all(jobs):
+    if not jobs:
+        return []
+    if not settings.IMAGE_DERIVATIVE_WORKERS:
+        return [try_generate_derivatives(*job) for job in jobs]
+    return list(_pool().map(try_generate_derivatives, *zip(*jobs)))
+
+
+def schedule_derivatives(instance, field_name, hash_field, widths):
+    name = getattr(instance, field_name).name
+    if not name:
+        return
+
+    model, pk = type(instance), instance.pk
+    job = (settings.MEDIA_ROOT, name, widths)
+
+    def store(digest):
+        model.objects.filter(pk=pk, **{field_name: name}).update(**{hash_field: digest})
+
+    def submit():
+        if settings.IMAGE_DERIVATIVE_WORKERS:
+            submitter = threading.get_ident()
+
+            def store_in_background(future):
+                try:
+                    store(future.result())
+                except Exception:
+                    logger.exception('Could not generate derivatives of %s', name)
+                finally:
+                    # A job that is already done runs its callback in the submitting
+                    # thread, whose connection belongs to the request.
+                    if threading.get_ident() != submitter:
+                        connection.close()
+
+            _pool().submit(generate_derivatives, *job).add_done_callback(store_in_background)
+        else:
+            store(generate_derivatives(*job))
+
+    transaction.on_commit(submit)
+
+
+def width_srcset(file, digest, widths, original_width):
+    if not digest or not original_width:
+        return ''
+    candidates = [
+        f'{default_storage.url(derivative_name(digest, width, file.name))} {width}w'
+        for width in widths if width < original_width
+    ]
+    return ', '.join(candidates + [f'{file.url} {original_width}w'])
+
+
+def density_srcset(file, digest, widths):
+    if not digest:
+        return ''
+    return ', '.join(
+        f'{default_storage.url(derivative_name(digest, width, file.name))} {width // widths[0]}x'
+        for width in widths
+    )
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.IMAGE_DERIVATIVE_WORKERS)
+    return _executor
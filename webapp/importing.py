@@ -0,0 +1,132 @@
+import csv
+import io
+import json
+from collections import Counter
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from webapp.models.tweet import Tweet
+
+CHUNK_SIZE = 5000
+CACHE_SIZE = 100000
+LOOKUP_SIZE = 500
+COLUMNS = ['user', 'message', 'image', 'image_hash', 'likes', 'created_at', 'updated_at']
+TEXT_COLUMNS = ['message', 'image', 'image_hash']
+
+
+class UsernameCache:
+    def __init__(self, size=CACHE_SIZE):
+        self._size = size
+        self._ids = {}
+
+    def resolve(self, usernames):
+        if len(self._ids) + len(usernames) > self._size:
+            self._ids.clear()
+        missing = list({username for username in usernames if username not in self._ids})
+
+        self._ids.update(dict.fromkeys(missing))
+        users = get_user_model().objects.order_by()
+        for start in range(0, len(missing), LOOKUP_SIZE):
+            batch = missing[start:start + LOOKUP_SIZE]
+            self._ids.update(users.filter(username__in=batch).values_list('username', 'pk'))
+        return {username: self._ids[username] for username in usernames}
+
+
+def read_rows(file, format):
+    if format == 'csv':
+        yield from csv.DictReader(file)
+        return
+
+    for line in file:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row if isinstance(row, dict) else {}
+
+
+def import_tweets(rows, chunk_size=CHUNK_SIZE):
+    users, rows = UsernameCache(), iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        usernames = [str(row.get('username') or '') for row in chunk]
+        ids = users.resolve(usernames)
+        tweets = [_tweet(row, ids[username]) for row, username in zip(chunk, usernames)]
+        tweets = [tweet for tweet in tweets if tweet is not None]
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                _copy(tweets)
+            else:
+                _insert(tweets, chunk_size)
+            get_user_model().objects.add_tweets(Counter(tweet.user_id for tweet in tweets))
+        yield len(tweets), len(chunk) - len(tweets)
+
+
+def _tweet(row, user_id):
+    message = row.get('message')
+    created_at = row.get('created_at') or None
+    if user_id is None or not isinstance(message, str) or not message.strip():
+        return None
+    if created_at is not None:
+        try:
+            created_at = parse_datetime(created_at)
+        except (TypeError, ValueError):
+            return None
+        if created_at is None:
+            return None
+        if timezone.is_naive(created_at):
+            created_at = timezone.make_aware(created_at)
+
+    created_at = created_at or timezone.now()
+    return Tweet(
+        user_id=user_id, message=message, image=row.get('image') or '',
+        created_at=created_at, updated_at=created_at,
+    )
+
+
+def _copy(tweets):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for tweet in tweets:
+        writer.writerow([
+            tweet.user_id, tweet.message, tweet.image.name, tweet.image_hash, tweet.likes,
+            tweet.created_at.isoformat(), tweet.updated_at.isoformat(),
+        ])
+    buffer.seek(0)
+
+    quote = connection.ops.quote_name
+    columns = [quote(Tweet._meta.get_field(name).column) for name in COLUMNS]
+    text = [quote(Tweet._meta.get_field(name).column) for name in TEXT_COLUMNS]
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {quote(Tweet._meta.db_table)} ({", ".join(columns)}) FROM STDIN '
+            f'WITH (FORMAT csv, FORCE_NOT_NULL ({", ".join(text)}))',
+            buffer,
+        )
+
+
+# Inserts stamp created_at and updated_at with the current time, so the imported
+# timestamps are written back with an update, which skips pre_save.
+def _insert(tweets, batch_size):
+    timestamps = [(tweet, tweet.created_at) for tweet in tweets]
+    if not connection.features.can_return_rows_from_bulk_insert:
+        for tweet in tweets:
+            tweet.save_base(raw=True)
+        return
+
+    Tweet.objects.bulk_create(tweets, batch_size=batch_size)
+    for start in range(0, len(tweets), LOOKUP_SIZE):
+        batch = timestamps[start:start + LOOKUP_SIZE]
+        created_at = Case(
+            *[When(pk=tweet.pk, then=Value(timestamp)) for tweet, timestamp in batch],
+            output_field=DateTimeField(),
+        )
+        Tweet.objects.filter(pk__in=[tweet.pk for tweet, _ in batch]).update(
+            created_at=created_at, updated_at=created_at,
+        )
@@ -0,0 +1,209 @@
+import atexit
+import logging
+import threading
+import time
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Exists, OuterRef, Value
+
+from webapp.events import publish_likes
+from webapp.models.like import Like
+from webapp.models.tweet import Tweet
+
+logger = logging.getLogger(__name__)
+
+
+class AtomicLikeCounter:
+    def increment(self, id, delta=1):
+        return self.increment_many({id: delta}).get(id)
+
+    def increment_many(self, deltas):
+        if not Tweet.objects.add_likes(deltas):
+            return {}
+        return self.likes_many(deltas)
+
+    def likes(self, id):
+        return self.likes_many([id]).get(id)
+
+    def likes_many(self, ids):
+        return _stored_likes(ids)
+
+    def pending(self, id):
+        return 0
+
+    def flush(self):
+        pass
+
+
+class CoalescingLikeCounter:
+    def __init__(self, interval):
+        self._interval = interval
+        self._deltas = {}
+        self._lock = threading.Lock()
+        self._timer = None
+        self._flushed_at = time.monotonic()
+
+    def increment(self, id, delta=1):
+        return self.increment_many({id: delta}).get(id)
+
+    def increment_many(self, deltas):
+        stored = _stored_likes(deltas)
+        if not stored:
+            return {}
+
+        deltas = {id: deltas[id] for id in stored}
+        with self._lock:
+            likes = {
+                id: count + self._deltas.get(id, 0) + deltas[id] for id, count in stored.items()
+            }
+        transaction.on_commit(partial(self._add, deltas))
+        return likes
+
+    def likes(self, id):
+        return self.likes_many([id]).get(id)
+
+    def likes_many(self, ids):
+        stored = _stored_likes(ids)
+        with self._lock:
+            return {id: count + self._deltas.get(id, 0) for id, count in stored.items()}
+
+    def pending(self, id):
+        with self._lock:
+            return self._deltas.get(id, 0)
+
+    def flush(self):
+        with self._lock:
+            deltas, self._deltas = self._deltas, {}
+            self._flushed_at = time.monotonic()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if not deltas:
+            return
+        try:
+            Tweet.objects.add_likes(deltas)
+        except Exception:
+            with self._lock:
+                for id, delta in deltas.items():
+                    self._deltas[id] = self._deltas.get(id, 0) + delta
+            raise
+
+    def _add(self, deltas):
+        with self._lock:
+            for id, delta in deltas.items():
+                self._deltas[id] = self._deltas.get(id, 0) + delta
+            due = time.monotonic() - self._flushed_at >= self._interval
+            if not due and self._timer is None:
+                self._timer = threading.Timer(self._interval, self._flush_in_background)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if due:
+            try:
+                self.flush()
+            except DatabaseError:
+                logger.exception('Could not flush likes, will retry on the next flush')
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+
+_counters = {}
+_counters_lock = threading.Lock()
+
+
+def like_counter():
+    interval = settings.LIKES_FLUSH_INTERVAL
+    with _counters_lock:
+        if interval not in _counters:
+            counter = CoalescingLikeCounter(interval) if interval else AtomicLikeCounter()
+            atexit.register(counter.flush)
+            _counters[interval] = counter
+        return _counters[interval]
+
+
+def toggle_like(user, id, liked=None):
+    counter = like_counter()
+    if counter.likes(id) is None:
+        return None
+
+    with transaction.atomic():
+        _lock_likes_of(user)
+        if liked is None:
+            liked = not Like.objects.filter(user=user, tweet_id=id).exists()
+
+        if liked:
+            changed = Like.objects.get_or_create(user=user, tweet_id=id)[1]
+        else:
+            changed = Like.objects.filter(user=user, tweet_id=id).delete()[0] > 0
+
+        if not changed:
+            return counter.likes(id), liked
+
+        likes = counter.increment(id, 1 if liked else -1)
+        transaction.on_commit(partial(publish_likes, {id: likes}))
+    return likes, liked
+
+
+def like_many(user, deltas):
+    counter = like_counter()
+    with transaction.atomic():
+        _lock_likes_of(user)
+        likes = counter.likes_many(deltas)
+        liked = set(
+            Like.objects.filter(user=user, tweet_id__in=likes).values_list('tweet_id', flat=True)
+        )
+        to_like = [id for id in likes if deltas[id] > 0 and id not in liked]
+        to_unlike = [id for id in likes if deltas[id] < 0 and id in liked]
+
+        Like.objects.bulk_create(
+            [Like(user=user, tweet_id=id) for id in to_like], ignore_conflicts=True
+        )
+        Like.objects.filter(user=user, tweet_id__in=to_unlike).delete()
+
+        changes = {**dict.fromkeys(to_like, 1), **dict.fromkeys(to_unlike, -1)}
+        if changes:
+            updated = counter.increment_many(changes)
+            likes.update(updated)
+            transaction.on_commit(partial(publish_likes, updated))
+    return {id: (count, (id in liked) != (id in changes)) for id, count in likes.items()}
+
+
+def liked_by(user):
+    if not user.is_authenticated:
+        return Value(False)
+    return Exists(Like.objects.filter(user=user, tweet=OuterRef('pk')))
+
+
+def liked_ids(user, tweets):
+    if not user.is_authenticated:
+        return set()
+    return set(_user_likes(user, tweets))
+
+
+async def aliked_ids(user, tweets):
+    if not user.is_authenticated:
+        return set()
+    return {id async for id in _user_likes(user, tweets)}
+
+
+def _user_likes(user, tweets):
+    likes = Like.objects.filter(user=user, tweet_id__in=[tweet.id for tweet in tweets])
+    return likes.values_list('tweet_id', flat=True)
+
+
+# Likes of one user are changed one transaction at a time, so the likes read in
+# a transaction are the ones its inserts and deletes will change.
+def _lock_likes_of(user):
+    list(get_user_model().objects.select_for_update().filter(pk=user.pk).values_list('pk'))
+
+
+def _stored_likes(ids):
+    return dict(Tweet.objects.filter(pk__in=list(ids)).values_list('pk', 'likes'))
@@ -0,0 +1,40 @@
+from django.core.files.images import get_image_dimensions
+from django.core.management.base import BaseCommand
+
+from webapp.models.tweet import Tweet
+
+
+class Command(BaseCommand):
+    help = 'Stores the width and height of tweet images uploaded before they were persisted.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        storage = Tweet._meta.get_field('image').storage
+        missing = Tweet.objects.exclude(image='').filter(image_width__isnull=True).order_by('pk')
+        size = options['batch_size']
+        updated, failed, last_id = 0, 0, 0
+        while True:
+            batch = list(missing.filter(pk__gt=last_id).values_list('pk', 'image')[:size])
+            if not batch:
+                break
+
+            tweets = []
+            for id, name in batch:
+                try:
+                    with storage.open(name) as image:
+                        width, height = get_image_dimensions(image)
+                except OSError:
+                    width = height = None
+                if width is None or height is None:
+                    failed += 1
+                    self.stderr.write(f'Could not read dimensions of {name} for tweet {id}.')
+                    continue
+                tweets.append(Tweet(id=id, image_width=width, image_height=height))
+
+            Tweet.objects.bulk_update(tweets, ['image_width', 'image_height'])
+            updated += len(tweets)
+            last_id = batch[-1][0]
+
+        self.stdout.write(f'Stored dimensions of {updated} images, {failed} could not be read.')
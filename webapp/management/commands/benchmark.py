@@ -0,0 +1,254 @@
+import io
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from array import array
+from datetime import datetime, timezone
+
+from django.contrib.auth import get_user_model
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from PIL import Image
+
+from webapp import urls
+from webapp.metrics import RequestMetrics
+from webapp.models.tweet import Tweet
+from webapp.seeding import PASSWORD, seed_tweets, seed_users
+from webapp.timelines import follow
+
+LOGIN_ATTEMPTS = 10 ** 9
+
+
+class Command(BaseCommand):
+    help = (
+        'Seeds a fresh test database up to each size and times every route in webapp.urls, '
+        'reporting p50 and p99 latency and the number of queries per request as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='1000,10000,100000',
+            help='Comma separated numbers of tweets to benchmark at, in increasing order.'
+        )
+        parser.add_argument('--tweets-per-user', type=int, default=10)
+        parser.add_argument('--requests', type=int, default=50, help='Requests per route.')
+        parser.add_argument('--output', default='benchmark.json')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the random generator.')
+        parser.add_argument(
+            '--current-database', action='store_true',
+            help='Seed and benchmark the configured database instead of a fresh test database.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted(int(size) for size in options['sizes'].split(','))
+        except ValueError:
+            raise CommandError('Sizes must be comma separated numbers.')
+        if not sizes or sizes[0] < 1 or options['tweets_per_user'] < 1:
+            raise CommandError('Sizes and tweets per user must be positive.')
+        if options['requests'] < 2:
+            raise CommandError('Percentiles need at least two requests per route.')
+
+        if options['current_database']:
+            results = self.run(sizes, options)
+        else:
+            creation = connection.creation
+            name = creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                results = self.run(sizes, options)
+            finally:
+                creation.destroy_test_db(name, verbosity=0)
+
+        with open(options['output'], 'w') as file:
+            json.dump(results, file, indent=2)
+        self.stdout.write(f'Wrote {options["output"]}.')
+
+    def run(self, sizes, options):
+        results = {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'database': connection.vendor,
+            'requests': options['requests'],
+            'sizes': [],
+        }
+        generator = random.Random(options['seed'])
+        user_ids, tweets = array('q'), 0
+        with tempfile.TemporaryDirectory() as media:
+            with override_settings(
+                ALLOWED_HOSTS=['testserver'], MEDIA_ROOT=media,
+                STATIC_ROOT=os.path.join(media, 'assets'),
+                LOGIN_ATTEMPTS_PER_IP=LOGIN_ATTEMPTS, LOGIN_ATTEMPTS_PER_USERNAME=LOGIN_ATTEMPTS,
+            ):
+                call_command('collectstatic', interactive=False, verbosity=0)
+                for size in sizes:
+                    users = max(1, size // options['tweets_per_user'])
+                    user_ids.extend(seed_users(users - len(user_ids)))
+                    seed_tweets(size - tweets, user_ids, generator)
+                    tweets = size
+
+                    routes = Benchmark(user_ids, generator).run(options['requests'])
+                    results['sizes'].append(
+                        {'users': len(user_ids), 'tweets': tweets, 'routes': routes}
+                    )
+                    self.stdout.write(f'Benchmarked {len(routes)} routes with {tweets} tweets.')
+        return results
+
+
+class Benchmark:
+    def __init__(self, user_ids, random):
+        User = get_user_model()
+        self.user = User.objects.get(pk=user_ids[0])
+        self.other = User.objects.get(pk=random.choice(user_ids[1:] or user_ids))
+        for followee in User.objects.filter(pk__in=random.sample(user_ids, min(10, len(user_ids)))):
+            if followee != self.user:
+                follow(self.user, followee)
+
+        self.tweet = Tweet.objects.order_by('-created_at', '-id').first()
+        self.term = self.tweet.message.split()[0]
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.following = False
+        self.avatar = _png()
+        self.upload = default_storage.save('attachments/benchmark.png', ContentFile(self.avatar))
+
+    def run(self, requests):
+        results = {}
+        for pattern in urls.urlpatterns:
+            if not pattern.name:
+                continue
+            request = getattr(self, pattern.name, None)
+            if request is None:
+                results[pattern.name] = {'skipped': 'no benchmark request'}
+                continue
+            results[pattern.name] = self.measure(request, requests)
+        return results
+
+    def measure(self, request, requests):
+        method, status = request()
+        durations, queries = [], []
+        for _ in range(requests):
+            metrics = RequestMetrics()
+            start = time.perf_counter()
+            with connection.execute_wrapper(metrics):
+                request()
+            durations.append(time.perf_counter() - start)
+            queries.append(metrics.queries)
+
+        percentiles = statistics.quantiles(durations, n=100, method='inclusive')
+        return {
+            'method': method,
+            'status': status,
+            'p50_ms': round(statistics.median(durations) * 1000, 3),
+            'p99_ms': round(percentiles[98] * 1000, 3),
+            'queries': max(queries),
+        }
+
+    def get(self, name, query=None, client=None, **kwargs):
+        response = (client or self.client).get(reverse(name, kwargs=kwargs), query)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return 'GET', response.status_code
+
+    def post(self, name, data=None, client=None, **kwargs):
+        response = (client or self.client).post(reverse(name, kwargs=kwargs), data)
+        return 'POST', response.status_code
+
+    def tweets_index(self):
+        return self.get('tweets_index')
+
+    def tweets_home(self):
+        return self.get('tweets_home')
+
+    def tweets_search(self):
+        return self.get('tweets_search', {'q': self.term})
+
+    def tweets_new(self):
+        return self.get('tweets_new')
+
+    def tweets_create(self):
+        return self.post('tweets_create', {'message': 'Benchmark tweet'})
+
+    def tweets_show(self):
+        return self.get('tweets_show', id=self.tweet.id)
+
+    def tweets_likes(self):
+        response = self.client.post(
+            reverse('tweets_likes'), {'id': self.tweet.id}, content_type='application/json'
+        )
+        return 'POST', response.status_code
+
+    def tweets_likes_stream(self):
+        return self.get('tweets_likes_stream', {'ids': self.tweet.id})
+
+    def users_login(self):
+        return self.get('users_login', client=Client())
+
+    def users_authentication(self):
+        data = {'username': self.user.username, 'password': PASSWORD}
+        return self.post('users_authentication', data, client=Client())
+
+    def users_logout(self):
+        return self.get('users_logout', client=Client())
+
+    def users_new(self):
+        return self.get('users_new', client=Client())
+
+    def users_create(self):
+        number = uuid.uuid4().hex[:16]
+        data = {
+            'username': f'benchmark{number}', 'email': f'benchmark{number}@example.org',
+            'display_name': 'Benchmark', 'password1': 'Very123Secure', 'password2': 'Very123Secure',
+            'avatar': SimpleUploadedFile('avatar.png', self.avatar),
+        }
+        return self.post('users_create', data, client=Client())
+
+    def users_edit(self):
+        return self.get('users_edit')
+
+    def users_archive(self):
+        return self.get('users_archive')
+
+    def users_update(self):
+        data = {'email': self.user.email, 'display_name': 'Benchmark'}
+        return self.post('users_update', data, id=self.user.id)
+
+    def users_show(self):
+        return self.get('users_show', username=self.other.username)
+
+    def users_follows(self):
+        self.following = not self.following
+        data = {} if self.following else {'follow': 'false'}
+        return self.post('users_follows', data, username=self.other.username)
+
+    def api_tweets(self):
+        return self.get('api_tweets')
+
+    def metrics(self):
+        return self.get('metrics')
+
+    def media(self):
+        return self.get('media', path=self.upload)
+
+    def assets(self):
+        response = self.client.get(
+            staticfiles_storage.url('css/style.css'), headers={'accept_encoding': 'gzip'}
+        )
+        b''.join(response.streaming_content)
+        return 'GET', response.status_code
+
+
+def _png():
+    output = io.BytesIO()
+    Image.new('RGB', (64, 64)).save(output, 'PNG')
+    return output.getvalue()
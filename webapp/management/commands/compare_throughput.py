@@ -0,0 +1,63 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+MODES = [
+    ('WSGI, sync views', 'webapp.urls', False),
+    ('ASGI, sync views', 'webapp.urls', True),
+    ('ASGI, async views', 'webapp.async_urls', True),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Sends concurrent GET requests through the WSGI and the ASGI request handlers, '
+        'with the sync and the async views, and reports requests per second for each.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', action='append', help='Path to request. Repeatable.')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=20)
+
+    def handle(self, *args, **options):
+        paths = options['path'] or [reverse('tweets_index')]
+        requests, concurrency = options['requests'], options['concurrency']
+        for path in paths:
+            for name, urlconf, asgi in MODES:
+                with override_settings(ROOT_URLCONF=urlconf, ALLOWED_HOSTS=['testserver']):
+                    run = self.run_asgi if asgi else self.run_wsgi
+                    elapsed, statuses = run(path, requests, concurrency)
+
+                failed = sum(status != 200 for status in statuses)
+                summary = f'{path} {name}: {requests / elapsed:.1f} requests/s'
+                self.stdout.write(summary + (f', {failed} failed' if failed else ''))
+
+    def run_wsgi(self, path, requests, concurrency):
+        def get(_):
+            return Client(raise_request_exception=False).get(path).status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            statuses = list(pool.map(get, range(requests)))
+        return time.perf_counter() - start, statuses
+
+    def run_asgi(self, path, requests, concurrency):
+        return asyncio.run(self.gather(path, requests, concurrency))
+
+    async def gather(self, path, requests, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def get():
+            async with semaphore:
+                response = await AsyncClient(raise_request_exception=False).get(path)
+                return response.status_code
+
+        start = time.perf_counter()
+        statuses = await asyncio.gather(*(get() for _ in range(requests)))
+        return time.perf_counter() - start, statuses
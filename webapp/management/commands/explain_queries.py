@@ -0,0 +1,76 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from webapp.models.timeline_entry import TimelineEntry
+from webapp.models.tweet import Tweet
+from webapp.pagination import KeysetPaginator, RankPaginator
+from webapp.search import search_tweets
+
+SEQUENTIAL_SCANS = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    'sqlite': re.compile(r'\bSCAN (\w+)$', re.MULTILINE),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs EXPLAIN ANALYZE on the timeline, profile and search queries '
+        'and reports sequential scans. Small tables are always scanned, '
+        'so run it against a seeded database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help='User whose profile and timeline are explained.')
+        parser.add_argument('--fail-on-seq-scan', action='store_true')
+
+    def handle(self, *args, **options):
+        tweet = Tweet.objects.order_by('-created_at', '-id').first()
+        users = get_user_model().objects.order_by('pk')
+        if options['username']:
+            users = users.filter(username=options['username'])
+        user = users.first()
+        if tweet is None or user is None:
+            raise CommandError('There are no tweets or users to explain queries with.')
+
+        pattern = SEQUENTIAL_SCANS.get(connection.vendor)
+        explain = {'analyze': True} if connection.vendor == 'postgresql' else {}
+        scanned = []
+        for name, queryset in self.queries(user, tweet).items():
+            plan = queryset.explain(**explain)
+            tables = sorted(set(pattern.findall(plan))) if pattern else []
+            if tables:
+                scanned.append(name)
+                self.stdout.write(f'{name}: sequential scan on {", ".join(tables)}')
+            else:
+                self.stdout.write(f'{name}: OK')
+            if options['verbosity'] > 1:
+                self.stdout.write(plan)
+
+        if scanned and options['fail_on_seq_scan']:
+            raise CommandError(f'Sequential scans in {", ".join(scanned)}.')
+
+    def queries(self, user, tweet):
+        size = KeysetPaginator.PAGE_SIZE + 1
+        older = KeysetPaginator.older_than(tweet.created_at, tweet.id)
+        timeline = Tweet.objects.with_authors().order_by('-created_at', '-id')
+        profile = timeline.filter(user=user)
+        home = TimelineEntry.objects.filter(owner=user).select_related('tweet__user')
+        home = home.order_by('-created_at', '-tweet_id')
+        search = search_tweets(tweet.message).order_by('-rank', '-id')
+        less_relevant = RankPaginator.older_than(1.0, tweet.id)
+        return {
+            'tweets_index': timeline[:size],
+            'tweets_index_next_page': timeline.filter(older)[:size],
+            'tweets_show': Tweet.objects.with_authors().filter(pk=tweet.id),
+            'tweets_home': home[:size],
+            'tweets_home_next_page': home.filter(KeysetPaginator.older_than(
+                tweet.created_at, tweet.id, 'tweet_id'
+            ))[:size],
+            'users_show': profile[:size],
+            'users_show_next_page': profile.filter(older)[:size],
+            'tweets_search': search[:size],
+            'tweets_search_next_page': search.filter(less_relevant)[:size],
+        }
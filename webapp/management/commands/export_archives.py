@@ -0,0 +1,70 @@
+import multiprocessing
+import os
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils.text import get_valid_filename
+
+from webapp.archives import FORMATS, stream_archive
+
+PAGE_SIZE = 1000
+
+
+def export(user_id, directory, format):
+    user = get_user_model().objects.get(pk=user_id)
+    path = os.path.join(directory, get_valid_filename(f'{user.pk}-{user.username}.{format}'))
+    with open(f'{path}.tmp', 'wb') as file:
+        for chunk in stream_archive(user, format):
+            file.write(chunk)
+    os.replace(f'{path}.tmp', path)
+    return os.path.getsize(path)
+
+
+class Command(BaseCommand):
+    help = (
+        'Writes the archive of every user to a directory, '
+        'one file per user, exporting users in parallel worker processes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory')
+        parser.add_argument('--format', choices=list(FORMATS), default='zip')
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError('There must be at least one worker.')
+        directory, format = options['directory'], options['format']
+        os.makedirs(directory, exist_ok=True)
+
+        exported, size, start = 0, 0, time.perf_counter()
+        users = get_user_model().objects.order_by('pk').values_list('pk', flat=True)
+        with self.pool(options['workers']) as pool:
+            last_id = 0
+            while ids := list(users.filter(pk__gt=last_id)[:PAGE_SIZE]):
+                sizes = pool.starmap(export, [(id, directory, format) for id in ids])
+                exported += len(sizes)
+                size += sum(sizes)
+                last_id = ids[-1]
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f'Exported {exported} archives, {size} bytes, in {elapsed:.1f}s.')
+
+    def pool(self, workers):
+        if workers == 1:
+            return _InlinePool()
+        connections.close_all()
+        return multiprocessing.get_context('fork').Pool(workers)
+
+
+class _InlinePool:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def starmap(self, function, arguments):
+        return [function(*argument) for argument in arguments]
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from webapp.images import generate_all
+from webapp.models.tweet import Tweet
+
+
+class Command(BaseCommand):
+    help = 'Generates the resized copies of tweet images and avatars that do not have them yet.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        sources = [
+            (Tweet, 'image', 'image_hash', Tweet.IMAGE_WIDTHS),
+            (User, 'avatar', 'avatar_hash', User.AVATAR_WIDTHS),
+        ]
+        for model, field_name, hash_field, widths in sources:
+            size = options['batch_size']
+            generated, failed = self.generate(model, field_name, hash_field, widths, size)
+            self.stdout.write(
+                f'Generated derivatives of {generated} {model._meta.verbose_name_plural}, '
+                f'{failed} could not be read.'
+            )
+
+    def generate(self, model, field_name, hash_field, widths, size):
+        missing = model.objects.exclude(**{field_name: ''}).filter(**{hash_field: ''})
+        missing = missing.order_by('pk')
+        generated, failed, last_id = 0, 0, 0
+        while True:
+            batch = list(missing.filter(pk__gt=last_id).values_list('pk', field_name)[:size])
+            if not batch:
+                return generated, failed
+
+            digests = generate_all([(settings.MEDIA_ROOT, name, widths) for _, name in batch])
+            for (pk, name), digest in zip(batch, digests):
+                if digest is None:
+                    failed += 1
+                    self.stderr.write(f'Could not read {name}.')
+                    continue
+                model.objects.filter(pk=pk, **{field_name: name}).update(**{hash_field: digest})
+                generated += 1
+            last_id = batch[-1][0]
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from webapp.importing import CHUNK_SIZE, import_tweets, read_rows
+
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.json': 'jsonl'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Imports tweets from a JSONL or CSV file with username, message and optionally '
+        'created_at and image fields. Rows with unknown users or without a message are skipped. '
+        'Imported tweets are not fanned out to home timelines.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import, or - for standard input.')
+        parser.add_argument('--format', choices=['csv', 'jsonl'])
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or FORMATS.get(os.path.splitext(path)[1].lower())
+        if format is None:
+            raise CommandError('Could not tell the format from the file name, use --format.')
+        if options['chunk_size'] < 1:
+            raise CommandError('The chunk size must be positive.')
+
+        try:
+            file = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        except OSError as error:
+            raise CommandError(f'Could not open {path}: {error.strerror}.')
+
+        imported, skipped, start = 0, 0, time.perf_counter()
+        with file:
+            for created, invalid in import_tweets(read_rows(file, format), options['chunk_size']):
+                imported += created
+                skipped += invalid
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'Imported {imported} tweets{self.rate(imported, start)}.')
+
+        self.stdout.write(
+            f'Imported {imported} tweets, skipped {skipped}{self.rate(imported, start)}.'
+        )
+
+    def rate(self, rows, start):
+        elapsed = time.perf_counter() - start
+        return f' in {elapsed:.1f}s ({rows / elapsed if elapsed else 0:.0f}/s)'
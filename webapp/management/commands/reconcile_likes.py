@@ -0,0 +1,42 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from webapp.likes import like_counter
+from webapp.models.like import Like
+from webapp.models.tweet import Tweet
+
+
+class Command(BaseCommand):
+    help = (
+        'Recomputes Tweet.likes from the Like relation, one chunk of tweets at a time. '
+        'Likes buffered by other processes (LIKES_FLUSH_INTERVAL > 0) are not in the Like '
+        'counts yet, so run it while no web process holds unflushed likes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        like_counter().flush()
+
+        likes = Like.objects.filter(tweet=OuterRef('pk')).order_by().values('tweet')
+        counted = Coalesce(Subquery(likes.annotate(count=Count('id')).values('count')), 0)
+        tweets = Tweet.objects.order_by('pk').values_list('pk', flat=True)
+        checked, fixed, last_id = 0, 0, 0
+        while ids := list(tweets.filter(pk__gt=last_id)[:options['chunk_size']]):
+            with transaction.atomic():
+                drifted = Tweet.objects.filter(pk__in=ids).exclude(likes=counted)
+                updated = drifted.update(likes=counted)
+                if updated:
+                    get_user_model().objects.filter(
+                        pk__in=Tweet.objects.filter(pk__in=ids).values('user')
+                    ).recount()
+
+            checked += len(ids)
+            fixed += updated
+            last_id = ids[-1]
+
+        self.stdout.write(f'Checked {checked} tweets, fixed {fixed}.')
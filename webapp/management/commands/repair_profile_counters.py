@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        'Recomputes User.tweet_count and User.likes_received from tweets, '
+        'one chunk of users at a time.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        users = User.objects.order_by('pk').values_list('pk', flat=True)
+        checked, fixed, last_id = 0, 0, 0
+        while ids := list(users.filter(pk__gt=last_id)[:options['chunk_size']]):
+            fixed += User.objects.filter(pk__in=ids).recount()
+            checked += len(ids)
+            last_id = ids[-1]
+
+        self.stdout.write(f'Checked {checked} users, fixed {fixed}.')
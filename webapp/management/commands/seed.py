@@ -0,0 +1,37 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from webapp.seeding import BATCH_SIZE, PASSWORD, seed_tweets, seed_users
+
+
+class Command(BaseCommand):
+    help = (
+        'Inserts users and tweets with random messages in batched transactions. '
+        f'Every seeded user has the password "{PASSWORD}".'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--tweets', type=int, default=10000)
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the random generator.')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 and options['tweets']:
+            raise CommandError('Tweets need at least one user to write them.')
+
+        start = time.perf_counter()
+        user_ids = seed_users(options['users'], options['batch_size'])
+        self.report('users', len(user_ids), start)
+
+        start = time.perf_counter()
+        generator = random.Random(options['seed'])
+        seed_tweets(options['tweets'], user_ids, generator, options['batch_size'])
+        self.report('tweets', options['tweets'], start)
+
+    def report(self, name, count, start):
+        elapsed = time.perf_counter() - start
+        rate = count / elapsed if elapsed else 0
+        self.stdout.write(f'Seeded {count} {name} in {elapsed:.1f}s ({rate:.0f}/s).')
@@ -0,0 +1,219 @@
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FLUSH_INTERVAL = 5
+
+HELP = {
+    'django_request_duration_seconds': ('histogram', 'Time spent handling requests.'),
+    'django_db_queries_total': ('counter', 'Database queries run by requests.'),
+    'django_db_query_duration_seconds_total': ('counter', 'Time spent in database queries.'),
+    'django_template_render_duration_seconds': ('histogram', 'Time spent rendering templates.'),
+    'django_login_throttled_total': ('counter', 'Login attempts rejected by the throttle.'),
+    'django_login_duration_seconds': ('histogram', 'Time spent checking login credentials.'),
+}
+
+current_request = ContextVar('current_request', default=None)
+_registry = None
+_registry_lock = threading.Lock()
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.template_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.query_time += time.perf_counter() - start
+
+
+def count_queries(execute, sql, params, many, context):
+    metrics = current_request.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def instrument_connection(sender, connection, **kwargs):
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, count_queries)
+
+
+class Registry:
+    def __init__(self, directory=None):
+        self._directory = directory
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._reset()
+
+    def inc(self, name, labels, value=1):
+        with self._lock:
+            self._check_fork()
+            key = (name, labels)
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        with self._lock:
+            self._check_fork()
+            key = (name, labels)
+            histogram = self._histograms.setdefault(key, [[0] * len(BUCKETS), 0.0, 0])
+            for index, bound in enumerate(BUCKETS):
+                if value <= bound:
+                    histogram[0][index] += 1
+                    break
+            histogram[1] += value
+            histogram[2] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'counters': [
+                    [name, list(labels), value] for (name, labels), value in self._counters.items()
+                ],
+                'histograms': [
+                    [name, list(labels), list(buckets), total, count]
+                    for (name, labels), (buckets, total, count) in self._histograms.items()
+                ],
+            }
+
+    def flush(self, force=False):
+        if not self._directory or not (force or time.monotonic() >= self._flush_at):
+            return
+        if not self._flush_lock.acquire(blocking=force):
+            return
+
+        try:
+            self._flush_at = time.monotonic() + FLUSH_INTERVAL
+            os.makedirs(self._directory, exist_ok=True)
+            path = os.path.join(self._directory, f'{self._name}.json')
+            with open(f'{path}.tmp', 'w') as file:
+                json.dump(self.snapshot(), file)
+            os.replace(f'{path}.tmp', path)
+        finally:
+            self._flush_lock.release()
+
+    def collect(self):
+        if not self._directory:
+            return [self.snapshot()]
+
+        self.flush(force=True)
+        snapshots = []
+        for path in glob.glob(os.path.join(self._directory, '*.json')):
+            try:
+                with open(path) as file:
+                    snapshots.append(json.load(file))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._name = f'{self._pid}-{uuid.uuid4().hex}'
+        self._counters = {}
+        self._histograms = {}
+        self._flush_at = time.monotonic()
+
+
+class InstrumentedTemplates(DjangoTemplates):
+    def get_template(self, template_name):
+        return InstrumentedTemplate(super().get_template(template_name))
+
+
+class InstrumentedTemplate:
+    def __init__(self, template):
+        self._template = template
+
+    def __getattr__(self, name):
+        return getattr(self._template, name)
+
+    def render(self, context=None, request=None):
+        metrics = current_request.get()
+        if metrics is None:
+            return self._template.render(context, request)
+
+        start = time.perf_counter()
+        try:
+            return self._template.render(context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - start
+
+
+def record(view, duration, metrics):
+    labels, current = (('view', view),), registry()
+    current.observe('django_request_duration_seconds', labels, duration)
+    current.inc('django_db_queries_total', labels, metrics.queries)
+    current.inc('django_db_query_duration_seconds_total', labels, metrics.query_time)
+    if metrics.template_time:
+        current.observe('django_template_render_duration_seconds', labels, metrics.template_time)
+    current.flush()
+
+
+def exposition(snapshots):
+    counters, histograms = {}, {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, buckets, total, count in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.setdefault(key, [[0] * len(BUCKETS), 0.0, 0])
+            merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+            merged[1] += total
+            merged[2] += count
+
+    lines = []
+    for name, (kind, help) in HELP.items():
+        lines += [f'# HELP {name} {help}', f'# TYPE {name} {kind}']
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f'{name}{_labels(labels)} {_number(value)}')
+        for (metric, labels), (buckets, total, count) in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, observed in zip(BUCKETS, buckets):
+                cumulative += observed
+                lines.append(f'{name}_bucket{_labels(labels, le=bound)} {cumulative}')
+            lines.append(f'{name}_bucket{_labels(labels, le="+Inf")} {count}')
+            lines.append(f'{name}_sum{_labels(labels)} {_number(total)}')
+            lines.append(f'{name}_count{_labels(labels)} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+def registry():
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = Registry(settings.METRICS_DIR)
+        return _registry
+
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    escaped = (
+        (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in pairs
+    )
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
@@ -0,0 +1,109 @@
+import time
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from webapp.metrics import RequestMetrics, current_request, record
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        metrics, start = RequestMetrics(), time.perf_counter()
+        token = current_request.set(metrics)
+        try:
+            response = self.get_response(request)
+        except Exception:
+            _record(request, metrics, start)
+            raise
+        finally:
+            current_request.reset(token)
+        return _measure(request, response, metrics, start)
+
+    async def __acall__(self, request):
+        metrics, start = RequestMetrics(), time.perf_counter()
+        token = current_request.set(metrics)
+        try:
+            response = await self.get_response(request)
+        except Exception:
+            _record(request, metrics, start)
+            raise
+        finally:
+            current_request.reset(token)
+        return _measure(request, response, metrics, start)
+
+
+# Streaming responses do their work while the server reads them, so they are
+# measured until the response is closed. Files are left as they are so the
+# WSGI server can still hand them to wsgi.file_wrapper (sendfile).
+def _measure(request, response, metrics, start):
+    if not response.streaming:
+        _record(request, metrics, start)
+        return response
+
+    finish = partial(_record, request, metrics, start)
+    if getattr(response, 'file_to_stream', None) is not None:
+        response._resource_closers.append(finish)
+        return response
+
+    stream = _AsyncMeasuredStream if response.is_async else _MeasuredStream
+    response.streaming_content = stream(response.streaming_content, metrics, finish)
+    return response
+
+
+def _record(request, metrics, start):
+    duration = time.perf_counter() - start
+    match = request.resolver_match
+    record(match.view_name if match else '<unresolved>', duration, metrics)
+
+
+class _Stream:
+    def __init__(self, content, metrics, finish):
+        self._content = content
+        self._metrics = metrics
+        self._finish = finish
+
+    def close(self):
+        finish, self._finish = self._finish, None
+        if finish is not None:
+            finish()
+
+
+class _MeasuredStream(_Stream):
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        token = current_request.set(self._metrics)
+        try:
+            return next(self._content)
+        except StopIteration:
+            self.close()
+            raise
+        finally:
+            current_request.reset(token)
+
+
+class _AsyncMeasuredStream(_Stream):
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        token = current_request.set(self._metrics)
+        try:
+            return await anext(self._content)
+        except StopAsyncIteration:
+            self.close()
+            raise
+        finally:
+            current_request.reset(token)
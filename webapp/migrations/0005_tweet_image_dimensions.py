@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0004_like'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tweet',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='tweet',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='tweet',
+            name='image',
+            field=models.ImageField(blank=True, height_field='image_height', upload_to='attachments/', width_field='image_width'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:57
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0007_follow_timeline_entry'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tweet',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='tweet_user_timeline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tweet',
+            index=models.Index(condition=models.Q(models.Q(('image', ''), _negated=True), models.Q(('image_width', None), ('image_hash', ''), _connector='OR')), fields=['id'], name='tweet_pending_image_idx'),
+        ),
+        migrations.AlterField(
+            model_name='tweet',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
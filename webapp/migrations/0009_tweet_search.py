@@ -0,0 +1,55 @@
+from django.db import migrations
+
+POSTGRESQL_FORWARDS = [
+    "ALTER TABLE webapp_tweet ADD COLUMN search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('english', message)) STORED",
+    "CREATE INDEX tweet_search_idx ON webapp_tweet USING GIN (search_vector)",
+]
+
+POSTGRESQL_BACKWARDS = [
+    "DROP INDEX tweet_search_idx",
+    "ALTER TABLE webapp_tweet DROP COLUMN search_vector",
+]
+
+SQLITE_FORWARDS = [
+    "CREATE VIRTUAL TABLE webapp_tweet_fts USING fts5("
+    "message, content='webapp_tweet', content_rowid='id')",
+    "INSERT INTO webapp_tweet_fts(webapp_tweet_fts) VALUES ('rebuild')",
+    "CREATE TRIGGER webapp_tweet_fts_insert AFTER INSERT ON webapp_tweet BEGIN "
+    "INSERT INTO webapp_tweet_fts(rowid, message) VALUES (new.id, new.message); END",
+    "CREATE TRIGGER webapp_tweet_fts_delete AFTER DELETE ON webapp_tweet BEGIN "
+    "INSERT INTO webapp_tweet_fts(webapp_tweet_fts, rowid, message) "
+    "VALUES ('delete', old.id, old.message); END",
+    "CREATE TRIGGER webapp_tweet_fts_update AFTER UPDATE OF message ON webapp_tweet BEGIN "
+    "INSERT INTO webapp_tweet_fts(webapp_tweet_fts, rowid, message) "
+    "VALUES ('delete', old.id, old.message); "
+    "INSERT INTO webapp_tweet_fts(rowid, message) VALUES (new.id, new.message); END",
+]
+
+SQLITE_BACKWARDS = [
+    "DROP TRIGGER webapp_tweet_fts_update",
+    "DROP TRIGGER webapp_tweet_fts_delete",
+    "DROP TRIGGER webapp_tweet_fts_insert",
+    "DROP TABLE webapp_tweet_fts",
+]
+
+
+def run(statements):
+    def execute(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return execute
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0008_tweet_profile_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'postgresql': POSTGRESQL_FORWARDS, 'sqlite': SQLITE_FORWARDS}),
+            run({'postgresql': POSTGRESQL_BACKWARDS, 'sqlite': SQLITE_BACKWARDS}),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:38
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+import webapp.models.user
+
+
+def count_tweets(apps, schema_editor):
+    User = apps.get_model('webapp', 'User')
+    Tweet = apps.get_model('webapp', 'Tweet')
+    tweets = Tweet.objects.filter(user=OuterRef('pk')).order_by().values('user')
+    User.objects.update(
+        tweet_count=Coalesce(Subquery(tweets.annotate(count=Count('id')).values('count')), 0),
+        likes_received=Coalesce(Subquery(tweets.annotate(total=Sum('likes')).values('total')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0009_tweet_search'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', webapp.models.user.UserManager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='likes_received',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='tweet_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_tweets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:54
+
+from django.db import migrations, models
+import webapp.uploads
+
+# SQLite rebuilds webapp_tweet to alter the image field, which drops the
+# triggers 0009 created to keep the search index up to date.
+SQLITE_TRIGGERS = [
+    "CREATE TRIGGER webapp_tweet_fts_insert AFTER INSERT ON webapp_tweet BEGIN "
+    "INSERT INTO webapp_tweet_fts(rowid, message) VALUES (new.id, new.message); END",
+    "CREATE TRIGGER webapp_tweet_fts_delete AFTER DELETE ON webapp_tweet BEGIN "
+    "INSERT INTO webapp_tweet_fts(webapp_tweet_fts, rowid, message) "
+    "VALUES ('delete', old.id, old.message); END",
+    "CREATE TRIGGER webapp_tweet_fts_update AFTER UPDATE OF message ON webapp_tweet BEGIN "
+    "INSERT INTO webapp_tweet_fts(webapp_tweet_fts, rowid, message) "
+    "VALUES ('delete', old.id, old.message); "
+    "INSERT INTO webapp_tweet_fts(rowid, message) VALUES (new.id, new.message); END",
+]
+
+
+def create_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in SQLITE_TRIGGERS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0010_user_profile_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, create_triggers),
+        migrations.AlterField(
+            model_name='tweet',
+            name='image',
+            field=models.ImageField(blank=True, height_field='image_height', upload_to=webapp.uploads.ContentAddressed('attachments', 'image'), width_field='image_width'),
+        ),
+        migrations.RunPython(create_triggers, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='user',
+            name='avatar',
+            field=models.ImageField(default='default_avatar.png', help_text='Square images under 128KB with transparent backgrounds work best.', upload_to=webapp.uploads.ContentAddressed('avatars', 'avatar')),
+        ),
+    ]
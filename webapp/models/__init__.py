@@ -1,2 +1,5 @@
+from .follow import Follow
+from .like import Like
+from .timeline_entry import TimelineEntry
 from .tweet import Tweet
 from .user import User
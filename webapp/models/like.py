@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.db import models
+
+from .tweet import Tweet
+
+
+class Like(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    tweet = models.ForeignKey(Tweet, on_delete=models.CASCADE)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'tweet'], name='unique_like'),
+        ]
+
+    def __str__(self):
+        return f'{self.user.username} likes {self.tweet_id}'
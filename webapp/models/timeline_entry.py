@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.db import models
+
+from .tweet import Tweet
+
+
+class TimelineEntry(models.Model):
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    tweet = models.ForeignKey(Tweet, on_delete=models.CASCADE)
+
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'tweet'], name='unique_timeline_entry'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['owner', '-created_at', '-tweet'], name='timeline_entry_owner_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.owner_id}: {self.tweet_id}'
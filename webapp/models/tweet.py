@@ -1,22 +1,91 @@
 from django.conf import settings
-from django.db import models
+from django.contrib.auth import get_user_model
+from django.db import models, transaction
+from django.db.models import Case, F, When
+
+from webapp.uploads import ContentAddressed
+
+
+class TweetQuerySet(models.QuerySet):
+    def with_authors(self):
+        return self.select_related('user')
+
+    def add_likes(self, deltas):
+        likes = Case(*[When(pk=id, then=F('likes') + delta) for id, delta in deltas.items()])
+        with transaction.atomic(savepoint=False):
+            updated = self.filter(pk__in=deltas.keys()).update(likes=likes)
+            if updated:
+                get_user_model().objects.add_likes_received(deltas)
+        return updated
+
+    def delete(self):
+        with transaction.atomic(savepoint=False):
+            removed = {}
+            for user_id, likes in self.select_for_update().values_list('user_id', 'likes'):
+                count, total = removed.get(user_id, (0, 0))
+                removed[user_id] = (count + 1, total + likes)
+            deleted = super().delete()
+            get_user_model().objects.remove_tweets(removed)
+        return deleted
 
 
 class Tweet(models.Model):
     TRUNCATED_MESSAGE_LENGTH = 40
+    IMAGE_WIDTHS = [320, 640, 1024]
 
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_index=False)
 
     message = models.TextField()
-    image = models.ImageField(upload_to='attachments/', blank=True)
+    image = models.ImageField(
+        upload_to=ContentAddressed('attachments', 'image'), blank=True,
+        width_field='image_width', height_field='image_height'
+    )
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_hash = models.CharField(max_length=64, blank=True, editable=False)
     likes = models.IntegerField(default=0)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TweetQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='tweet_timeline_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='tweet_user_timeline_idx'),
+            models.Index(
+                fields=['id'], name='tweet_pending_image_idx',
+                condition=(
+                    ~models.Q(image='') & (models.Q(image_width=None) | models.Q(image_hash=''))
+                ),
+            ),
+        ]
+
     @classmethod
     def fields(cls):
-        return list(map(lambda field: field.attname, cls._meta.fields))[2:-3]
+        return ['message', 'image']
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            if adding:
+                self._add_to_author(1, self.likes)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            likes = Tweet.objects.select_for_update().values_list('likes', flat=True).get(
+                pk=self.pk
+            )
+            deleted = super().delete(*args, **kwargs)
+            get_user_model().objects.remove_tweets({self.user_id: (1, likes)})
+        return deleted
+
+    def _add_to_author(self, tweets, likes):
+        get_user_model().objects.filter(pk=self.user_id).update(
+            tweet_count=F('tweet_count') + tweets, likes_received=F('likes_received') + likes
+        )
 
     def __str__(self):
         return f'{self.user.username}: {self.message[:self.TRUNCATED_MESSAGE_LENGTH]}...'
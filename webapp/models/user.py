@@ -1,11 +1,69 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager as DjangoUserManager
 from django.db import models
+from django.db.models import (
+    Case, Count, F, Func, IntegerField, OuterRef, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Coalesce, Greatest
 from django.utils.translation import gettext as _
 
+from webapp.uploads import ContentAddressed
+from webapp.user_cache import forget_user
+
+from .tweet import Tweet
+
+
+class UserQuerySet(models.QuerySet):
+    def add_tweets(self, counts):
+        if not counts:
+            return 0
+        ids = {}
+        for id, count in counts.items():
+            ids.setdefault(count, []).append(id)
+        tweets = Case(*[
+            When(pk__in=group, then=F('tweet_count') + count) for count, group in ids.items()
+        ])
+        return self.filter(pk__in=counts.keys()).update(tweet_count=tweets)
+
+    def remove_tweets(self, removed):
+        if not removed:
+            return 0
+        tweets = Case(*[
+            When(pk=id, then=Greatest(F('tweet_count') - count, 0))
+            for id, (count, _) in removed.items()
+        ])
+        likes = Case(*[
+            When(pk=id, then=F('likes_received') - total) for id, (_, total) in removed.items()
+        ])
+        return self.filter(pk__in=removed.keys()).update(tweet_count=tweets, likes_received=likes)
+
+    def recount(self):
+        tweets = Tweet.objects.filter(user=OuterRef('pk')).order_by().values('user')
+        counted = Coalesce(Subquery(tweets.annotate(count=Count('id')).values('count')), 0)
+        received = Coalesce(Subquery(tweets.annotate(total=Sum('likes')).values('total')), 0)
+        return self.exclude(tweet_count=counted, likes_received=received).update(
+            tweet_count=counted, likes_received=received
+        )
+
+    def add_likes_received(self, deltas):
+        delta = Case(*[When(pk=id, then=Value(delta)) for id, delta in deltas.items()])
+        tweets = Tweet.objects.filter(pk__in=deltas.keys())
+        received = tweets.filter(user=OuterRef('pk')).order_by().annotate(
+            total=Func(delta, function='SUM', output_field=IntegerField())
+        ).values('total')
+        return self.filter(pk__in=tweets.values('user')).update(
+            likes_received=F('likes_received') + Subquery(received)
+        )
+
+
+class UserManager(DjangoUserManager.from_queryset(UserQuerySet)):
+    pass
+
 
 class User(AbstractUser):
     MAXIMUM_LENGTH = 128
     DEFAULT_AVATAR = 'default_avatar.png'
+    AVATAR_WIDTHS = [64, 128]
+    COUNTERS = ['follower_count', 'tweet_count', 'likes_received']
 
     username = models.CharField(max_length=MAXIMUM_LENGTH, unique=True)
     email = models.CharField(max_length=MAXIMUM_LENGTH, unique=True)
@@ -15,11 +73,20 @@ class User(AbstractUser):
     is_superuser = models.BooleanField(default=False)
 
     display_name = models.CharField(max_length=MAXIMUM_LENGTH)
-    avatar = models.ImageField(upload_to='avatars/', default=DEFAULT_AVATAR, help_text=_('avatar_help_text'))
+    avatar = models.ImageField(
+        upload_to=ContentAddressed('avatars', 'avatar'), default=DEFAULT_AVATAR,
+        help_text=_('avatar_help_text')
+    )
+    avatar_hash = models.CharField(max_length=64, blank=True, editable=False)
+    follower_count = models.PositiveIntegerField(default=0, editable=False)
+    tweet_count = models.PositiveIntegerField(default=0, editable=False)
+    likes_received = models.IntegerField(default=0, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = UserManager()
+
     USERNAME_FIELD = 'username'
     EMAIL_FIELD = 'email'
     REQUIRED_FIELDS = ['email', 'password', 'display_name']
@@ -34,3 +101,20 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.username
+
+    def save(self, *args, **kwargs):
+        # The counters are only changed with F() updates, which a copy of the user
+        # loaded earlier (e.g. request.user) must not write its old values over.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTERS
+            ]
+        super().save(*args, **kwargs)
+        forget_user(self.pk)
+
+    def delete(self, *args, **kwargs):
+        id = self.pk
+        deleted = super().delete(*args, **kwargs)
+        forget_user(id)
+        return deleted
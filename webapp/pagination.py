@@ -0,0 +1,91 @@
+from datetime import datetime
+
+from django.core.exceptions import SuspiciousOperation
+from django.db.models import Q
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+
+class Page:
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+class KeysetPaginator:
+    PAGE_SIZE = 20
+    SEPARATOR = '|'
+    KEY_FIELD = 'created_at'
+
+    def __init__(self, queryset, page_size=None, id_field='id'):
+        self._queryset = queryset.order_by(f'-{self.KEY_FIELD}', f'-{id_field}')
+        self._page_size = page_size or self.PAGE_SIZE
+        self._id_field = id_field
+
+    def page(self, cursor=None):
+        return self._page(list(self.query(cursor)))
+
+    async def apage(self, cursor=None):
+        return self._page([item async for item in self.query(cursor)])
+
+    def query(self, cursor=None):
+        queryset = self._queryset
+        if cursor:
+            key, id = self.decode(cursor)
+            queryset = queryset.filter(self.older_than(key, id, self._id_field))
+        return queryset[:self._page_size + 1]
+
+    def _page(self, items):
+        if len(items) <= self._page_size:
+            return Page(items, None)
+
+        items = items[:self._page_size]
+        return Page(items, self.encode(items[-1], self._id_field))
+
+    @classmethod
+    def older_than(cls, key, id, id_field='id'):
+        return (
+            Q(**{f'{cls.KEY_FIELD}__lt': key}) |
+            Q(**{cls.KEY_FIELD: key, f'{id_field}__lt': id})
+        )
+
+    @classmethod
+    def encode(cls, item, id_field='id'):
+        return cls.cursor(getattr(item, cls.KEY_FIELD), getattr(item, id_field))
+
+    @classmethod
+    def cursor(cls, key, id):
+        return urlsafe_base64_encode(f'{cls.encode_key(key)}{cls.SEPARATOR}{id}'.encode())
+
+    @classmethod
+    def decode(cls, cursor):
+        try:
+            key, id = urlsafe_base64_decode(cursor).decode().split(cls.SEPARATOR)
+            return cls.decode_key(key), int(id)
+        except ValueError:
+            raise SuspiciousOperation('Invalid cursor')
+
+    @staticmethod
+    def encode_key(value):
+        return value.isoformat()
+
+    @staticmethod
+    def decode_key(text):
+        return datetime.fromisoformat(text)
+
+
+class RankPaginator(KeysetPaginator):
+    KEY_FIELD = 'rank'
+
+    @staticmethod
+    def encode_key(value):
+        return repr(value)
+
+    @staticmethod
+    def decode_key(text):
+        return float(text)
@@ -1,10 +1,22 @@
+from webapp.images import density_srcset, width_srcset
+
+
 class TweetPresenter:
+    CACHE_TIMEOUT = 60 * 60
+
     def __init__(self, tweet):
         self._tweet = tweet
 
     def id(self):
         return self._tweet.id
 
+    def cache_version(self):
+        tweet, user = self._tweet, self._tweet.user
+        return ':'.join(map(str, [
+            tweet.id, tweet.updated_at.timestamp(), tweet.image_hash,
+            user.id, user.updated_at.timestamp(), user.avatar_hash,
+        ]))
+
     def username(self):
         return self._tweet.user.username
 
@@ -14,6 +26,10 @@ class TweetPresenter:
     def avatar_url(self):
         return self._tweet.user.avatar.url
 
+    def avatar_srcset(self):
+        user = self._tweet.user
+        return density_srcset(user.avatar, user.avatar_hash, user.AVATAR_WIDTHS)
+
     def message(self):
         return self._tweet.message
 
@@ -23,11 +39,15 @@ class TweetPresenter:
     def image_url(self):
         return self._tweet.image.url
 
+    def image_srcset(self):
+        tweet = self._tweet
+        return width_srcset(tweet.image, tweet.image_hash, tweet.IMAGE_WIDTHS, tweet.image_width)
+
     def image_width(self):
-        return self._tweet.image.width
+        return self._tweet.image_width
 
     def image_height(self):
-        return self._tweet.image.height
+        return self._tweet.image_height
 
     def image_alt_text(self):
         pass
@@ -0,0 +1,47 @@
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Value
+from django.db.models.expressions import RawSQL
+
+from webapp.models.tweet import Tweet
+
+SEARCH_CONFIG = 'english'
+FTS_TABLE = 'webapp_tweet_fts'
+
+
+def search_tweets(query):
+    tweets = Tweet.objects.with_authors()
+    terms = re.findall(r'\w+', query)
+    if not terms:
+        return tweets.none().annotate(rank=Value(0.0, FloatField()))
+
+    if connection.vendor == 'postgresql':
+        return _postgresql_search(tweets, query)
+    if connection.vendor == 'sqlite':
+        return _sqlite_search(tweets, terms)
+    return _fallback_search(tweets, terms)
+
+
+def _postgresql_search(tweets, query):
+    tsquery = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+    matches = RawSQL(f'webapp_tweet.search_vector @@ {tsquery}', [query], BooleanField())
+    rank = RawSQL(f'ts_rank(webapp_tweet.search_vector, {tsquery})::float8', [query], FloatField())
+    return tweets.filter(matches).annotate(rank=rank)
+
+
+def _sqlite_search(tweets, terms):
+    match = ' '.join(f'"{term}"' for term in terms)
+    matches = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+    rank = RawSQL(
+        f'SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s AND rowid = webapp_tweet.id',
+        [match], FloatField()
+    )
+    return tweets.filter(id__in=matches).annotate(rank=rank)
+
+
+def _fallback_search(tweets, terms):
+    for term in terms:
+        tweets = tweets.filter(message__icontains=term)
+    return tweets.annotate(rank=Value(1.0, FloatField()))
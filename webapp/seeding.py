@@ -0,0 +1,54 @@
+from array import array
+from collections import Counter
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Max
+
+from webapp.models.tweet import Tweet
+
+BATCH_SIZE = 5000
+PASSWORD = 'password'
+WORDS = (
+    'django twitter python timeline tweet like follow image search stream cache index '
+    'query page cursor async batch metrics profile avatar message hello world'
+).split()
+
+
+def seed_users(count, batch_size=BATCH_SIZE):
+    User = get_user_model()
+    offset = (User.objects.aggregate(Max('pk'))['pk__max'] or 0) + 1
+    password = make_password(PASSWORD)
+    users = (
+        User(
+            username=f'seed{number}', email=f'seed{number}@example.org',
+            display_name=f'Seed User {number}', password=password,
+        )
+        for number in range(offset, offset + count)
+    )
+    _insert(User, users, batch_size)
+
+    ids = User.objects.filter(pk__gte=offset).order_by('pk').values_list('pk', flat=True)
+    return array('q', ids.iterator(chunk_size=batch_size))
+
+
+def seed_tweets(count, user_ids, random, batch_size=BATCH_SIZE):
+    tweets = (
+        Tweet(user_id=random.choice(user_ids), message=' '.join(random.choices(WORDS, k=8)))
+        for _ in range(count)
+    )
+    _insert(Tweet, tweets, batch_size, _count_tweets)
+
+
+def _insert(model, objects, batch_size, inserted=None):
+    while batch := list(islice(objects, batch_size)):
+        with transaction.atomic():
+            model.objects.bulk_create(batch, batch_size=batch_size)
+            if inserted:
+                inserted(batch)
+
+
+def _count_tweets(tweets):
+    get_user_model().objects.add_tweets(Counter(tweet.user_id for tweet in tweets))
@@ -2,7 +2,6 @@ class UI {
   constructor(ui, client) {
     this._list = document.getElementById(ui.listId);
     this._button = document.querySelector(ui.buttonQuery);
-    this._text = document.querySelector(ui.textQuery);
 
     this._before = ui.beforeClass;
     this._after = ui.afterClass;
@@ -12,17 +11,16 @@ class UI {
 
   initialize() {
     this._list?.addEventListener('click', (event) => {
-      if (event.target.tagName.toLowerCase() != 'button') { return; }
+      const button = event.target.closest('button');
+      if (!button) { return; }
 
       event.preventDefault();
-      this._button = event.target;
-      this._text = event.target.querySelector('span');
-      this._client.post(this._button.getAttribute('data-id'));
+      this._like(button);
     });
 
     this._button?.addEventListener('click', (event) => {
       event.preventDefault();
-      this._client.post(this._button.getAttribute('data-id'));
+      this._like(this._button);
     });
 
     document.addEventListener('dataReady', (event) => {
@@ -30,27 +28,69 @@ class UI {
     });
   }
 
+  _like(button) {
+    const liked = button.hasAttribute('data-liked');
+    const delta = liked ? -1 : 1;
+    const likes = parseInt(button.querySelector('span').textContent, 10) + delta;
+
+    button.toggleAttribute('data-liked', !liked);
+    this._render(button, likes);
+    this._client.post(button.getAttribute('data-id'), delta);
+  }
+
   _updateLikes(data) {
     if (data.error) { return; }
 
-    this._text.textContent = data.likes;
-    this._button.classList.replace(this._before, this._after);
+    document.querySelectorAll(`button[data-id="${data.id}"]`).forEach((button) => {
+      if ('liked' in data) { button.toggleAttribute('data-liked', data.liked); }
+      this._render(button, data.likes);
+    });
+  }
+
+  _render(button, likes) {
+    button.querySelector('span').textContent = likes;
+    if (likes == 0) {
+      button.classList.replace(this._after, this._before);
+    } else {
+      button.classList.replace(this._before, this._after);
+    }
   }
 }
 
 class Client {
-  post(id) {
-    fetch(this._request(id))
+  constructor(delay) {
+    this._delay = delay;
+    this._deltas = new Map();
+    this._timer = null;
+  }
+
+  // Clicks are collected until none has happened for `delay` milliseconds and
+  // then sent together, so liking down a timeline costs a single request.
+  post(id, delta) {
+    this._deltas.set(id, (this._deltas.get(id) || 0) + delta);
+    clearTimeout(this._timer);
+    this._timer = setTimeout(() => this.flush(), this._delay);
+  }
+
+  flush() {
+    clearTimeout(this._timer);
+    const likes = Array.from(this._deltas, ([id, delta]) => ({ 'id': Number(id), 'delta': delta }))
+      .filter((like) => like.delta != 0);
+    this._deltas.clear();
+    if (likes.length == 0) { return; }
+
+    fetch(this._request(likes))
       .then((response) => response.json())
-      .then((data) => this._emit(data))
+      .then((data) => (data.tweets || []).forEach((tweet) => this._emit(tweet)));
   }
 
-  _request(id) {
+  _request(likes) {
     return new Request('/tweets/likes', {
       method: 'POST',
       headers: {'X-CSRFToken': Cookies.get('csrftoken')},
       mode: 'same-origin', // Do not send CSRF token to another domain.
-      body: JSON.stringify({ 'id': id })
+      keepalive: true, // Let the last batch finish when leaving the page.
+      body: JSON.stringify({ 'likes': likes })
     });
   }
 
@@ -61,15 +101,47 @@ class Client {
   }
 }
 
+class LikeStream {
+  constructor(url) {
+    this._url = url;
+  }
+
+  // Listens for new like counts of the tweets on the page and hands each one
+  // to the same dataReady event the like buttons use. Under WSGI the server
+  // answers with the current counts and the browser reconnects to poll again.
+  open(ids) {
+    if (ids.length == 0 || !window.EventSource) { return; }
+
+    const source = new EventSource(`${this._url}?ids=${ids.join(',')}`);
+    source.addEventListener('message', (event) => {
+      Object.entries(JSON.parse(event.data)).forEach(([id, likes]) => {
+        this._emit({ 'id': Number(id), 'likes': likes });
+      });
+    });
+    window.addEventListener('pagehide', () => source.close());
+  }
+
+  _emit(data) {
+    document.dispatchEvent(
+      new CustomEvent('dataReady', { detail: data })
+    );
+  }
+}
+
 (function() {
   window.addEventListener('load', () => {
     const ui = {
       listId: 'tweets-list',
       buttonQuery: '#single-tweet button',
-      textQuery: '#single-tweet button span',
       beforeClass: 'tweet-footer__likes',
       afterClass: 'tweet-footer__liked'
     };
-    (new UI(ui, new Client())).initialize();
+    const client = new Client(500);
+    (new UI(ui, client)).initialize();
+    window.addEventListener('pagehide', () => client.flush());
+
+    const buttons = document.querySelectorAll('button[data-id]');
+    const ids = new Set(Array.from(buttons, (button) => button.getAttribute('data-id')));
+    (new LikeStream('/tweets/likes/stream')).open([...ids]);
   });
 })();
@@ -1,12 +1,16 @@
 import os
+import shutil
 from django.conf import settings
 
 
 def clean_uploads():
-    avatars = os.path.join(settings.MEDIA_ROOT, 'avatars')
-    for image in os.listdir(avatars):
-        os.remove(os.path.join(avatars, image))
+    for directory in ['avatars', 'attachments']:
+        directory = os.path.join(settings.MEDIA_ROOT, directory)
+        for entry in os.listdir(directory):
+            path = os.path.join(directory, entry)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
 
-    attachments = os.path.join(settings.MEDIA_ROOT, 'attachments')
-    for image in os.listdir(attachments):
-        os.remove(os.path.join(attachments, image))
+    shutil.rmtree(os.path.join(settings.MEDIA_ROOT, 'derivatives'), ignore_errors=True)
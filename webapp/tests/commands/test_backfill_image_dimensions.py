@@ -0,0 +1,36 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from webapp.models.tweet import Tweet
+from webapp.tests.cleanup import clean_uploads
+from webapp.tests.factories.tweet import TweetFactory
+from webapp.tests.factories.user import UserFactory
+
+
+class BackfillImageDimensionsTests(TestCase):
+    def setUp(self):
+        user = UserFactory()
+        self.tweets = [TweetFactory(user=user, image__width=40, image__height=30) for _ in range(3)]
+        missing = TweetFactory(user=user, image=None)
+        Tweet.objects.filter(pk=missing.id).update(image='attachments/missing.png')
+        Tweet.objects.update(image_width=None, image_height=None)
+
+    def tearDown(self):
+        clean_uploads()
+
+    def backfill(self):
+        output, errors = StringIO(), StringIO()
+        call_command('backfill_image_dimensions', '--batch-size', '2', stdout=output, stderr=errors)
+        return output.getvalue(), errors.getvalue()
+
+    def test_stores_dimensions_of_existing_images(self):
+        self.backfill()
+        dimensions = Tweet.objects.filter(pk__in=[tweet.id for tweet in self.tweets])
+        self.assertEqual(set(dimensions.values_list('image_width', 'image_height')), {(40, 30)})
+
+    def test_skips_images_that_can_not_be_read(self):
+        output, errors = self.backfill()
+        self.assertIn('Stored dimensions of 3 images, 1 could not be read.', output)
+        self.assertIn('attachments/missing.png', errors)
@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from webapp import urls
+
+
+class BenchmarkTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, 'benchmark.json')
+        call_command(
+            'benchmark', '--current-database', '--sizes', '40,20', '--tweets-per-user', '4',
+            '--requests', '2', '--output', cls.path, stdout=StringIO()
+        )
+        with open(cls.path) as file:
+            cls.results = json.load(file)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+        super().tearDownClass()
+
+    def test_benchmarks_every_size_in_increasing_order(self):
+        sizes = [(size['users'], size['tweets']) for size in self.results['sizes']]
+        self.assertEqual(sizes, [(5, 20), (10, 40)])
+
+    def test_benchmarks_every_named_route(self):
+        names = {pattern.name for pattern in urls.urlpatterns if pattern.name}
+        for size in self.results['sizes']:
+            self.assertEqual(set(size['routes']), names)
+
+    def test_reports_latency_and_queries(self):
+        route = self.results['sizes'][0]['routes']['tweets_index']
+        self.assertEqual((route['method'], route['status']), ('GET', 200))
+        self.assertLessEqual(route['p50_ms'], route['p99_ms'])
+        self.assertGreater(route['queries'], 0)
+
+    def test_consumes_streaming_responses(self):
+        self.assertGreater(self.results['sizes'][0]['routes']['api_tweets']['queries'], 0)
+
+    def test_routes_respond_without_errors(self):
+        for name, route in self.results['sizes'][-1]['routes'].items():
+            if 'skipped' not in route:
+                self.assertLess(route['status'], 400, name)
+
+    def test_polls_the_likes_stream(self):
+        self.assertEqual(self.results['sizes'][0]['routes']['tweets_likes_stream']['status'], 200)
+
+    def test_needs_two_requests_for_percentiles(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark', '--current-database', '--requests', '1')
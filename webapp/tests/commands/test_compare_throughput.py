@@ -0,0 +1,18 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+
+class CompareThroughputTests(SimpleTestCase):
+    def test_reports_requests_per_second_for_every_mode(self):
+        output = StringIO()
+        path = reverse('tweets_new')
+        call_command(
+            'compare_throughput', '--path', path, '--requests', '2', '--concurrency', '2',
+            stdout=output
+        )
+        for mode in ['WSGI, sync views', 'ASGI, sync views', 'ASGI, async views']:
+            self.assertRegex(output.getvalue(), rf'{path} {mode}: [\d.]+ requests/s\n')
+        self.assertNotIn('failed', output.getvalue())
@@ -0,0 +1,25 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from webapp.tests.factories.tweet import TweetFactory
+from webapp.tests.factories.user import UserFactory
+
+
+class ExplainQueriesTests(TestCase):
+    def explain(self, *args):
+        output = StringIO()
+        call_command('explain_queries', *args, stdout=output)
+        return output.getvalue()
+
+    def test_reports_every_hot_query(self):
+        TweetFactory(user=UserFactory(username='explained'), message='explained', image=None)
+        output = self.explain('--username', 'explained')
+        for name in ['tweets_index', 'tweets_show', 'tweets_home', 'users_show', 'tweets_search']:
+            self.assertIn(f'{name}:', output)
+
+    def test_errors_without_data(self):
+        with self.assertRaises(CommandError):
+            self.explain()
@@ -0,0 +1,65 @@
+import json
+import os
+import tempfile
+import zipfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from webapp.tests.factories.tweet import TweetFactory
+from webapp.tests.factories.user import UserFactory
+
+
+class ExportArchivesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [UserFactory(avatar='default_avatar.png') for _ in range(3)]
+        for user in cls.users:
+            TweetFactory(user=user, message=f'Tweet by {user.username}', image=None)
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def export(self, *arguments):
+        output = StringIO()
+        call_command('export_archives', self.directory.name, '--workers', '1', *arguments,
+                     stdout=output)
+        return output.getvalue()
+
+    def path(self, user, format='zip'):
+        return os.path.join(self.directory.name, f'{user.pk}-{user.username}.{format}')
+
+    def test_writes_an_archive_per_user(self):
+        self.export()
+        self.assertEqual(
+            sorted(os.listdir(self.directory.name)),
+            sorted(f'{user.pk}-{user.username}.zip' for user in self.users)
+        )
+
+    def test_keeps_archives_inside_the_directory(self):
+        user = UserFactory(username='../../escaped', avatar='default_avatar.png')
+        self.export()
+        self.assertIn(f'{user.pk}-....escaped.zip', os.listdir(self.directory.name))
+
+    def test_archives_contain_the_user_tweets(self):
+        self.export()
+        user = self.users[1]
+        with zipfile.ZipFile(self.path(user)) as archive:
+            tweets = archive.read('tweets.jsonl').splitlines()
+        self.assertEqual([json.loads(tweet)['message'] for tweet in tweets],
+                         [f'Tweet by {user.username}'])
+
+    def test_writes_jsonl_archives(self):
+        self.export('--format', 'jsonl')
+        user = self.users[0]
+        with open(self.path(user, 'jsonl')) as file:
+            self.assertEqual(json.loads(file.readline())['user']['username'], user.username)
+
+    def test_reports_exported_archives(self):
+        self.assertRegex(self.export(), r'Exported 3 archives, \d+ bytes, in [\d.]+s\.')
+
+    def test_needs_a_worker(self):
+        with self.assertRaises(CommandError):
+            self.export('--workers', '0')
@@ -0,0 +1,32 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from webapp.models.tweet import Tweet
+from webapp.tests.cleanup import clean_uploads
+from webapp.tests.factories.tweet import TweetFactory
+from webapp.tests.factories.user import UserFactory
+
+
+@override_settings(IMAGE_DERIVATIVE_WORKERS=0)
+class GenerateDerivativesTests(TestCase):
+    def setUp(self):
+        self.tweet = TweetFactory(user=UserFactory(), image__width=800, image__height=400)
+
+    def tearDown(self):
+        clean_uploads()
+
+    def generate(self):
+        output = StringIO()
+        call_command('generate_derivatives', stdout=output, stderr=StringIO())
+        return output.getvalue()
+
+    def test_stores_content_hash_of_tweet_images(self):
+        self.generate()
+        self.assertEqual(len(Tweet.objects.get(pk=self.tweet.id).image_hash), 64)
+
+    def test_reports_generated_derivatives(self):
+        output = self.generate()
+        self.assertIn('Generated derivatives of 1 tweets, 0 could not be read.', output)
+        self.assertIn('Generated derivatives of 1 users, 0 could not be read.', output)
@@ -0,0 +1,153 @@
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from webapp.importing import UsernameCache
+from webapp.models.tweet import Tweet
+from webapp.search import search_tweets
+from webapp.tests.factories.user import UserFactory
+
+
+class ImportTweetsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = UserFactory()
+        cls.other = UserFactory()
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, contents):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(contents)
+        return path
+
+    def row(self, message, **fields):
+        return {'username': self.author.username, 'message': message, **fields}
+
+    def jsonl(self, rows):
+        return self.write('tweets.jsonl', ''.join(json.dumps(row) + '\n' for row in rows))
+
+    def import_tweets(self, path, *arguments):
+        output = StringIO()
+        call_command('import_tweets', path, '--chunk-size', '2', *arguments, stdout=output)
+        return output.getvalue()
+
+    def test_imports_jsonl(self):
+        self.import_tweets(self.jsonl([
+            {'username': self.author.username, 'message': 'First'},
+            {'username': self.other.username, 'message': 'Second'},
+            {'username': self.author.username, 'message': 'Third'},
+        ]))
+        tweets = Tweet.objects.order_by('pk').values_list('user', 'message')
+        self.assertEqual(list(tweets), [
+            (self.author.id, 'First'), (self.other.id, 'Second'), (self.author.id, 'Third')
+        ])
+
+    def test_counts_imported_tweets_on_users(self):
+        self.import_tweets(self.jsonl([self.row('First'), self.row('Second'), self.row('Third')]))
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.tweet_count, 3)
+
+    def test_imports_csv(self):
+        path = self.write('tweets.csv', (
+            'username,message,created_at\n'
+            f'{self.author.username},"Hello, world",2015-03-01T10:00:00Z\n'
+        ))
+        self.import_tweets(path)
+        self.assertEqual(Tweet.objects.get().message, 'Hello, world')
+
+    def test_keeps_created_at(self):
+        self.import_tweets(self.jsonl([
+            self.row('Old', created_at='2015-03-01T10:00:00Z')
+        ]))
+        tweet = Tweet.objects.get()
+        self.assertEqual(tweet.created_at, datetime(2015, 3, 1, 10, tzinfo=timezone.utc))
+        self.assertEqual(tweet.updated_at, tweet.created_at)
+
+    def test_keeps_created_at_of_each_row(self):
+        self.import_tweets(self.jsonl([
+            self.row('First', created_at='2015-03-01T10:00:00Z'),
+            self.row('Second', created_at='2016-04-02T11:00:00Z'),
+        ]))
+        tweets = Tweet.objects.order_by('message')
+        years = tweets.values_list('created_at__year', 'updated_at__year')
+        self.assertEqual(list(years), [(2015, 2015), (2016, 2016)])
+
+    def test_does_not_change_timestamp_fields(self):
+        self.import_tweets(self.jsonl([self.row('Old', created_at='2015-03-01T10:00:00Z')]))
+        self.assertTrue(Tweet._meta.get_field('created_at').auto_now_add)
+        self.assertTrue(Tweet._meta.get_field('updated_at').auto_now)
+
+    def test_does_not_keep_timestamps_of_saved_tweets(self):
+        self.import_tweets(self.jsonl([
+            self.row('Old', created_at='2015-03-01T10:00:00Z')
+        ]))
+        created_at = datetime(2015, 1, 1, tzinfo=timezone.utc)
+        tweet = Tweet.objects.create(user=self.author, message='New', created_at=created_at)
+        self.assertEqual(tweet.created_at.year, datetime.now().year)
+
+    def test_skips_invalid_rows(self):
+        path = self.write('tweets.jsonl', '\n'.join([
+            json.dumps({'username': 'nobody', 'message': 'Unknown user'}),
+            json.dumps(self.row('')),
+            json.dumps(self.row('Bad', created_at='soon')),
+            'not json',
+            json.dumps(self.row('Valid')),
+        ]))
+        output = self.import_tweets(path)
+        self.assertEqual(list(Tweet.objects.values_list('message', flat=True)), ['Valid'])
+        self.assertIn('Imported 1 tweets, skipped 4', output)
+
+    def test_imported_tweets_are_searchable(self):
+        self.import_tweets(self.jsonl([self.row('octopus')]))
+        self.assertEqual(search_tweets('octopus').count(), 1)
+
+    def test_reports_rows_per_second(self):
+        output = self.import_tweets(self.jsonl([self.row('Hi')]))
+        self.assertRegex(output, r'Imported 1 tweets, skipped 0 in [\d.]+s \(\d+/s\)\.')
+
+    def test_needs_a_known_format(self):
+        with self.assertRaises(CommandError):
+            self.import_tweets(self.write('tweets.txt', ''))
+
+    def test_reads_format_option(self):
+        path = self.write('tweets.txt', json.dumps(self.row('Hi')))
+        self.import_tweets(path, '--format', 'jsonl')
+        self.assertEqual(Tweet.objects.count(), 1)
+
+    def test_fails_on_missing_file(self):
+        with self.assertRaises(CommandError):
+            self.import_tweets(os.path.join(self.directory.name, 'missing.jsonl'))
+
+
+class UsernameCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [UserFactory(), UserFactory(), UserFactory()]
+
+    def test_resolves_usernames_in_one_query(self):
+        usernames = [user.username for user in self.users] + ['nobody']
+        with self.assertNumQueries(1):
+            ids = UsernameCache().resolve(usernames)
+        self.assertEqual(ids, {**{user.username: user.id for user in self.users}, 'nobody': None})
+
+    def test_caches_resolved_usernames(self):
+        cache = UsernameCache()
+        cache.resolve([self.users[0].username, 'nobody'])
+        with self.assertNumQueries(0):
+            cache.resolve([self.users[0].username, 'nobody'])
+
+    def test_starts_over_when_full(self):
+        cache = UsernameCache(size=2)
+        cache.resolve([self.users[0].username, self.users[1].username])
+        ids = cache.resolve([self.users[2].username])
+        self.assertEqual(ids, {self.users[2].username: self.users[2].id})
+        self.assertEqual(len(cache._ids), 1)
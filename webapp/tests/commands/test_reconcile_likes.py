@@ -0,0 +1,49 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from webapp.likes import like_counter
+
+from webapp.models.like import Like
+from webapp.models.tweet import Tweet
+from webapp.tests.factories.tweet import TweetFactory
+from webapp.tests.factories.user import UserFactory
+
+
+class ReconcileLikesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = author = UserFactory()
+        cls.liked = TweetFactory(user=author, image=None, likes=7)
+        cls.unliked = TweetFactory(user=author, image=None, likes=2)
+        cls.correct = TweetFactory(user=author, image=None, likes=1)
+        for tweet in [cls.liked, cls.liked, cls.correct]:
+            Like.objects.create(user=UserFactory(), tweet=tweet)
+
+    def reconcile(self):
+        output = StringIO()
+        call_command('reconcile_likes', '--chunk-size', '2', stdout=output)
+        return output.getvalue()
+
+    def test_recomputes_likes_from_likes_relation(self):
+        self.reconcile()
+        likes = dict(Tweet.objects.values_list('pk', 'likes'))
+        self.assertEqual(likes, {self.liked.id: 2, self.unliked.id: 0, self.correct.id: 1})
+
+    def test_reports_checked_and_fixed_tweets(self):
+        self.assertIn('Checked 3 tweets, fixed 2.', self.reconcile())
+
+    def test_recounts_likes_received_by_authors(self):
+        self.reconcile()
+        likes = get_user_model().objects.values_list('likes_received', flat=True)
+        self.assertEqual(likes.get(pk=self.author.id), 3)
+
+    @override_settings(LIKES_FLUSH_INTERVAL=60)
+    def test_flushes_buffered_likes_first(self):
+        Like.objects.create(user=UserFactory(), tweet=self.correct)
+        with self.captureOnCommitCallbacks(execute=True):
+            like_counter().increment(self.correct.id)
+        self.assertIn('Checked 3 tweets, fixed 2.', self.reconcile())
+        self.assertEqual(Tweet.objects.get(pk=self.correct.id).likes, 2)
@@ -0,0 +1,37 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from webapp.tests.factories.tweet import TweetFactory
+from webapp.tests.factories.user import UserFactory
+
+
+class RepairProfileCountersTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = UserFactory()
+        cls.correct = UserFactory()
+        TweetFactory(user=cls.author, image=None, likes=2)
+        TweetFactory(user=cls.author, image=None, likes=3)
+        get_user_model().objects.filter(pk=cls.author.id).update(tweet_count=7, likes_received=0)
+
+    def repair(self):
+        output = StringIO()
+        call_command('repair_profile_counters', '--chunk-size', '1', stdout=output)
+        return output.getvalue()
+
+    def test_recomputes_counters_from_tweets(self):
+        self.repair()
+        counters = dict(get_user_model().objects.values_list('pk', 'tweet_count'))
+        likes = dict(get_user_model().objects.values_list('pk', 'likes_received'))
+        self.assertEqual(counters, {self.author.id: 2, self.correct.id: 0})
+        self.assertEqual(likes, {self.author.id: 5, self.correct.id: 0})
+
+    def test_reports_checked_and_fixed_users(self):
+        self.assertIn('Checked 2 users, fixed 1.', self.repair())
+
+    def test_repairs_each_chunk_in_one_query(self):
+        with self.assertNumQueries(5):
+            self.repair()
@@ -0,0 +1,53 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from webapp.models.tweet import Tweet
+from webapp.seeding import PASSWORD
+from webapp.tests.factories.user import UserFactory
+
+
+class SeedTests(TestCase):
+    def seed(self, *arguments):
+        output = StringIO()
+        call_command('seed', *arguments, '--batch-size', '4', stdout=output)
+        return output.getvalue()
+
+    def test_creates_users_and_tweets(self):
+        self.seed('--users', '5', '--tweets', '9')
+        self.assertEqual(get_user_model().objects.count(), 5)
+        self.assertEqual(Tweet.objects.count(), 9)
+
+    def test_seeded_users_can_log_in(self):
+        self.seed('--users', '1', '--tweets', '0')
+        user = get_user_model().objects.get()
+        self.assertTrue(user.check_password(PASSWORD))
+
+    def test_tweets_are_written_by_seeded_users(self):
+        existing = UserFactory()
+        self.seed('--users', '3', '--tweets', '10')
+        self.assertFalse(Tweet.objects.filter(user=existing).exists())
+        self.assertLessEqual(Tweet.objects.values('user').distinct().count(), 3)
+
+    def test_counts_seeded_tweets_on_users(self):
+        self.seed('--users', '3', '--tweets', '10')
+        counts = get_user_model().objects.values_list('tweet_count', flat=True)
+        self.assertEqual(sum(counts), 10)
+        for user in get_user_model().objects.all():
+            self.assertEqual(user.tweet_count, Tweet.objects.filter(user=user).count())
+
+    def test_can_seed_twice(self):
+        self.seed('--users', '2', '--tweets', '0')
+        self.seed('--users', '2', '--tweets', '0')
+        self.assertEqual(get_user_model().objects.count(), 4)
+
+    def test_reports_rows_per_second(self):
+        output = self.seed('--users', '2', '--tweets', '3')
+        self.assertRegex(output, r'Seeded 2 users in [\d.]+s \(\d+/s\)\.')
+        self.assertRegex(output, r'Seeded 3 tweets in [\d.]+s \(\d+/s\)\.')
+
+    def test_needs_users_for_tweets(self):
+        with self.assertRaises(CommandError):
+            self.seed('--users', '0', '--tweets', '3')
@@ -0,0 +1,26 @@
+from django.db import transaction
+from django.db.utils import IntegrityError
+from django.test import TransactionTestCase
+
+from webapp.models.like import Like
+from webapp.tests.factories.tweet import TweetFactory
+from webapp.tests.factories.user import UserFactory
+
+
+class LikeTests(TransactionTestCase):
+    def setUp(self):
+        self.user = UserFactory(username='fan')
+        self.tweet = TweetFactory(user=UserFactory(), image=None)
+
+    def test_saves_valid_like(self):
+        Like.objects.create(user=self.user, tweet=self.tweet)
+        self.assertTrue(Like.objects.filter(user=self.user, tweet=self.tweet).exists())
+
+    def test_validates_one_like_per_user_and_tweet(self):
+        Like.objects.create(user=self.user, tweet=self.tweet)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Like.objects.create(user=self.user, tweet=self.tweet)
+
+    def test_returns_user_and_tweet_when_stringified(self):
+        like = Like.objects.create(user=self.user, tweet=self.tweet)
+        self.assertEqual(str(like), f'fan likes {self.tweet.id}')
@@ -20,7 +20,12 @@ class TweetTests(TransactionTestCase):
         saved_tweet = Tweet.objects.get(pk=valid_tweet.id)
         self.assertEqual(saved_tweet.user.username, 'username')
         self.assertEqual(saved_tweet.message, 'message')
-        self.assertEqual(saved_tweet.image, 'attachments/example.jpg')
+        self.assertRegex(saved_tweet.image.name, r'^attachments/[0-9a-f]{2}/[0-9a-f]{64}\.jpg$')
+
+    def test_stores_image_dimensions(self):
+        valid_tweet = TweetFactory(user=UserFactory(), image__width=30, image__height=20)
+        saved_tweet = Tweet.objects.get(pk=valid_tweet.id)
+        self.assertEqual((saved_tweet.image_width, saved_tweet.image_height), (30, 20))
 
     def test_considers_image_optional(self):
         valid_tweet = TweetFactory(user=UserFactory(), image=None)
@@ -37,3 +42,9 @@ class TweetTests(TransactionTestCase):
         message = 'Nap all day cat dog hate mouse eat string barf pillow no baths hate everything.'
         tweet = TweetFactory(user=UserFactory(username='name'), message=message)
         self.assertEqual(str(tweet), 'name: Nap all day cat dog hate mouse eat strin...')
+
+    def test_preloads_authors(self):
+        TweetFactory(user=UserFactory(username='author'))
+        tweet = Tweet.objects.with_authors().get()
+        with self.assertNumQueries(0):
+            self.assertEqual(tweet.user.username, 'author')
@@ -3,9 +3,11 @@ from unittest import skip
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db.utils import DataError, IntegrityError
-from django.test import TransactionTestCase
+from django.test import TestCase, TransactionTestCase
 
+from webapp.models.tweet import Tweet
 from webapp.tests.cleanup import clean_uploads
+from webapp.tests.factories.tweet import TweetFactory
 from webapp.tests.factories.user import UserFactory
 
 
@@ -25,7 +27,7 @@ class UserTests(TransactionTestCase):
         self.assertEqual(saved_user.email, 'username@example.com')
         self.assertEqual(saved_user.username, 'username')
         self.assertEqual(saved_user.display_name, 'User Name')
-        self.assertEqual(saved_user.avatar, 'avatars/example.jpg')
+        self.assertRegex(saved_user.avatar.name, r'^avatars/[0-9a-f]{2}/[0-9a-f]{64}\.jpg$')
         self.assertTrue(saved_user.is_active)
         self.assertFalse(saved_user.is_admin)
         self.assertFalse(saved_user.is_staff)
@@ -71,3 +73,76 @@ class UserTests(TransactionTestCase):
     def test_returns_username_when_stringified(self):
         user = UserFactory(username='name')
         self.assertEqual(str(user), 'name')
+
+
+class UserCountersTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = UserFactory()
+
+    @classmethod
+    def tearDownClass(cls):
+        clean_uploads()
+        super().tearDownClass()
+
+    def counters(self):
+        return get_user_model().objects.values_list('tweet_count', 'likes_received').get(
+            pk=self.author.id
+        )
+
+    def test_counts_created_tweets(self):
+        TweetFactory(user=self.author, image=None)
+        TweetFactory(user=self.author, image=None, likes=3)
+        self.assertEqual(self.counters(), (2, 3))
+
+    def test_does_not_count_updated_tweets(self):
+        tweet = TweetFactory(user=self.author, image=None)
+        tweet.message = 'changed'
+        tweet.save()
+        self.assertEqual(self.counters(), (1, 0))
+
+    def test_uncounts_deleted_tweets(self):
+        tweet = TweetFactory(user=self.author, image=None)
+        Tweet.objects.add_likes({tweet.id: 2})
+        Tweet.objects.get(pk=tweet.id).delete()
+        self.assertEqual(self.counters(), (0, 0))
+
+    def test_uncounts_likes_added_after_loading_deleted_tweet(self):
+        tweet = TweetFactory(user=self.author, image=None)
+        stale = Tweet.objects.get(pk=tweet.id)
+        Tweet.objects.add_likes({tweet.id: 2})
+        stale.delete()
+        self.assertEqual(self.counters(), (0, 0))
+
+    def test_uncounts_tweets_deleted_in_bulk(self):
+        other = UserFactory()
+        TweetFactory(user=self.author, image=None, likes=2)
+        TweetFactory(user=self.author, image=None, likes=1)
+        TweetFactory(user=other, image=None, likes=4)
+        kept = TweetFactory(user=self.author, image=None, likes=5)
+        Tweet.objects.exclude(pk=kept.id).delete()
+        self.assertEqual(self.counters(), (1, 5))
+        self.assertEqual(
+            get_user_model().objects.values_list('tweet_count', 'likes_received').get(pk=other.id),
+            (0, 0)
+        )
+
+    def test_does_not_uncount_tweets_below_zero(self):
+        tweet = TweetFactory(user=self.author, image=None)
+        get_user_model().objects.filter(pk=self.author.id).update(tweet_count=0)
+        tweet.delete()
+        self.assertEqual(self.counters(), (0, 0))
+
+    def test_counts_likes_received(self):
+        first = TweetFactory(user=self.author, image=None)
+        second = TweetFactory(user=self.author, image=None)
+        other = TweetFactory(user=UserFactory(), image=None)
+        Tweet.objects.add_likes({first.id: 2, second.id: 1, other.id: 5})
+        Tweet.objects.add_likes({first.id: -1})
+        self.assertEqual(self.counters(), (2, 2))
+
+    def test_adds_tweets_in_one_query(self):
+        other = UserFactory()
+        with self.assertNumQueries(1):
+            get_user_model().objects.add_tweets({self.author.id: 2, other.id: 1})
+        self.assertEqual(self.counters(), (2, 0))
@@ -0,0 +1,23 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TemporaryMediaRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.media = tempfile.TemporaryDirectory()
+        shutil.copy(os.path.join(settings.MEDIA_ROOT, 'default_avatar.png'), self.media.name)
+        for directory in ['avatars', 'attachments']:
+            os.mkdir(os.path.join(self.media.name, directory))
+        self.media_settings = override_settings(MEDIA_ROOT=self.media.name)
+        self.media_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.media_settings.disable()
+        self.media.cleanup()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,40 @@
+import os
+import stat
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from webapp.caches import SharedFileBasedCache
+
+
+class SharedFileBasedCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.location = os.path.join(directory.name, 'auth')
+        options = {'MAX_ENTRIES': 3, 'CULL_FREQUENCY': 1}
+        self.cache = SharedFileBasedCache(self.location, {'OPTIONS': options})
+
+    def test_creates_private_directory(self):
+        self.cache.set('key', 'value')
+        self.assertEqual(stat.S_IMODE(os.stat(self.location).st_mode), 0o700)
+
+    def test_culls_at_most_once_per_interval(self):
+        with patch.object(SharedFileBasedCache, '_list_cache_files', return_value=[]) as listed:
+            for number in range(5):
+                self.cache.set(f'key{number}', number)
+        self.assertEqual(listed.call_count, 1)
+
+    def test_culls_again_after_interval(self):
+        with patch.object(SharedFileBasedCache, 'CULL_INTERVAL', 0):
+            for number in range(5):
+                self.cache.set(f'key{number}', number)
+        self.assertEqual(len(self.cache._list_cache_files()), 2)
+
+    def test_does_not_lose_concurrent_increments(self):
+        self.cache.set('count', 0)
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(lambda _: self.cache.incr('count'), range(50)))
+        self.assertEqual(self.cache.get('count'), 50)
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase
+
+from webapp import events
+from webapp.events import LikeEvents, LocalBroker, like_snapshot
+from webapp.likes import like_many, toggle_like
+from webapp.tests.factories.tweet import TweetFactory
+from webapp.tests.factories.user import UserFactory
+
+
+class LocalBrokerTests(SimpleTestCase):
+    def setUp(self):
+        self.broker = LocalBroker()
+
+    def updates(self, subscription):
+        return asyncio.run(subscription.aget(timeout=0))
+
+    def test_delivers_counts_of_subscribed_tweets_only(self):
+        subscription = self.broker.subscribe({1, 2})
+        self.broker.publish({1: 5, 3: 7})
+        self.assertEqual(self.updates(subscription), {1: 5})
+
+    def test_keeps_only_latest_count_per_tweet(self):
+        subscription = self.broker.subscribe({1})
+        self.broker.publish({1: 5})
+        self.broker.publish({1: 6})
+        self.assertEqual(self.updates(subscription), {1: 6})
+        self.assertEqual(self.updates(subscription), {})
+
+    def test_wakes_up_waiting_async_subscriber(self):
+        subscription = self.broker.subscribe({1})
+        threading.Timer(0.05, self.broker.publish, [{1: 5}]).start()
+        self.assertEqual(asyncio.run(subscription.aget(timeout=5)), {1: 5})
+
+    def test_stops_delivering_after_close(self):
+        subscription = self.broker.subscribe({1})
+        subscription.close()
+        self.broker.publish({1: 5})
+        self.assertEqual(self.updates(subscription), {})
+
+    @patch.object(LocalBroker, 'MAX_SUBSCRIBERS', 1)
+    def test_limits_number_of_subscribers(self):
+        subscription = self.broker.subscribe({1})
+        self.assertIsNone(self.broker.subscribe({1}))
+        subscription.close()
+        self.assertIsNotNone(self.broker.subscribe({1}))
+
+
+@patch.object(events, 'KEEPALIVE', 0)
+class LikeEventsTests(SimpleTestCase):
+    async def test_streams_retry_updates_and_keepalives(self):
+        broker = LocalBroker()
+        stream = LikeEvents(broker.subscribe({1}))
+        self.assertEqual(await anext(stream), f'retry: {events.RETRY}\n\n')
+        broker.publish({1: 5})
+        self.assertEqual(await anext(stream), 'data: {"1":5}\n\n')
+        self.assertEqual(await anext(stream), ': keepalive\n\n')
+        stream.close()
+        self.assertEqual(broker._active, set())
+
+    @patch.object(events, 'STREAM_DURATION', 0)
+    async def test_unsubscribes_when_stream_ends(self):
+        broker = LocalBroker()
+        [event async for event in LikeEvents(broker.subscribe({1}))]
+        self.assertEqual(broker._active, set())
+
+
+class LikeSnapshotTests(SimpleTestCase):
+    def test_tells_client_to_poll_again(self):
+        self.assertEqual(
+            like_snapshot({1: 5}), f'retry: {events.POLL_RETRY}\n\ndata: {{"1":5}}\n\n'
+        )
+
+
+class PublishLikesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.tweet = TweetFactory(user=cls.user, image=None)
+
+    def test_publishes_new_count_after_commit(self):
+        with patch('webapp.likes.publish_likes') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                toggle_like(self.user, self.tweet.id)
+        publish.assert_called_once_with({self.tweet.id: 1})
+
+    def test_publishes_batch_of_counts(self):
+        with patch('webapp.likes.publish_likes') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                like_many(self.user, {self.tweet.id: 1})
+        publish.assert_called_once_with({self.tweet.id: 1})
+
+    def test_does_not_publish_unchanged_counts(self):
+        with patch('webapp.likes.publish_likes') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                toggle_like(self.user, self.tweet.id, liked=False)
+        publish.assert_not_called()
@@ -0,0 +1,125 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from unittest.mock import patch
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from webapp.images import (
+    density_srcset, derivative_name, generate_derivatives, schedule_derivatives, width_srcset
+)
+from webapp.models.tweet import Tweet
+from webapp.tests.cleanup import clean_uploads
+from webapp.tests.factories.tweet import TweetFactory
+from webapp.tests.factories.user import UserFactory
+
+
+class GenerateDerivativesTests(TestCase):
+    def setUp(self):
+        self.tweet = TweetFactory(user=UserFactory(), image__width=800, image__height=400)
+
+    def tearDown(self):
+        clean_uploads()
+
+    def generate(self):
+        return generate_derivatives(settings.MEDIA_ROOT, self.tweet.image.name, [320, 1024])
+
+    def open(self, digest, width):
+        name = derivative_name(digest, width, 'x.jpg')
+        return Image.open(os.path.join(settings.MEDIA_ROOT, name))
+
+    def test_resizes_image_to_each_width(self):
+        digest = self.generate()
+        with self.open(digest, 320) as image:
+            self.assertEqual(image.size, (320, 160))
+
+    def test_does_not_upscale_image(self):
+        digest = self.generate()
+        with self.open(digest, 1024) as image:
+            self.assertEqual(image.size, (800, 400))
+
+    def test_keys_derivatives_by_content_hash(self):
+        self.assertEqual(self.generate(), self.generate())
+
+    def test_does_not_regenerate_existing_derivatives(self):
+        path = os.path.join(settings.MEDIA_ROOT, derivative_name(self.generate(), 320, 'x.jpg'))
+        modified = os.path.getmtime(path)
+        self.generate()
+        self.assertEqual(os.path.getmtime(path), modified)
+
+
+@override_settings(IMAGE_DERIVATIVE_WORKERS=0)
+class ScheduleDerivativesTests(TestCase):
+    def setUp(self):
+        self.tweet = TweetFactory(user=UserFactory(), image__width=800, image__height=400)
+
+    def tearDown(self):
+        clean_uploads()
+
+    def test_stores_content_hash_once_committed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            schedule_derivatives(self.tweet, 'image', 'image_hash', Tweet.IMAGE_WIDTHS)
+        self.assertEqual(len(Tweet.objects.get(pk=self.tweet.id).image_hash), 64)
+
+    def test_does_nothing_without_image(self):
+        tweet = TweetFactory(user=UserFactory(), image=None)
+        with self.captureOnCommitCallbacks() as callbacks:
+            schedule_derivatives(tweet, 'image', 'image_hash', Tweet.IMAGE_WIDTHS)
+        self.assertEqual(callbacks, [])
+
+    @override_settings(IMAGE_DERIVATIVE_WORKERS=1)
+    def test_keeps_connection_of_submitting_thread_open(self):
+        class FinishedPool:
+            def submit(self, function, *args):
+                future = Future()
+                future.set_result(function(*args))
+                return future
+
+        with patch('webapp.images._pool', FinishedPool), \
+                patch('webapp.images.connection') as connection:
+            with self.captureOnCommitCallbacks(execute=True):
+                schedule_derivatives(self.tweet, 'image', 'image_hash', Tweet.IMAGE_WIDTHS)
+        connection.close.assert_not_called()
+        self.assertEqual(len(Tweet.objects.get(pk=self.tweet.id).image_hash), 64)
+
+    @override_settings(IMAGE_DERIVATIVE_WORKERS=1)
+    def test_closes_connection_of_callback_thread(self):
+        pool = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(pool.shutdown)
+        submitted = threading.Event()
+        with patch('webapp.images._pool', lambda: pool), \
+                patch('webapp.images.connection') as connection, \
+                patch('webapp.images.generate_derivatives', lambda *job: submitted.wait()):
+            with self.captureOnCommitCallbacks(execute=True):
+                schedule_derivatives(self.tweet, 'image', 'image_hash', Tweet.IMAGE_WIDTHS)
+            submitted.set()
+            pool.shutdown(wait=True)
+        connection.close.assert_called_once_with()
+
+
+class SrcsetTests(TestCase):
+    def setUp(self):
+        self.tweet = TweetFactory(user=UserFactory(), image=None)
+        self.tweet.image.name = 'attachments/image.png'
+
+    def test_lists_smaller_derivatives_and_original_by_width(self):
+        srcset = width_srcset(self.tweet.image, 'abcdef', [320, 640, 1024], 800)
+        self.assertEqual(
+            srcset,
+            '/uploads/derivatives/ab/abcdef-320.png 320w, '
+            '/uploads/derivatives/ab/abcdef-640.png 640w, '
+            '/uploads/attachments/image.png 800w'
+        )
+
+    def test_lists_derivatives_by_pixel_density(self):
+        srcset = density_srcset(self.tweet.image, 'abcdef', [64, 128])
+        self.assertEqual(
+            srcset,
+            '/uploads/derivatives/ab/abcdef-64.png 1x, /uploads/derivatives/ab/abcdef-128.png 2x'
+        )
+
+    def test_is_empty_until_derivatives_are_generated(self):
+        self.assertEqual(width_srcset(self.tweet.image, '', [320], 800), '')
+        self.assertEqual(density_srcset(self.tweet.image, '', [64]), '')
@@ -0,0 +1,208 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import AnonymousUser
+from django.db import DatabaseError, connection, transaction
+from django.test import TestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+
+from webapp.likes import (
+    AtomicLikeCounter, CoalescingLikeCounter, like_counter, like_many, liked_ids, toggle_like
+)
+from webapp.models.like import Like
+from webapp.models.tweet import Tweet
+from webapp.tests.factories.tweet import TweetFactory
+from webapp.tests.factories.user import UserFactory
+
+
+class AtomicLikeCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tweet = TweetFactory(user=UserFactory(), image=None, likes=3)
+
+    def test_increments_likes_in_the_database(self):
+        self.assertEqual(AtomicLikeCounter().increment(self.tweet.id), 4)
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.likes, 4)
+
+    def test_does_not_touch_updated_at(self):
+        AtomicLikeCounter().increment(self.tweet.id)
+        self.assertEqual(Tweet.objects.get(pk=self.tweet.id).updated_at, self.tweet.updated_at)
+
+    def test_returns_none_for_missing_tweet(self):
+        self.assertIsNone(AtomicLikeCounter().increment(self.tweet.id + 1))
+
+    def test_increments_many_tweets_skipping_missing_ones(self):
+        likes = AtomicLikeCounter().increment_many({self.tweet.id: -1, self.tweet.id + 1: 1})
+        self.assertEqual(likes, {self.tweet.id: 2})
+
+
+class CoalescingLikeCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = UserFactory()
+        cls.tweet = TweetFactory(user=user, image=None, likes=3)
+        cls.other = TweetFactory(user=user, image=None)
+
+    def setUp(self):
+        self.counter = CoalescingLikeCounter(interval=60)
+
+    def tearDown(self):
+        self.counter.flush()
+
+    def increment(self, id, counter=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return (counter or self.counter).increment(id)
+
+    def increment_many(self, deltas):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.counter.increment_many(deltas)
+
+    def test_buffers_likes_until_flushed(self):
+        self.increment(self.tweet.id)
+        self.increment(self.tweet.id)
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.likes, 3)
+        self.assertEqual(self.counter.pending(self.tweet.id), 2)
+
+    def test_returns_likes_including_pending_ones(self):
+        self.increment(self.tweet.id)
+        self.assertEqual(self.increment(self.tweet.id), 5)
+
+    def test_flushes_all_tweets_and_their_authors_in_two_queries(self):
+        self.increment(self.tweet.id)
+        self.increment(self.tweet.id)
+        self.increment(self.other.id)
+        with self.assertNumQueries(2):
+            self.counter.flush()
+        self.assertEqual(Tweet.objects.get(pk=self.tweet.id).likes, 5)
+        self.assertEqual(Tweet.objects.get(pk=self.other.id).likes, 1)
+        self.assertEqual(self.counter.pending(self.tweet.id), 0)
+
+    def test_flushes_when_interval_has_elapsed(self):
+        self.increment(self.tweet.id, CoalescingLikeCounter(interval=0))
+        self.assertEqual(Tweet.objects.get(pk=self.tweet.id).likes, 4)
+
+    def test_returns_none_for_missing_tweet(self):
+        self.assertIsNone(self.increment(self.other.id + 1))
+
+    def test_buffers_many_tweets_skipping_missing_ones(self):
+        deltas = {self.tweet.id: 1, self.other.id: 2, self.other.id + 1: 1}
+        self.assertEqual(self.increment_many(deltas), {self.tweet.id: 4, self.other.id: 2})
+        self.assertEqual(self.counter.likes_many(deltas), {self.tweet.id: 4, self.other.id: 2})
+        self.assertEqual(self.counter.pending(self.other.id + 1), 0)
+
+    def test_drops_likes_of_rolled_back_transactions(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.counter.increment(self.tweet.id)
+                    raise DatabaseError
+            except DatabaseError:
+                pass
+        self.assertEqual(self.counter.pending(self.tweet.id), 0)
+
+    def test_keeps_likes_when_flush_fails(self):
+        self.increment(self.tweet.id)
+        with patch.object(Tweet.objects, 'add_likes', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.counter.flush()
+        self.assertEqual(self.counter.pending(self.tweet.id), 1)
+
+
+class LikeCounterTests(TestCase):
+    @override_settings(LIKES_FLUSH_INTERVAL=0)
+    def test_writes_straight_away_by_default(self):
+        self.assertIsInstance(like_counter(), AtomicLikeCounter)
+
+    @override_settings(LIKES_FLUSH_INTERVAL=1)
+    def test_coalesces_likes_if_interval_is_set(self):
+        self.assertIsInstance(like_counter(), CoalescingLikeCounter)
+        self.assertIs(like_counter(), like_counter())
+
+
+class ToggleLikeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.tweet = TweetFactory(user=UserFactory(), image=None)
+
+    def test_likes_tweet_not_liked_yet(self):
+        self.assertEqual(toggle_like(self.user, self.tweet.id), (1, True))
+        self.assertTrue(Like.objects.filter(user=self.user, tweet=self.tweet).exists())
+
+    def test_unlikes_tweet_already_liked(self):
+        toggle_like(self.user, self.tweet.id)
+        self.assertEqual(toggle_like(self.user, self.tweet.id), (0, False))
+        self.assertFalse(Like.objects.filter(user=self.user, tweet=self.tweet).exists())
+
+    def test_liking_twice_is_idempotent(self):
+        toggle_like(self.user, self.tweet.id, liked=True)
+        self.assertEqual(toggle_like(self.user, self.tweet.id, liked=True), (1, True))
+        self.assertEqual(Like.objects.count(), 1)
+
+    def test_unliking_twice_is_idempotent(self):
+        self.assertEqual(toggle_like(self.user, self.tweet.id, liked=False), (0, False))
+        self.assertEqual(Tweet.objects.get(pk=self.tweet.id).likes, 0)
+
+    def test_returns_none_for_missing_tweet(self):
+        self.assertIsNone(toggle_like(self.user, self.tweet.id + 1))
+
+
+class LikeManyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        author = UserFactory()
+        cls.liked = TweetFactory(user=author, image=None)
+        cls.unliked = TweetFactory(user=author, image=None)
+        toggle_like(cls.user, cls.liked.id)
+
+    def test_likes_and_unlikes_tweets(self):
+        results = like_many(self.user, {self.liked.id: -1, self.unliked.id: 1})
+        self.assertEqual(results, {self.liked.id: (0, False), self.unliked.id: (1, True)})
+        self.assertEqual(
+            list(Like.objects.filter(user=self.user).values_list('tweet_id', flat=True)),
+            [self.unliked.id]
+        )
+
+    def test_ignores_deltas_that_do_not_change_anything(self):
+        results = like_many(self.user, {self.liked.id: 1, self.unliked.id: 0})
+        self.assertEqual(results, {self.liked.id: (1, True), self.unliked.id: (0, False)})
+        self.assertEqual(Tweet.objects.get(pk=self.liked.id).likes, 1)
+
+    def test_skips_missing_tweets(self):
+        results = like_many(self.user, {self.unliked.id + 1: 1})
+        self.assertEqual(results, {})
+
+    def test_uses_a_constant_number_of_queries(self):
+        tweets = TweetFactory.create_batch(5, user=self.liked.user, image=None)
+        with self.assertNumQueries(10):
+            like_many(self.user, {tweet.id: 1 for tweet in tweets} | {self.liked.id: -1})
+
+    def test_does_not_count_a_retried_batch_twice(self):
+        like_many(self.user, {self.unliked.id: 1})
+        results = like_many(self.user, {self.unliked.id: 1})
+        self.assertEqual(results, {self.unliked.id: (1, True)})
+        self.assertEqual(Tweet.objects.get(pk=self.unliked.id).likes, 1)
+
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_locks_the_user_before_reading_likes(self):
+        with CaptureQueriesContext(connection) as queries:
+            like_many(self.user, {self.unliked.id: 1})
+        self.assertTrue(any('FOR UPDATE' in query['sql'] for query in queries))
+
+
+class LikedIdsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.liked = TweetFactory(user=cls.user, image=None)
+        cls.unliked = TweetFactory(user=cls.user, image=None)
+        toggle_like(cls.user, cls.liked.id)
+
+    def test_returns_ids_of_tweets_liked_by_user(self):
+        self.assertEqual(liked_ids(self.user, [self.liked, self.unliked]), {self.liked.id})
+
+    def test_does_not_query_for_anonymous_users(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(liked_ids(AnonymousUser(), [self.liked]), set())
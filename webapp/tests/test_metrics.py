@@ -0,0 +1,194 @@
+import os
+import tempfile
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from webapp.metrics import BUCKETS, Registry, exposition, registry
+from webapp.tests.factories.tweet import TweetFactory
+from webapp.tests.factories.user import UserFactory
+
+LABELS = (('view', 'tweets_index'),)
+
+
+class RegistryTests(SimpleTestCase):
+    def test_adds_up_counters(self):
+        metrics = Registry()
+        metrics.inc('django_db_queries_total', LABELS, 2)
+        metrics.inc('django_db_queries_total', LABELS, 3)
+        counters = metrics.snapshot()['counters']
+        self.assertEqual(counters, [['django_db_queries_total', [('view', 'tweets_index')], 5]])
+
+    def test_puts_observations_in_buckets(self):
+        metrics = Registry()
+        metrics.observe('django_request_duration_seconds', LABELS, 0.02)
+        metrics.observe('django_request_duration_seconds', LABELS, 20)
+        name, labels, buckets, total, count = metrics.snapshot()['histograms'][0]
+        self.assertEqual(buckets[BUCKETS.index(0.025)], 1)
+        self.assertEqual(sum(buckets), 1)
+        self.assertEqual((total, count), (20.02, 2))
+
+    def test_starts_afresh_in_forked_process(self):
+        metrics = Registry()
+        metrics.inc('django_db_queries_total', LABELS)
+        with patch('os.getpid', return_value=os.getpid() + 1):
+            metrics.inc('django_db_queries_total', LABELS)
+        self.assertEqual(metrics.snapshot()['counters'][0][2], 1)
+
+    def test_collects_metrics_of_every_process(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first, second = Registry(directory), Registry(directory)
+            first.inc('django_db_queries_total', LABELS, 2)
+            second.inc('django_db_queries_total', LABELS, 3)
+            second.flush(force=True)
+            output = exposition(first.collect())
+        self.assertIn('django_db_queries_total{view="tweets_index"} 5\n', output)
+
+    def test_only_flushes_once_per_interval(self):
+        with tempfile.TemporaryDirectory() as directory:
+            metrics = Registry(directory)
+            metrics.flush()
+            metrics.inc('django_db_queries_total', LABELS)
+            metrics.flush()
+            output = exposition(Registry(directory).collect())
+        self.assertNotIn('django_db_queries_total{', output)
+
+
+class ExpositionTests(SimpleTestCase):
+    def test_renders_cumulative_histogram(self):
+        metrics = Registry()
+        metrics.observe('django_request_duration_seconds', LABELS, 0.001)
+        metrics.observe('django_request_duration_seconds', LABELS, 0.02)
+        output = exposition([metrics.snapshot()])
+        self.assertIn('# TYPE django_request_duration_seconds histogram\n', output)
+        for bound, count in [('0.005', 1), ('0.025', 2), ('+Inf', 2)]:
+            bucket = f'{{view="tweets_index",le="{bound}"}} {count}\n'
+            self.assertIn(f'django_request_duration_seconds_bucket{bucket}', output)
+        self.assertIn('django_request_duration_seconds_count{view="tweets_index"} 2\n', output)
+
+    def test_escapes_label_values(self):
+        metrics = Registry()
+        metrics.inc('django_db_queries_total', (('view', 'a"b'),))
+        self.assertIn('{view="a\\"b"}', exposition([metrics.snapshot()]))
+
+
+class MetricsMiddlewareTests(TestCase):
+    def metric(self, line):
+        output = self.client.get(reverse('metrics')).content.decode()
+        values = [row.rsplit(' ', 1)[1] for row in output.splitlines() if row.startswith(line)]
+        return float(values[0]) if values else 0
+
+    def test_records_latency_queries_and_template_time_per_view(self):
+        TweetFactory(user=UserFactory(), image=None)
+        requests = self.metric('django_request_duration_seconds_count{view="tweets_index"}')
+        queries = self.metric('django_db_queries_total{view="tweets_index"}')
+        renders = self.metric('django_template_render_duration_seconds_count{view="tweets_index"}')
+
+        self.client.get(reverse('tweets_index'))
+
+        self.assertEqual(
+            self.metric('django_request_duration_seconds_count{view="tweets_index"}'), requests + 1
+        )
+        self.assertEqual(self.metric('django_db_queries_total{view="tweets_index"}'), queries + 1)
+        self.assertEqual(
+            self.metric('django_template_render_duration_seconds_count{view="tweets_index"}'),
+            renders + 1
+        )
+
+    def test_records_streaming_responses_once_closed(self):
+        TweetFactory(user=UserFactory(), image=None)
+        requests = self.metric('django_request_duration_seconds_count{view="api_tweets"}')
+        queries = self.metric('django_db_queries_total{view="api_tweets"}')
+
+        response = self.client.get(reverse('api_tweets'))
+        self.assertEqual(
+            self.metric('django_request_duration_seconds_count{view="api_tweets"}'), requests
+        )
+        b''.join(response.streaming_content)
+
+        self.assertEqual(
+            self.metric('django_request_duration_seconds_count{view="api_tweets"}'), requests + 1
+        )
+        self.assertGreater(self.metric('django_db_queries_total{view="api_tweets"}'), queries)
+
+    async def test_records_async_requests(self):
+        await sync_to_async(TweetFactory)(user=await sync_to_async(UserFactory)(), image=None)
+        requests = await sync_to_async(self.metric)(
+            'django_request_duration_seconds_count{view="tweets_index"}'
+        )
+        queries = await sync_to_async(self.metric)('django_db_queries_total{view="tweets_index"}')
+
+        await self.async_client.get(reverse('tweets_index'))
+
+        self.assertEqual(
+            await sync_to_async(self.metric)(
+                'django_request_duration_seconds_count{view="tweets_index"}'
+            ),
+            requests + 1
+        )
+        self.assertEqual(
+            await sync_to_async(self.metric)('django_db_queries_total{view="tweets_index"}'),
+            queries + 1
+        )
+
+    def test_records_unresolved_requests(self):
+        self.client.get('/inexistent')
+        count = self.metric('django_request_duration_seconds_count{view="<unresolved>"}')
+        self.assertGreater(count, 0)
+
+    def test_serves_prometheus_text(self):
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        self.assertIs(registry(), registry())
+
+
+class FileResponseMetricsTests(SimpleTestCase):
+    def metric(self, line):
+        output = self.client.get(reverse('metrics')).content.decode()
+        values = [row.rsplit(' ', 1)[1] for row in output.splitlines() if row.startswith(line)]
+        return float(values[0]) if values else 0
+
+    def test_leaves_files_to_the_wsgi_file_wrapper(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with open(os.path.join(directory.name, 'image.png'), 'wb') as file:
+            file.write(b'image')
+
+        files = []
+        environ = RequestFactory().get('/uploads/image.png').environ
+        environ['wsgi.file_wrapper'] = lambda file, block_size: files.append(file) or []
+        requests = self.metric('django_request_duration_seconds_count{view="media"}')
+        with override_settings(MEDIA_ROOT=directory.name):
+            WSGIHandler()(environ, lambda status, headers: None)
+
+        self.assertEqual(len(files), 1)
+        self.assertEqual(
+            self.metric('django_request_duration_seconds_count{view="media"}'), requests
+        )
+        files[0].close()
+        self.assertEqual(
+            self.metric('django_request_duration_seconds_count{view="media"}'), requests + 1
+        )
+
+
+class MetricsViewTests(TestCase):
+    def get(self, address):
+        return self.client.get(reverse('metrics'), REMOTE_ADDR=address)
+
+    def test_serves_local_addresses(self):
+        self.assertEqual(self.get('127.0.0.1').status_code, 200)
+
+    def test_refuses_other_addresses(self):
+        self.assertEqual(self.get('203.0.113.7').status_code, 403)
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.0/8'])
+    def test_serves_allowed_networks(self):
+        self.assertEqual(self.get('10.1.2.3').status_code, 200)
+        self.assertEqual(self.get('127.0.0.1').status_code, 403)
+
+    def test_serves_staff_from_anywhere(self):
+        self.client.force_login(UserFactory(is_staff=True))
+        self.assertEqual(self.get('203.0.113.7').status_code, 200)
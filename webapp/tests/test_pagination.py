@@ -0,0 +1,59 @@
+from django.core.exceptions import SuspiciousOperation
+from django.test import TestCase
+
+from webapp.models.tweet import Tweet
+from webapp.pagination import KeysetPaginator
+from webapp.tests.cleanup import clean_uploads
+from webapp.tests.factories.tweet import TweetFactory
+from webapp.tests.factories.user import UserFactory
+
+
+class KeysetPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = UserFactory()
+        cls.tweets = [
+            TweetFactory(user=user, message=str(number), image=None) for number in range(5)
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        clean_uploads()
+
+    def messages(self, page):
+        return [tweet.message for tweet in page]
+
+    def test_returns_newest_tweets_first(self):
+        page = KeysetPaginator(Tweet.objects.all(), page_size=2).page()
+        self.assertEqual(self.messages(page), ['4', '3'])
+
+    def test_returns_next_cursor_if_there_are_more_tweets(self):
+        page = KeysetPaginator(Tweet.objects.all(), page_size=2).page()
+        self.assertIsNotNone(page.next_cursor)
+
+    def test_returns_no_cursor_on_last_page(self):
+        page = KeysetPaginator(Tweet.objects.all(), page_size=5).page()
+        self.assertIsNone(page.next_cursor)
+
+    def test_continues_after_cursor(self):
+        paginator = KeysetPaginator(Tweet.objects.all(), page_size=2)
+        second = paginator.page(paginator.page().next_cursor)
+        third = paginator.page(second.next_cursor)
+        self.assertEqual(self.messages(second), ['2', '1'])
+        self.assertEqual(self.messages(third), ['0'])
+
+    def test_breaks_created_at_ties_by_id(self):
+        Tweet.objects.update(created_at=self.tweets[0].created_at)
+        paginator = KeysetPaginator(Tweet.objects.all(), page_size=3)
+        second = paginator.page(paginator.page().next_cursor)
+        self.assertEqual(self.messages(second), ['1', '0'])
+
+    def test_encodes_and_decodes_cursor(self):
+        tweet = self.tweets[0]
+        created_at, id = KeysetPaginator.decode(KeysetPaginator.encode(tweet))
+        self.assertEqual((created_at, id), (tweet.created_at, tweet.id))
+
+    def test_rejects_invalid_cursor(self):
+        with self.assertRaises(SuspiciousOperation):
+            KeysetPaginator(Tweet.objects.all()).page('invalid')
@@ -0,0 +1,57 @@
+from django.test import TestCase
+
+from webapp.models.tweet import Tweet
+from webapp.pagination import RankPaginator
+from webapp.search import search_tweets
+from webapp.tests.cleanup import clean_uploads
+from webapp.tests.factories.tweet import TweetFactory
+from webapp.tests.factories.user import UserFactory
+
+
+class SearchTweetsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.once = TweetFactory(user=cls.user, message='Django is a web framework', image=None)
+        cls.twice = TweetFactory(user=cls.user, message='Django, Django everywhere', image=None)
+        cls.other = TweetFactory(user=cls.user, message='Nothing to see here', image=None)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        clean_uploads()
+
+    def test_finds_tweets_containing_all_terms(self):
+        self.assertEqual(list(search_tweets('web django')), [self.once])
+
+    def test_orders_results_by_rank(self):
+        page = RankPaginator(search_tweets('django')).page()
+        self.assertEqual(list(page), [self.twice, self.once])
+
+    def test_returns_nothing_for_empty_query(self):
+        self.assertEqual(list(search_tweets(' "- ')), [])
+
+    def test_ignores_search_syntax_in_query(self):
+        self.assertCountEqual(search_tweets('"django*'), [self.once, self.twice])
+
+    def test_indexes_new_and_edited_tweets(self):
+        tweet = TweetFactory(user=self.user, message='Brand new tweet', image=None)
+        self.assertEqual(list(search_tweets('brand')), [tweet])
+
+        Tweet.objects.filter(pk=tweet.pk).update(message='Edited tweet')
+        self.assertEqual(list(search_tweets('brand')), [])
+        self.assertEqual(list(search_tweets('edited')), [tweet])
+
+    def test_forgets_deleted_tweets(self):
+        self.other.delete()
+        self.assertEqual(list(search_tweets('nothing')), [])
+
+    def test_pages_through_results_with_equal_rank(self):
+        tweets = [
+            TweetFactory(user=self.user, message='Paging test', image=None) for _ in range(3)
+        ]
+        paginator = RankPaginator(search_tweets('paging'), page_size=2)
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        self.assertEqual(list(first) + list(second), tweets[::-1])
+        self.assertIsNone(second.next_cursor)
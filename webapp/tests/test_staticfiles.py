@@ -0,0 +1,47 @@
+import gzip
+import os
+import tempfile
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+
+class CompressedManifestStaticFilesStorageTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        overridden = override_settings(
+            STATIC_ROOT=self.root,
+            STORAGES={
+                **settings.STORAGES,
+                'staticfiles': {
+                    'BACKEND': 'webapp.staticfiles.CompressedManifestStaticFilesStorage'
+                },
+            },
+        )
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def test_names_assets_after_their_content(self):
+        name = staticfiles_storage.stored_name('css/style.css')
+        self.assertRegex(name, r'^css/style\.[0-9a-f]{12}\.css$')
+        self.assertTrue(os.path.exists(self.path(name)))
+
+    def test_precompresses_text_assets(self):
+        name = staticfiles_storage.stored_name('js/app.js')
+        with open(self.path(name), 'rb') as original, gzip.open(self.path(f'{name}.gz')) as copy:
+            self.assertEqual(copy.read(), original.read())
+
+    def test_does_not_compress_images(self):
+        name = staticfiles_storage.stored_name('images/placeholder.png')
+        self.assertFalse(os.path.exists(self.path(f'{name}.gz')))
+
+    def test_does_not_collect_uploads(self):
+        self.assertFalse(os.path.exists(self.path('images/uploads')))
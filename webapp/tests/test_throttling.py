@@ -0,0 +1,140 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from webapp.metrics import Registry
+from webapp.tests.factories.user import UserFactory
+from webapp.throttling import CacheBuckets, LocalBuckets, client_address
+
+
+class LocalBucketsTests(SimpleTestCase):
+    def test_allows_burst_up_to_capacity(self):
+        buckets = LocalBuckets()
+        waits = [buckets.take('ip:1', 3, 0.01) for _ in range(4)]
+        self.assertEqual(waits[:3], [0, 0, 0])
+        self.assertAlmostEqual(waits[3], 100, delta=1)
+
+    def test_refills_over_time(self):
+        buckets = LocalBuckets()
+        with patch('time.monotonic', return_value=0):
+            buckets.take('ip:1', 1, 0.5)
+            self.assertTrue(buckets.take('ip:1', 1, 0.5))
+        with patch('time.monotonic', return_value=2):
+            self.assertEqual(buckets.take('ip:1', 1, 0.5), 0)
+
+    def test_keeps_keys_apart(self):
+        buckets = LocalBuckets()
+        buckets.take('ip:1', 1, 0.01)
+        self.assertEqual(buckets.take('ip:2', 1, 0.01), 0)
+
+    def test_forgets_least_recently_used_keys(self):
+        buckets = LocalBuckets()
+        buckets.MAX_KEYS = 2
+        for key in ['ip:1', 'ip:2', 'ip:1', 'ip:3']:
+            buckets.take(key, 1, 0.01)
+        self.assertEqual(list(buckets._buckets), ['ip:1', 'ip:3'])
+
+
+class CacheBucketsTests(SimpleTestCase):
+    def setUp(self):
+        caches[CacheBuckets.ALIAS].clear()
+
+    def test_shares_buckets_between_instances(self):
+        CacheBuckets().take('username:ada', 1, 0.01)
+        self.assertTrue(CacheBuckets().take('username:ada', 1, 0.01))
+
+    def test_allows_capacity_per_window(self):
+        with patch('time.time', return_value=350):
+            waits = [CacheBuckets().take('ip:1', 2, 0.01) for _ in range(3)]
+        self.assertEqual(waits, [0, 0, 50])
+        with patch('time.time', return_value=400):
+            self.assertEqual(CacheBuckets().take('ip:1', 2, 0.01), 0)
+
+    def test_does_not_lose_concurrent_attempts(self):
+        with ThreadPoolExecutor(8) as executor:
+            waits = list(executor.map(lambda _: CacheBuckets().take('ip:1', 5, 0.01), range(40)))
+        self.assertEqual(waits.count(0), 5)
+
+
+class ClientAddressTests(SimpleTestCase):
+    def address(self, **headers):
+        return client_address(RequestFactory().get('/', REMOTE_ADDR='10.0.0.1', headers=headers))
+
+    def test_uses_remote_address_by_default(self):
+        self.assertEqual(self.address(x_forwarded_for='1.2.3.4'), '10.0.0.1')
+
+    @override_settings(CLIENT_ADDRESS_HEADER='HTTP_X_FORWARDED_FOR')
+    def test_uses_address_added_by_the_proxy(self):
+        self.assertEqual(self.address(x_forwarded_for='6.6.6.6, 1.2.3.4'), '1.2.3.4')
+
+    @override_settings(CLIENT_ADDRESS_HEADER='HTTP_X_REAL_IP')
+    def test_falls_back_to_remote_address_without_the_header(self):
+        self.assertEqual(self.address(), '10.0.0.1')
+
+
+@override_settings(LOGIN_ATTEMPTS_PER_IP=3, LOGIN_ATTEMPTS_PER_USERNAME=2)
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        self.user = UserFactory(password='Very123Secure')
+        self.metrics = Registry()
+        patches = [
+            patch('webapp.throttling._backend', LocalBuckets()),
+            patch('webapp.throttling.registry', return_value=self.metrics),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def authenticate(self, username, password='wrong', address='10.0.0.1', **headers):
+        credentials = {'username': username, 'password': password}
+        return self.client.post(
+            reverse('users_authentication'), credentials, REMOTE_ADDR=address, headers=headers
+        )
+
+    def counters(self):
+        return {
+            (name, tuple(map(tuple, labels))): value
+            for name, labels, value in self.metrics.snapshot()['counters']
+        }
+
+    def test_rejects_attempts_past_username_limit(self):
+        self.authenticate(self.user.username)
+        self.authenticate(self.user.username.upper(), address='10.0.0.2')
+        response = self.authenticate(self.user.username, 'Very123Secure', address='10.0.0.3')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertContains(response, 'Too many login attempts', status_code=429)
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+    @override_settings(CLIENT_ADDRESS_HEADER='HTTP_X_REAL_IP')
+    def test_throttles_clients_behind_a_proxy_apart(self):
+        for username in ['a', 'b', 'c']:
+            self.authenticate(username, x_real_ip='1.1.1.1')
+        response = self.authenticate(self.user.username, 'Very123Secure', x_real_ip='1.1.1.2')
+        self.assertEqual(response.status_code, 302)
+
+    def test_rejects_attempts_past_address_limit(self):
+        for username in ['a', 'b', 'c']:
+            self.authenticate(username)
+        response = self.authenticate(self.user.username, 'Very123Secure')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(self.counters(), {('django_login_throttled_total', (('scope', 'ip'),)): 1})
+
+    def test_does_not_hash_rejected_attempts(self):
+        self.authenticate('a')
+        self.authenticate('a')
+        with patch('webapp.views.users.LoginUserForm.is_valid') as is_valid:
+            self.authenticate('a')
+        is_valid.assert_not_called()
+
+    def test_records_login_duration(self):
+        self.authenticate(self.user.username, 'Very123Secure')
+        self.authenticate(self.user.username, address='10.0.0.2')
+        histograms = {
+            tuple(map(tuple, labels)): count
+            for name, labels, buckets, total, count in self.metrics.snapshot()['histograms']
+        }
+        self.assertEqual(histograms, {(('result', 'success'),): 1, (('result', 'failure'),): 1})
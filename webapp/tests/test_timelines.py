@@ -0,0 +1,83 @@
+from django.test import TestCase, override_settings
+
+from webapp.models.follow import Follow
+from webapp.models.timeline_entry import TimelineEntry
+from webapp.tests.factories.tweet import TweetFactory
+from webapp.tests.factories.user import UserFactory
+from webapp.timelines import fan_out, follow, home_timeline, unfollow
+
+
+class TimelinesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = UserFactory()
+        cls.author = UserFactory()
+
+    def tweet(self, user, message):
+        tweet = TweetFactory(user=user, message=message, image=None)
+        fan_out(tweet)
+        return tweet
+
+    def messages(self, page):
+        return [tweet.message for tweet in page]
+
+    def test_follows_user_once(self):
+        self.assertTrue(follow(self.reader, self.author))
+        self.assertFalse(follow(self.reader, self.author))
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.follower_count, 1)
+
+    def test_unfollows_user(self):
+        follow(self.reader, self.author)
+        self.assertTrue(unfollow(self.reader, self.author))
+        self.assertFalse(Follow.objects.exists())
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.follower_count, 0)
+
+    def test_copies_tweets_into_followers_timelines(self):
+        follow(self.reader, self.author)
+        self.tweet(self.author, 'hello')
+        self.assertEqual(self.messages(home_timeline(self.reader)), ['hello'])
+
+    def test_copies_tweets_into_authors_own_timeline(self):
+        self.tweet(self.reader, 'mine')
+        self.assertEqual(self.messages(home_timeline(self.reader)), ['mine'])
+
+    def test_does_not_show_tweets_of_users_not_followed(self):
+        self.tweet(self.author, 'hello')
+        self.assertEqual(self.messages(home_timeline(self.reader)), [])
+
+    def test_backfills_recent_tweets_on_follow(self):
+        self.tweet(self.author, 'before')
+        follow(self.reader, self.author)
+        self.assertEqual(self.messages(home_timeline(self.reader)), ['before'])
+
+    def test_removes_tweets_on_unfollow(self):
+        follow(self.reader, self.author)
+        self.tweet(self.author, 'hello')
+        unfollow(self.reader, self.author)
+        self.assertEqual(self.messages(home_timeline(self.reader)), [])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_reads_tweets_of_heavy_accounts_instead_of_copying_them(self):
+        follow(self.reader, self.author)
+        self.author.refresh_from_db()
+        self.tweet(self.author, 'heavy')
+        self.tweet(self.reader, 'mine')
+        copied = TimelineEntry.objects.filter(owner=self.reader, tweet__user=self.author)
+        self.assertFalse(copied.exists())
+        self.assertEqual(self.messages(home_timeline(self.reader)), ['mine', 'heavy'])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_paginates_merged_timeline(self):
+        follow(self.reader, self.author)
+        self.author.refresh_from_db()
+        for message in ['1', '2', '3']:
+            self.tweet(self.author, message)
+            self.tweet(self.reader, message + 'a')
+
+        first = home_timeline(self.reader, page_size=4)
+        second = home_timeline(self.reader, first.next_cursor, page_size=4)
+        self.assertEqual(self.messages(first), ['3a', '3', '2a', '2'])
+        self.assertEqual(self.messages(second), ['1a', '1'])
+        self.assertIsNone(second.next_cursor)
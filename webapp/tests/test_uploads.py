@@ -0,0 +1,103 @@
+import hashlib
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import StopFutureHandlers
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
+
+from webapp.models.tweet import Tweet
+from webapp.tests.cleanup import clean_uploads
+from webapp.tests.factories.user import UserFactory
+from webapp.uploads import HashingMemoryFileUploadHandler, RejectedUpload
+
+
+def png(width=16, height=16):
+    output = io.BytesIO()
+    Image.new('RGB', (width, height)).save(output, 'PNG')
+    return output.getvalue()
+
+
+class HashingUploadHandlerTests(SimpleTestCase):
+    def upload(self, data, chunk_size=64):
+        handler = HashingMemoryFileUploadHandler()
+        handler.handle_raw_input(None, {}, len(data), 'boundary')
+        with self.assertRaises(StopFutureHandlers):
+            handler.new_file('image', 'image.png', 'image/png', len(data))
+        for start in range(0, len(data), chunk_size):
+            handler.receive_data_chunk(data[start:start + chunk_size], start)
+        return handler, handler.file_complete(len(data))
+
+    def test_hashes_file_while_it_streams(self):
+        data = png()
+        handler, file = self.upload(data)
+        self.assertEqual(file.content_hash, hashlib.sha256(data).hexdigest())
+        self.assertEqual(file.read(), data)
+
+    @override_settings(MAX_UPLOAD_SIZE=100)
+    def test_stops_keeping_file_past_size_limit(self):
+        handler, file = self.upload(png(64, 64) + bytes(1000))
+        self.assertIsInstance(file, RejectedUpload)
+        self.assertIn('larger than', file.rejection)
+        self.assertLessEqual(handler.file.tell(), 100)
+
+    @override_settings(MAX_UPLOAD_PIXELS=1000)
+    def test_rejects_image_over_pixel_limit_from_its_header(self):
+        handler, file = self.upload(png(100, 100))
+        self.assertIsInstance(file, RejectedUpload)
+        self.assertIn('megapixels', file.rejection)
+
+
+class UploadsTests(TestCase):
+    def tearDown(self):
+        clean_uploads()
+
+    def create_tweet(self, image, user=None):
+        self.client.force_login(user or UserFactory())
+        data = {'message': 'message', 'image': SimpleUploadedFile('image.PNG', image)}
+        return self.client.post('/tweets', data)
+
+    def test_stores_identical_images_once(self):
+        image = png()
+        self.create_tweet(image)
+        self.create_tweet(image)
+        first, second = Tweet.objects.order_by('id')
+        digest = hashlib.sha256(image).hexdigest()
+        self.assertEqual(first.image.name, f'attachments/{digest[:2]}/{digest}.png')
+        self.assertEqual(second.image.name, first.image.name)
+        directory = os.path.join(settings.MEDIA_ROOT, 'attachments', digest[:2])
+        self.assertEqual(os.listdir(directory), [f'{digest}.png'])
+
+    def test_does_not_rewrite_stored_file(self):
+        name = default_storage.save('attachments/ab/abcdef.png', ContentFile(b'first'))
+        self.assertEqual(default_storage.save(name, ContentFile(b'first')), name)
+        self.assertEqual(os.listdir(os.path.join(settings.MEDIA_ROOT, 'attachments', 'ab')), [
+            'abcdef.png'
+        ])
+
+    @override_settings(MAX_UPLOAD_SIZE=100)
+    def test_refuses_file_over_size_limit(self):
+        response = self.create_tweet(png(64, 64) + bytes(1000))
+        self.assertContains(response, 'The file is larger than 0 MB.')
+        self.assertFalse(Tweet.objects.exists())
+
+    @override_settings(MAX_UPLOAD_PIXELS=1000)
+    def test_refuses_image_over_pixel_limit(self):
+        response = self.create_tweet(png(100, 100))
+        self.assertContains(response, 'The image is larger than 0 megapixels.')
+        self.assertFalse(Tweet.objects.exists())
+
+    @override_settings(MAX_UPLOAD_PIXELS=1000)
+    def test_refuses_avatar_over_pixel_limit(self):
+        user = UserFactory()
+        self.client.force_login(user)
+        data = {
+            'email': user.email, 'display_name': 'Name',
+            'avatar': SimpleUploadedFile('avatar.png', png(100, 100)),
+        }
+        response = self.client.post(f'/users/{user.id}', data)
+        self.assertContains(response, 'megapixels')
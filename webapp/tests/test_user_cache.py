@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+
+from webapp.tests.factories.user import UserFactory
+from webapp.timelines import follow
+from webapp.user_cache import cached_user, forget_user
+
+
+class UserCacheTests(TestCase):
+    def setUp(self):
+        self.cache = caches[settings.USER_CACHE_ALIAS]
+        self.cache.clear()
+        self.user = UserFactory()
+
+    def cached(self):
+        return self.cache.get(f'user:{self.user.pk}')
+
+    def test_loads_user_once(self):
+        loads = []
+        load = lambda id: loads.append(id) or self.user  # noqa: E731
+        cached_user(self.user.pk, load)
+        self.assertEqual(cached_user(self.user.pk, load), self.user)
+        self.assertEqual(loads, [self.user.pk])
+
+    def test_does_not_cache_missing_user(self):
+        cached_user(self.user.pk, lambda id: None)
+        self.assertIsNone(self.cached())
+
+    def test_forgets_user(self):
+        cached_user(self.user.pk, lambda id: self.user)
+        forget_user(self.user.pk)
+        self.assertIsNone(self.cached())
+
+    def test_warm_request_makes_no_queries(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('users_edit'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('users_edit'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_forgets_user_on_update(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('users_edit'))
+        self.client.post(
+            reverse('users_update', kwargs={'id': self.user.id}),
+            {'email': self.user.email, 'display_name': 'Renamed'}
+        )
+        response = self.client.get(reverse('users_edit'))
+        self.assertContains(response, 'value="Renamed"')
+
+    def test_forgets_user_on_logout(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('users_edit'))
+        self.client.get(reverse('users_logout'))
+        self.assertIsNone(self.cached())
+        response = self.client.get(reverse('users_archive'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_forgets_user_on_new_follower(self):
+        cached_user(self.user.pk, lambda id: self.user)
+        follow(UserFactory(), self.user)
+        self.assertIsNone(self.cached())
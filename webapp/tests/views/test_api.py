@@ -0,0 +1,117 @@
+import json
+from unittest import skipIf
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from webapp import encoders
+from webapp.tests.cleanup import clean_uploads
+from webapp.tests.factories.tweet import TweetFactory
+from webapp.tests.factories.user import UserFactory
+from webapp.views import api
+
+
+class ApiTweetsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory(display_name='Jane')
+        cls.tweets = [
+            TweetFactory(user=cls.user, message=str(number), image=None) for number in range(3)
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        clean_uploads()
+
+    def get(self, **params):
+        response = self.client.get(reverse('api_tweets'), params)
+        return response, json.loads(b''.join(response.streaming_content))
+
+    def messages(self, data):
+        return [tweet['message'] for tweet in data['tweets']]
+
+    def test_streams_json_response(self):
+        response, data = self.get()
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+    def test_returns_newest_tweets_first(self):
+        response, data = self.get()
+        self.assertEqual(self.messages(data), ['2', '1', '0'])
+        self.assertIsNone(data['next_cursor'])
+
+    def test_serializes_tweets_with_their_author(self):
+        tweet = self.tweets[-1]
+        response, data = self.get(page_size=1)
+        self.assertEqual(data['tweets'][0], {
+            'id': tweet.id,
+            'message': '2',
+            'image': None,
+            'image_width': None,
+            'image_height': None,
+            'likes': 0,
+            'created_at': tweet.created_at.isoformat(),
+            'user': {
+                'username': self.user.username,
+                'display_name': 'Jane',
+                'avatar': self.user.avatar.url,
+            },
+        })
+
+    def test_pages_through_tweets(self):
+        response, first = self.get(page_size=2)
+        response, second = self.get(page_size=2, cursor=first['next_cursor'])
+        self.assertEqual(self.messages(first), ['2', '1'])
+        self.assertEqual(self.messages(second), ['0'])
+        self.assertIsNone(second['next_cursor'])
+
+    @patch.object(api, 'CHUNK_SIZE', 2)
+    def test_streams_pages_larger_than_a_chunk(self):
+        TweetFactory.create_batch(3, user=self.user, image=None)
+        response, data = self.get(page_size=5)
+        self.assertEqual(len(data['tweets']), 5)
+        self.assertIsNotNone(data['next_cursor'])
+
+    def test_reads_page_in_one_query(self):
+        with self.assertNumQueries(1):
+            self.get(page_size=2)
+
+    def test_rejects_invalid_page_size(self):
+        for page_size in ['0', str(api.MAX_PAGE_SIZE + 1), 'many']:
+            response = self.client.get(reverse('api_tweets'), {'page_size': page_size})
+            self.assertEqual(response.status_code, 400)
+
+    def test_rejects_invalid_cursor(self):
+        response = self.client.get(reverse('api_tweets'), {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(JSON_ENCODER='webapp.encoders.json_dumps')
+    def test_uses_configured_encoder(self):
+        with patch('webapp.encoders.json_dumps', wraps=encoders.json_dumps) as mock:
+            response, data = self.get()
+        self.assertTrue(mock.called)
+        self.assertEqual(self.messages(data), ['2', '1', '0'])
+
+
+class EncodersTests(TestCase):
+    value = {'message': 'Olá', 'likes': 1, 'next_cursor': None}
+
+    def test_encodes_compact_json_bytes(self):
+        self.assertEqual(
+            encoders.json_dumps(self.value), b'{"message":"Ol\\u00e1","likes":1,"next_cursor":null}'
+        )
+
+    @skipIf(encoders.orjson is None, 'orjson is not installed')
+    def test_orjson_encoder_produces_the_same_data(self):
+        expected = json.loads(encoders.json_dumps(self.value))
+        self.assertEqual(json.loads(encoders.orjson_dumps(self.value)), expected)
+
+    @skipIf(encoders.orjson is None, 'orjson is not installed')
+    def test_prefers_orjson_when_installed(self):
+        self.assertIs(encoders.dumps(), encoders.orjson_dumps)
+
+    @patch.object(encoders, 'orjson', None)
+    def test_falls_back_to_json_module(self):
+        self.assertIs(encoders.dumps(), encoders.json_dumps)
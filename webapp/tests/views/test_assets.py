@@ -0,0 +1,57 @@
+import gzip
+import os
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+
+
+class AssetsTests(SimpleTestCase):
+    CSS = b'body { color: black; }' * 10
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(STATIC_ROOT=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        os.mkdir(os.path.join(directory.name, 'css'))
+        for name in ['style.css', 'style.0123456789ab.css']:
+            path = os.path.join(directory.name, 'css', name)
+            with open(path, 'wb') as file:
+                file.write(self.CSS)
+            with open(f'{path}.gz', 'wb') as file:
+                file.write(gzip.compress(self.CSS))
+
+    def get(self, path, **headers):
+        response = self.client.get(f'/assets/{path}', headers=headers)
+        self.addCleanup(response.close)
+        return response
+
+    def test_caches_hashed_assets_forever(self):
+        response = self.get('css/style.0123456789ab.css')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(b''.join(response.streaming_content), self.CSS)
+
+    def test_revalidates_unhashed_assets(self):
+        response = self.get('css/style.css')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        response = self.get('css/style.css', if_modified_since=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_serves_precompressed_copy(self):
+        response = self.get('css/style.0123456789ab.css', accept_encoding='br, gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), self.CSS)
+
+    def test_skips_refused_encodings(self):
+        response = self.get('css/style.0123456789ab.css', accept_encoding='gzip;q=0')
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_returns_404_for_missing_asset(self):
+        self.assertEqual(self.get('css/missing.css').status_code, 404)
+
+    def test_refuses_paths_outside_static_root(self):
+        self.assertEqual(self.get('../settings.py').status_code, 400)
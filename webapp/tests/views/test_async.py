@@ -0,0 +1,113 @@
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase, override_settings
+from django.urls import resolve, reverse
+
+from webapp.models.like import Like
+from webapp.pagination import KeysetPaginator
+from webapp.tests.cleanup import clean_uploads
+from webapp.tests.factories.tweet import TweetFactory
+from webapp.tests.factories.user import UserFactory
+from webapp.views import async_tweets, async_users
+
+
+@override_settings(ROOT_URLCONF='webapp.async_urls')
+class AsyncViewsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory(username='async')
+        cls.older = TweetFactory(user=cls.user, message='older', image=None)
+        cls.newer = TweetFactory(user=cls.user, message='newer', image=None)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        clean_uploads()
+
+    async def login(self):
+        await sync_to_async(self.async_client.force_login)(self.user)
+
+    def test_routes_read_and_like_views_to_async_views(self):
+        self.assertEqual(resolve(reverse('tweets_index')).func, async_tweets.index)
+        self.assertEqual(resolve(reverse('tweets_show', args=[1])).func, async_tweets.show)
+        self.assertEqual(resolve(reverse('tweets_likes')).func, async_tweets.likes)
+        self.assertEqual(resolve(reverse('users_show', args=['jane'])).func, async_users.show)
+        self.assertEqual(resolve(reverse('users_login')).func.__name__, 'sign_in')
+
+    async def test_index_shows_newest_tweets_first(self):
+        with patch.object(KeysetPaginator, 'PAGE_SIZE', 1):
+            response = await self.async_client.get(reverse('tweets_index'))
+        self.assertContains(response, '<p>newer</p>', html=True)
+        self.assertNotContains(response, '<p>older</p>', html=True)
+        self.assertContains(response, 'class="pagination__next"')
+
+    async def test_index_shows_logged_in_navigation(self):
+        await self.login()
+        response = await self.async_client.get(reverse('tweets_index'))
+        self.assertContains(response, reverse('users_logout'))
+
+    async def test_index_rejects_invalid_cursor(self):
+        response = await self.async_client.get(reverse('tweets_index'), {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_show_displays_tweet(self):
+        response = await self.async_client.get(reverse('tweets_show', args=[self.newer.id]))
+        self.assertContains(response, '<p>newer</p>', html=True)
+
+    async def test_show_returns_404_for_missing_tweet(self):
+        response = await self.async_client.get(reverse('tweets_show', args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_user_show_displays_profile_and_follow_button(self):
+        await self.login()
+        other = await sync_to_async(UserFactory)()
+        response = await self.async_client.get(reverse('users_show', args=[other.username]))
+        self.assertContains(response, f'@{other.username}')
+        self.assertContains(response, 'value="Follow"')
+
+    async def test_show_returns_not_modified_for_matching_etag(self):
+        url = reverse('tweets_show', args=[self.newer.id])
+        etag = (await self.async_client.get(url))['ETag']
+        response = await self.async_client.get(url, headers={'if_none_match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_user_show_returns_not_modified_for_matching_etag(self):
+        url = reverse('users_show', args=[self.user.username])
+        etag = (await self.async_client.get(url))['ETag']
+        response = await self.async_client.get(url, headers={'if_none_match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_user_show_returns_404_for_missing_user(self):
+        response = await self.async_client.get(reverse('users_show', args=['missing']))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_likes_requires_login(self):
+        response = await self.async_client.post(
+            reverse('tweets_likes'), {'id': self.newer.id}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 302)
+
+    async def test_likes_toggles_like(self):
+        await self.login()
+        response = await self.async_client.post(
+            reverse('tweets_likes'), {'id': self.newer.id}, content_type='application/json'
+        )
+        self.assertEqual(response.json(), {'likes': 1, 'liked': True})
+        self.assertTrue(await Like.objects.filter(tweet=self.newer).aexists())
+
+    async def test_likes_rejects_invalid_data(self):
+        await self.login()
+        response = await self.async_client.post(
+            reverse('tweets_likes'), {'id': self.newer.id, 'liked': 'yes'},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    async def test_likes_applies_batch(self):
+        await self.login()
+        likes = [{'id': self.older.id, 'delta': 1}, {'id': self.newer.id, 'delta': 1}]
+        response = await self.async_client.post(
+            reverse('tweets_likes'), {'likes': likes}, content_type='application/json'
+        )
+        self.assertEqual([tweet['liked'] for tweet in response.json()['tweets']], [True, True])
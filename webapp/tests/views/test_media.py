@@ -0,0 +1,98 @@
+import os
+import tempfile
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from webapp.views.media import FileRange
+
+CONTENT = bytes(range(256)) * 4
+
+
+class MediaTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        settings = override_settings(MEDIA_ROOT=self.root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        os.mkdir(os.path.join(self.root, 'attachments'))
+        with open(os.path.join(self.root, 'attachments', 'image.png'), 'wb') as file:
+            file.write(CONTENT)
+
+    def get(self, **headers):
+        response = self.client.get('/uploads/attachments/image.png', headers=headers)
+        self.addCleanup(response.close)
+        return response
+
+    def content(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_serves_whole_file(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response['Content-Length'], str(len(CONTENT)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(self.content(response), CONTENT)
+
+    def test_answers_matching_etag_with_304(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(if_none_match=etag).status_code, 304)
+
+    def test_serves_byte_range(self):
+        response = self.get(range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(CONTENT)}')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(self.content(response), CONTENT[10:20])
+
+    def test_serves_open_and_suffix_ranges(self):
+        self.assertEqual(self.content(self.get(range='bytes=1000-')), CONTENT[1000:])
+        self.assertEqual(self.content(self.get(range='bytes=-5')), CONTENT[-5:])
+        self.assertEqual(self.content(self.get(range='bytes=1020-5000')), CONTENT[1020:])
+
+    def test_rejects_unsatisfiable_range(self):
+        response = self.get(range='bytes=5000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(CONTENT)}')
+
+    def test_ignores_range_when_file_changed(self):
+        response = self.get(range='bytes=0-9', if_range='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.content(response), CONTENT)
+
+    def test_hands_byte_range_to_wsgi_file_wrapper(self):
+        files = []
+        environ = RequestFactory().get(
+            '/uploads/attachments/image.png', headers={'range': 'bytes=10-19'}
+        ).environ
+        environ['wsgi.file_wrapper'] = lambda file, block_size: files.append(file) or []
+        WSGIHandler()(environ, lambda status, headers: None)
+
+        self.assertEqual(len(files), 1)
+        self.addCleanup(files[0].close)
+        self.assertIsInstance(files[0], FileRange)
+        self.assertEqual(files[0].read(), CONTENT[10:20])
+
+    def test_ignores_multiple_ranges(self):
+        self.assertEqual(self.get(range='bytes=0-1,5-6').status_code, 200)
+
+    def test_returns_404_for_missing_file(self):
+        response = self.client.get('/uploads/attachments/missing.png')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(MEDIA_ACCEL='x-accel-redirect')
+    def test_hands_file_to_nginx(self):
+        response = self.get()
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-uploads/attachments/image.png')
+        self.assertEqual(response.content, b'')
+
+    @override_settings(MEDIA_ACCEL='x-sendfile')
+    def test_hands_file_to_sendfile_server(self):
+        response = self.get()
+        self.assertEqual(
+            response['X-Sendfile'], os.path.join(self.root, 'attachments', 'image.png')
+        )
@@ -1,11 +1,21 @@
+from unittest.mock import patch
+
+from django.core.cache import caches
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import SimpleTestCase, TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 from django.urls import reverse
 
+from webapp import events
+from webapp.events import LocalBroker, like_broker
+from webapp.models.like import Like
+from webapp.models.timeline_entry import TimelineEntry
 from webapp.models.tweet import Tweet
+from webapp.pagination import KeysetPaginator, RankPaginator
 from webapp.tests.cleanup import clean_uploads
 from webapp.tests.factories.tweet import TweetFactory
 from webapp.tests.factories.user import UserFactory
+from webapp.timelines import fan_out, follow
+from webapp.views import tweets
 
 
 class TweetsIndexTests(TestCase):
@@ -43,6 +53,34 @@ class TweetsIndexTests(TestCase):
         self.assertContains(response, '<p>hi</p>', html=True)
         self.assertContains(response, '<p>bye</p>', html=True)
 
+    @patch.object(KeysetPaginator, 'PAGE_SIZE', 1)
+    def test_shows_newest_tweets_first_with_link_to_next_page(self):
+        response = self.client.get(reverse('tweets_index'))
+        self.assertContains(response, '<p>bye</p>', html=True)
+        self.assertNotContains(response, '<p>hi</p>', html=True)
+        self.assertContains(response, 'class="pagination__next"')
+
+    @patch.object(KeysetPaginator, 'PAGE_SIZE', 1)
+    def test_shows_next_page_of_tweets(self):
+        cursor = self.client.get(reverse('tweets_index')).context['next_cursor']
+        response = self.client.get(reverse('tweets_index'), {'cursor': cursor})
+        self.assertContains(response, '<p>hi</p>', html=True)
+        self.assertNotContains(response, '<p>bye</p>', html=True)
+
+    def test_rejects_invalid_cursor(self):
+        response = self.client.get(reverse('tweets_index'), {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, 400)
+
+    @patch('django.core.files.storage.FileSystemStorage.open', side_effect=AssertionError)
+    def test_renders_images_without_opening_files(self, mock):
+        response = self.client.get(reverse('tweets_index'))
+        self.assertContains(response, 'width="100" height="100"')
+
+    def test_renders_timeline_with_constant_number_of_queries(self):
+        TweetFactory.create_batch(5, user=UserFactory(), image=None)
+        with self.assertNumQueries(1):
+            self.client.get(reverse('tweets_index'))
+
     def test_shows_login_and_join_if_not_logged(self):
         self.logout()
         response = self.client.get(reverse('tweets_index'))
@@ -70,6 +108,137 @@ class TweetsIndexTests(TestCase):
         self.assertNotContains(response, reverse('users_logout'))
 
 
+class TweetsHomeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = UserFactory()
+        author = UserFactory()
+        follow(cls.reader, author)
+        fan_out(TweetFactory(user=author, message='followed', image=None))
+        fan_out(TweetFactory(user=UserFactory(), message='stranger', image=None))
+
+    def test_redirects_to_login_if_not_logged(self):
+        response = self.client.get(reverse('tweets_home'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_shows_tweets_of_followed_users(self):
+        self.client.force_login(self.reader)
+        response = self.client.get(reverse('tweets_home'))
+        self.assertTemplateUsed(response, 'tweets/home.html')
+        self.assertContains(response, '<p>followed</p>', html=True)
+        self.assertNotContains(response, '<p>stranger</p>', html=True)
+
+
+class TweetsSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = UserFactory()
+        TweetFactory(user=user, message='searching for django', image=None)
+        TweetFactory(user=user, message='django django', image=None)
+        TweetFactory(user=user, message='something else', image=None)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        clean_uploads()
+
+    def test_has_url_available_by_name(self):
+        response = self.client.get(reverse('tweets_search'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'tweets/search.html')
+
+    def test_shows_matching_tweets(self):
+        response = self.client.get(reverse('tweets_search'), {'q': 'django'})
+        self.assertContains(response, '<p>searching for django</p>', html=True)
+        self.assertContains(response, '<p>django django</p>', html=True)
+        self.assertNotContains(response, '<p>something else</p>', html=True)
+
+    def test_shows_message_if_nothing_matches(self):
+        response = self.client.get(reverse('tweets_search'), {'q': 'missing'})
+        self.assertContains(response, 'No tweets found.')
+
+    @patch.object(RankPaginator, 'PAGE_SIZE', 1)
+    def test_keeps_query_in_next_page_link(self):
+        response = self.client.get(reverse('tweets_search'), {'q': 'django'})
+        self.assertContains(response, '<p>django django</p>', html=True)
+        self.assertContains(response, '?q=django&amp;cursor=')
+
+    @patch.object(RankPaginator, 'PAGE_SIZE', 1)
+    def test_shows_next_page_of_results(self):
+        cursor = self.client.get(reverse('tweets_search'), {'q': 'django'}).context['next_cursor']
+        response = self.client.get(reverse('tweets_search'), {'q': 'django', 'cursor': cursor})
+        self.assertContains(response, '<p>searching for django</p>', html=True)
+        self.assertNotContains(response, '<p>django django</p>', html=True)
+
+    def test_rejects_invalid_cursor(self):
+        response = self.client.get(reverse('tweets_search'), {'q': 'django', 'cursor': 'invalid'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_searches_with_constant_number_of_queries(self):
+        with self.assertNumQueries(1):
+            self.client.get(reverse('tweets_search'), {'q': 'django'})
+
+
+@patch.object(events, 'KEEPALIVE', 0)
+class TweetsLikesStreamTests(SimpleTestCase):
+    async def stream(self, ids):
+        return await self.async_client.get(reverse('tweets_likes_stream'), {'ids': ids})
+
+    async def test_streams_like_counts_of_requested_tweets(self):
+        response = await self.stream('1,2')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+
+        content = aiter(response.streaming_content)
+        await anext(content)
+        like_broker().publish({1: 4, 3: 9})
+        self.assertEqual(await anext(content), b'data: {"1":4}\n\n')
+        response.close()
+
+    async def test_unsubscribes_when_response_is_closed(self):
+        response = await self.stream('1')
+        content = aiter(response.streaming_content)
+        await anext(content)
+        response.close()
+        like_broker().publish({1: 4})
+        self.assertEqual(like_broker()._active, set())
+
+    async def test_rejects_invalid_ids(self):
+        for ids in ['', 'one', ','.join(map(str, range(tweets.MAX_STREAM_IDS + 1)))]:
+            self.assertEqual((await self.stream(ids)).status_code, 400)
+
+    @patch.object(LocalBroker, 'MAX_SUBSCRIBERS', 0)
+    async def test_rejects_streams_over_the_limit(self):
+        response = await self.stream('1')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '60')
+
+
+class TweetsLikesPollTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tweet = TweetFactory(user=UserFactory(), image=None, likes=3)
+
+    def poll(self, ids):
+        return self.client.get(reverse('tweets_likes_stream'), {'ids': ids})
+
+    def test_sends_current_counts_and_asks_to_poll_again(self):
+        response = self.poll(f'{self.tweet.id},{self.tweet.id + 1}')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        self.assertEqual(
+            response.content.decode(),
+            f'retry: {events.POLL_RETRY}\n\ndata: {{"{self.tweet.id}":3}}\n\n'
+        )
+
+    def test_does_not_subscribe(self):
+        self.poll(str(self.tweet.id))
+        self.assertEqual(like_broker()._active, set())
+
+    def test_rejects_invalid_ids(self):
+        self.assertEqual(self.poll('one').status_code, 400)
+
+
 class TweetsNewTests(SimpleTestCase):
     def test_loads_url_successfully(self):
         response = self.client.get('/tweets/new')
@@ -122,6 +291,17 @@ class TweetsCreateTests(TestCase):
         response = self.create_tweet()
         self.assertIn('Success!', response.content.decode('utf-8'))
 
+    @override_settings(IMAGE_DERIVATIVE_WORKERS=0)
+    def test_generates_image_derivatives(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_tweet()
+        self.assertNotEqual(Tweet.objects.last().image_hash, '')
+
+    def test_adds_tweet_to_authors_home_timeline(self):
+        self.create_tweet()
+        tweet = Tweet.objects.last()
+        self.assertTrue(TimelineEntry.objects.filter(owner=tweet.user, tweet=tweet).exists())
+
     def test_does_not_create_invalid_tweet(self):
         before = len(Tweet.objects.all())
         self.create_tweet({'message': ''})
@@ -139,6 +319,7 @@ class TweetsCreateTests(TestCase):
 
 class TweetsShowTests(TestCase):
     def setUp(self):
+        caches['template_fragments'].clear()
         # fixtures = f'{os.getcwd()}/webapp/tests/fixtures'
         # shutil.copyfile(f'/{fixtures}/test_image.png', f'{fixtures}/uploads/attachments/image.png')
         # image = SimpleUploadedFile('image.png', open(f'{fixtures}/test_image.png', 'rb').read())
@@ -156,10 +337,46 @@ class TweetsShowTests(TestCase):
         response = self.client.get(reverse('tweets_show', kwargs={'id': self.valid_tweet.id}))
         self.assertContains(response, '<p>hello</p>')
 
+    def test_loads_tweet_and_author_in_one_query(self):
+        with self.assertNumQueries(1):
+            self.client.get(f'/tweets/{self.valid_tweet.id}')
+
     def test_shows_image_if_present(self):
         response = self.client.get(f'/tweets/{self.valid_tweet.id}')
         self.assertContains(response, f'<img src="{self.valid_tweet.image.url}')
 
+    def test_shows_image_srcset_once_derivatives_exist(self):
+        tweet = TweetFactory(user=UserFactory(), image__width=800, image__height=400)
+        Tweet.objects.filter(pk=tweet.id).update(image_hash='abcdef')
+        response = self.client.get(f'/tweets/{tweet.id}')
+        self.assertContains(response, 'srcset="/uploads/derivatives/ab/abcdef-320.jpg 320w')
+
+    def test_caches_rendered_tweet(self):
+        self.client.get(f'/tweets/{self.valid_tweet.id}')
+        Tweet.objects.filter(pk=self.valid_tweet.id).update(message='changed')
+        response = self.client.get(f'/tweets/{self.valid_tweet.id}')
+        self.assertContains(response, '<p>hello</p>')
+
+    def test_renders_again_when_tweet_is_updated(self):
+        self.client.get(f'/tweets/{self.valid_tweet.id}')
+        self.valid_tweet.message = 'changed'
+        self.valid_tweet.save()
+        response = self.client.get(f'/tweets/{self.valid_tweet.id}')
+        self.assertContains(response, '<p>changed</p>')
+
+    def test_renders_again_when_author_is_updated(self):
+        self.client.get(f'/tweets/{self.valid_tweet.id}')
+        self.valid_tweet.user.display_name = 'New Name'
+        self.valid_tweet.user.save()
+        response = self.client.get(f'/tweets/{self.valid_tweet.id}')
+        self.assertContains(response, 'New Name')
+
+    def test_shows_current_likes_of_cached_tweet(self):
+        self.client.get(f'/tweets/{self.valid_tweet.id}')
+        Tweet.objects.filter(pk=self.valid_tweet.id).update(likes=42)
+        response = self.client.get(f'/tweets/{self.valid_tweet.id}')
+        self.assertContains(response, '<span>42</span>')
+
     def test_does_not_show_image_if_not_present(self):
         tweet = TweetFactory(user=UserFactory(), image=None)
         response = self.client.get(f'/tweets/{tweet.id}')
@@ -174,6 +391,61 @@ class TweetsShowTests(TestCase):
         self.assertEqual(response.status_code, 404)
 
 
+class TweetsShowConditionalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tweet = TweetFactory(user=UserFactory(), message='hello', image=None)
+
+    @classmethod
+    def tearDownClass(cls):
+        clean_uploads()
+        super().tearDownClass()
+
+    def show(self, **headers):
+        url = reverse('tweets_show', kwargs={'id': self.tweet.id})
+        return self.client.get(url, headers=headers)
+
+    def test_sends_validators(self):
+        response = self.show()
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        self.assertIn('Last-Modified', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_returns_not_modified_for_matching_etag_in_one_query(self):
+        etag = self.show()['ETag']
+        with self.assertNumQueries(1):
+            response = self.show(if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_returns_not_modified_since_last_modified(self):
+        response = self.show(if_modified_since=self.show()['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_changes_etag_when_tweet_is_updated(self):
+        etag = self.show()['ETag']
+        self.tweet.message = 'changed'
+        self.tweet.save()
+        self.assertEqual(self.show(if_none_match=etag).status_code, 200)
+
+    def test_changes_etag_when_likes_change(self):
+        etag = self.show()['ETag']
+        Tweet.objects.add_likes({self.tweet.id: 1})
+        self.assertEqual(self.show(if_none_match=etag).status_code, 200)
+
+    def test_changes_etag_when_viewer_likes_tweet(self):
+        viewer = UserFactory()
+        self.client.force_login(viewer)
+        etag = self.show()['ETag']
+        Like.objects.create(user=viewer, tweet=self.tweet)
+        self.assertEqual(self.show(if_none_match=etag).status_code, 200)
+
+    def test_changes_etag_for_another_viewer(self):
+        etag = self.show()['ETag']
+        self.client.force_login(UserFactory())
+        self.assertEqual(self.show(if_none_match=etag).status_code, 200)
+
+
 class TweetsLikesTests(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -194,6 +466,9 @@ class TweetsLikesTests(TestCase):
         id = {'id': self.valid_tweet.id}
         return self.client.post('/tweets/likes', {**id, **attributes}, content_type='application/json')
 
+    def post_likes(self, likes):
+        return self.client.post('/tweets/likes', {'likes': likes}, content_type='application/json')
+
     def test_increases_likes_by_one(self):
         before = self.valid_tweet.likes
         self.update_likes()
@@ -203,9 +478,30 @@ class TweetsLikesTests(TestCase):
     def test_returns_likes_as_json(self):
         response = self.update_likes()
         self.valid_tweet.refresh_from_db()
-        self.assertJSONEqual(response.content.decode('utf-8'), {'likes': self.valid_tweet.likes})
+        expected = {'likes': self.valid_tweet.likes, 'liked': True}
+        self.assertJSONEqual(response.content.decode('utf-8'), expected)
         self.assertEqual(response.status_code, 200)
 
+    def test_unlikes_if_already_liked(self):
+        before = self.valid_tweet.likes
+        self.update_likes()
+        response = self.update_likes()
+        self.valid_tweet.refresh_from_db()
+        self.assertEqual(self.valid_tweet.likes, before)
+        self.assertFalse(response.json()['liked'])
+
+    def test_likes_only_once_per_user(self):
+        before = self.valid_tweet.likes
+        self.update_likes({'liked': True})
+        self.update_likes({'liked': True})
+        self.valid_tweet.refresh_from_db()
+        self.assertEqual(self.valid_tweet.likes, before + 1)
+
+    def test_errors_if_liked_is_not_a_boolean(self):
+        response = self.update_likes({'liked': 'yes'})
+        self.assertJSONEqual(response.content.decode('utf-8'), {'error': 'Invalid data'})
+        self.assertEqual(response.status_code, 400)
+
     def test_errors_if_tweet_id_missing(self):
         response = self.client.post('/tweets/likes', '', content_type='application/json')
         self.assertJSONEqual(response.content.decode('utf-8'), {'error': 'Invalid data'})
@@ -220,3 +516,42 @@ class TweetsLikesTests(TestCase):
         response = self.update_likes({'id': self.valid_tweet.id + 1})
         self.assertJSONEqual(response.content.decode('utf-8'), {'error': 'Tweet not found'})
         self.assertEqual(response.status_code, 404)
+
+    def test_applies_batch_of_likes(self):
+        other = TweetFactory(user=self.user, image=None)
+        self.update_likes({'liked': True})
+        likes = [
+            {'id': self.valid_tweet.id, 'delta': -1},
+            {'id': other.id, 'delta': 1},
+            {'id': other.id + 1, 'delta': 1},
+        ]
+        response = self.post_likes(likes)
+        self.assertEqual(response.json(), {'tweets': [
+            {'id': self.valid_tweet.id, 'likes': 0, 'liked': False},
+            {'id': other.id, 'likes': 1, 'liked': True},
+            {'id': other.id + 1, 'error': 'Tweet not found'},
+        ]})
+
+    def test_adds_up_deltas_for_the_same_tweet(self):
+        likes = [{'id': self.valid_tweet.id, 'delta': 1}, {'id': self.valid_tweet.id, 'delta': -1}]
+        response = self.post_likes(likes)
+        expected = [{'id': self.valid_tweet.id, 'likes': 0, 'liked': False}]
+        self.assertEqual(response.json()['tweets'], expected)
+
+    def test_errors_if_batch_is_invalid(self):
+        for likes in [[], [{'id': self.valid_tweet.id}], [{'id': '1', 'delta': 1}], 'likes']:
+            response = self.post_likes(likes)
+            self.assertEqual(response.status_code, 400)
+
+    def test_errors_if_batch_is_too_large(self):
+        likes = [{'id': self.valid_tweet.id, 'delta': 1}] * (tweets.MAX_LIKES_BATCH + 1)
+        response = self.post_likes(likes)
+        self.assertEqual(response.status_code, 400)
+
+    def test_marks_tweets_liked_by_current_user(self):
+        self.update_likes({'liked': True})
+        response = self.client.get(reverse('tweets_show', kwargs={'id': self.valid_tweet.id}))
+        self.assertContains(response, 'data-liked')
+        self.client.logout()
+        response = self.client.get(reverse('tweets_show', kwargs={'id': self.valid_tweet.id}))
+        self.assertNotContains(response, 'data-liked')
@@ -1,3 +1,8 @@
+import io
+import json
+import zipfile
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.forms.models import model_to_dict
@@ -5,6 +10,9 @@ from django.test import SimpleTestCase, TestCase
 from django.urls import reverse
 from django.utils.translation import gettext as _
 
+from webapp.models.follow import Follow
+from webapp.models.tweet import Tweet
+from webapp.pagination import KeysetPaginator
 from webapp.tests.cleanup import clean_uploads
 from webapp.tests.factories.tweet import TweetFactory
 from webapp.tests.factories.user import UserFactory
@@ -105,11 +113,34 @@ class UsersShowTests(TestCase):
     #     response = self.client.get(reverse('users_show', kwargs={'username': 'not_logged'}))
     #     self.assertNotContains(response, reverse('users_edit'))
 
+    def test_shows_profile_counters(self):
+        tweet = TweetFactory(user=self.valid_user, image=None)
+        Tweet.objects.add_likes({tweet.id: 3})
+        response = self.client.get(reverse('users_show', kwargs={'username': 'janedoe'}))
+        self.assertContains(response, '1 tweets, 3 likes')
+
     def test_shows_user_tweets_if_present(self):
         TweetFactory(user=self.valid_user, message='Hello!')
         response = self.client.get(reverse('users_show', kwargs={'username': 'janedoe'}))
         self.assertContains(response, '<p>Hello!</p>')
 
+    @patch.object(KeysetPaginator, 'PAGE_SIZE', 1)
+    def test_paginates_user_tweets(self):
+        TweetFactory(user=self.valid_user, message='First')
+        TweetFactory(user=self.valid_user, message='Second')
+        url = reverse('users_show', kwargs={'username': 'janedoe'})
+        response = self.client.get(url)
+        self.assertContains(response, '<p>Second</p>')
+        self.assertNotContains(response, '<p>First</p>')
+
+        response = self.client.get(url, {'cursor': response.context['next_cursor']})
+        self.assertContains(response, '<p>First</p>')
+
+    def test_renders_user_tweets_with_constant_number_of_queries(self):
+        TweetFactory.create_batch(5, user=self.valid_user, image=None)
+        with self.assertNumQueries(2):
+            self.client.get(reverse('users_show', kwargs={'username': 'janedoe'}))
+
     def test_shows_no_user_tweets_if_not_present(self):
         response = self.client.get(reverse('users_show', kwargs={'username': 'janedoe'}))
         self.assertNotContains(response, 'tweet-list__item')
@@ -119,6 +150,105 @@ class UsersShowTests(TestCase):
         self.assertEqual(response.status_code, 404)
 
 
+class UsersShowConditionalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.tweet = TweetFactory(user=cls.user, message='Hello', image=None)
+
+    @classmethod
+    def tearDownClass(cls):
+        clean_uploads()
+        super().tearDownClass()
+
+    def show(self, **headers):
+        url = reverse('users_show', kwargs={'username': self.user.username})
+        return self.client.get(url, headers=headers)
+
+    def test_returns_not_modified_for_matching_etag_in_one_query(self):
+        etag = self.show()['ETag']
+        with self.assertNumQueries(1):
+            response = self.show(if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_changes_etag_when_profile_is_updated(self):
+        etag = self.show()['ETag']
+        self.user.display_name = 'New Name'
+        self.user.save()
+        self.assertEqual(self.show(if_none_match=etag).status_code, 200)
+
+    def test_changes_etag_when_user_tweets(self):
+        etag = self.show()['ETag']
+        TweetFactory(user=self.user, message='Another', image=None)
+        self.assertEqual(self.show(if_none_match=etag).status_code, 200)
+
+    def test_changes_etag_when_likes_change(self):
+        etag = self.show()['ETag']
+        Tweet.objects.add_likes({self.tweet.id: 1})
+        self.assertEqual(self.show(if_none_match=etag).status_code, 200)
+
+    def test_changes_etag_when_viewer_follows_user(self):
+        viewer = UserFactory()
+        self.client.force_login(viewer)
+        etag = self.show()['ETag']
+        Follow.objects.create(follower=viewer, followee=self.user)
+        self.assertEqual(self.show(if_none_match=etag).status_code, 200)
+
+    def test_renders_pending_messages_instead_of_not_modified(self):
+        self.client.force_login(self.user)
+        etag = self.show()['ETag']
+        self.client.post(reverse('users_follows', kwargs={'username': self.user.username}))
+        self.assertEqual(self.show(if_none_match=etag).status_code, 200)
+
+
+class UsersFollowsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.follower = UserFactory()
+        cls.followee = UserFactory(username='adalovelace')
+
+    def setUp(self):
+        self.client.force_login(self.follower)
+
+    def tearDown(self):
+        self.client.logout()
+
+    def update_follow(self, data={}):
+        url = reverse('users_follows', kwargs={'username': 'adalovelace'})
+        return self.client.post(url, data)
+
+    def test_follows_user(self):
+        self.update_follow()
+        follows = Follow.objects.filter(follower=self.follower, followee=self.followee)
+        self.assertTrue(follows.exists())
+
+    def test_unfollows_user(self):
+        self.update_follow()
+        self.update_follow({'follow': 'false'})
+        self.assertFalse(Follow.objects.exists())
+
+    def test_redirects_to_profile(self):
+        response = self.update_follow()
+        self.assertRedirects(
+            response, reverse('users_show', kwargs={'username': 'adalovelace'}),
+            status_code=302, target_status_code=200, fetch_redirect_response=True
+        )
+
+    def test_shows_unfollow_button_when_following(self):
+        self.update_follow()
+        response = self.client.get(reverse('users_show', kwargs={'username': 'adalovelace'}))
+        self.assertContains(response, 'value="Unfollow"')
+
+    def test_does_not_follow_self(self):
+        self.client.force_login(self.followee)
+        self.update_follow()
+        self.assertFalse(Follow.objects.exists())
+
+    def test_only_accepts_post(self):
+        response = self.client.get(reverse('users_follows', kwargs={'username': 'adalovelace'}))
+        self.assertEqual(response.status_code, 405)
+
+
 class UsersEditTests(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -175,6 +305,20 @@ class UsersUpdateTests(TestCase):
         self.update_user({'email': 'different@example.com'})
         self.assertEqual(get_user_model().objects.get(username='lisemeitner').email, 'different@example.com')
 
+    def test_keeps_profile_counters_when_updating_a_loaded_user(self):
+        self.client.get(reverse('users_edit'))
+        TweetFactory(user=self.valid_user, image=None, likes=3)
+        TweetFactory(user=self.valid_user, image=None)
+        self.update_user({'display_name': 'Lise'})
+        user = get_user_model().objects.get(pk=self.valid_user.id)
+        self.assertEqual((user.display_name, user.tweet_count, user.likes_received), ('Lise', 2, 3))
+
+    def test_does_not_write_back_fields_of_the_cached_user(self):
+        self.client.get(reverse('users_edit'))
+        get_user_model().objects.filter(pk=self.valid_user.id).update(first_name='Lise')
+        self.update_user({'display_name': 'Lise Meitner'})
+        self.assertEqual(get_user_model().objects.get(pk=self.valid_user.id).first_name, 'Lise')
+
     def test_redirects_to_profile_on_success(self):
         response = self.update_user({'email': 'different@example.com'})
         self.assertRedirects(
@@ -307,3 +451,75 @@ class UsersLogoutTests(TestCase):
             response, '/', status_code=302, target_status_code=200,
             fetch_redirect_response=True
         )
+
+
+class UsersArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        cls.old = TweetFactory(user=cls.user, message='Old', image=None)
+        cls.new = TweetFactory(user=cls.user, message='New')
+        TweetFactory(user=UserFactory(), message='Not mine', image=None)
+
+    @classmethod
+    def tearDownClass(cls):
+        clean_uploads()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def download(self, format=None):
+        response = self.client.get(reverse('users_archive'), {'format': format} if format else {})
+        return response, b''.join(response.streaming_content)
+
+    def test_streams_a_zip_archive_by_default(self):
+        response, content = self.download()
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertEqual(
+            response['Content-Disposition'], f'attachment; filename="{self.user.username}.zip"'
+        )
+        archive = zipfile.ZipFile(io.BytesIO(content))
+        self.assertIsNone(archive.testzip())
+
+    def test_quotes_the_archive_file_name(self):
+        self.user.username = 'quote"name'
+        self.user.save()
+        self.assertEqual(
+            self.download()[0]['Content-Disposition'], 'attachment; filename="quote\\"name.zip"'
+        )
+
+    def test_zip_archive_contains_profile_tweets_and_attachments(self):
+        archive = zipfile.ZipFile(io.BytesIO(self.download()[1]))
+        profile = json.loads(archive.read('profile.json'))
+        tweets = [json.loads(line) for line in archive.read('tweets.jsonl').splitlines()]
+        self.assertEqual(profile['username'], self.user.username)
+        self.assertEqual([tweet['message'] for tweet in tweets], ['New', 'Old'])
+        self.assertEqual(tweets[0]['image'], self.new.image.name)
+        with self.new.image.open('rb') as image:
+            self.assertEqual(archive.read(self.new.image.name), image.read())
+        self.assertIn(self.user.avatar.name, archive.namelist())
+
+    def test_zip_archive_stores_a_shared_image_once(self):
+        TweetFactory(user=self.user, message='Again', image=self.new.image.name)
+        archive = zipfile.ZipFile(io.BytesIO(self.download()[1]))
+        self.assertEqual(archive.namelist().count(self.new.image.name), 1)
+        self.assertIsNone(archive.testzip())
+
+    def test_streams_a_jsonl_archive(self):
+        response, content = self.download('jsonl')
+        lines = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(lines[0]['user']['username'], self.user.username)
+        self.assertEqual([line['tweet']['message'] for line in lines[1:]], ['New', 'Old'])
+        self.assertEqual(lines[1]['tweet']['image'], self.new.image.url)
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.client.get(reverse('users_archive'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_profile_links_to_own_archive(self):
+        response = self.client.get(reverse('users_show', kwargs={'username': self.user.username}))
+        self.assertContains(response, f'href="{reverse("users_archive")}"')
@@ -0,0 +1,90 @@
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+from webapp.metrics import registry
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+class LocalBuckets:
+    MAX_KEYS = 100000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def take(self, key, capacity, rate):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens, wait = _take(tokens, updated_at, now, capacity, rate)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.MAX_KEYS:
+                del self._buckets[next(iter(self._buckets))]
+        return wait
+
+
+# Counts attempts in fixed windows of capacity / rate seconds with add and incr,
+# which the cache applies atomically, so processes never overwrite each other's
+# counts. A burst straddling two windows can get up to twice the capacity.
+class CacheBuckets:
+    ALIAS = 'auth'
+
+    def take(self, key, capacity, rate):
+        cache, now, window = caches[self.ALIAS], time.time(), capacity / rate
+        number = int(now // window)
+        key = f'login:{key}:{number}'
+        if cache.add(key, 1, math.ceil(window)):
+            count = 1
+        else:
+            try:
+                count = cache.incr(key)
+            except ValueError:
+                count = 1
+        return 0 if count <= capacity else (number + 1) * window - now
+
+
+def login_throttle():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = import_string(settings.LOGIN_THROTTLE_BACKEND)()
+        return _backend
+
+
+def client_address(request):
+    header = settings.CLIENT_ADDRESS_HEADER
+    address = request.META.get(header, '') if header else ''
+    return address.split(',')[-1].strip() or request.META.get('REMOTE_ADDR', '')
+
+
+def throttle_login(address, username):
+    window = settings.LOGIN_THROTTLE_WINDOW
+    limits = [
+        ('ip', address, settings.LOGIN_ATTEMPTS_PER_IP),
+        ('username', username.casefold()[:150], settings.LOGIN_ATTEMPTS_PER_USERNAME),
+    ]
+    for scope, value, capacity in limits:
+        wait = login_throttle().take(f'{scope}:{value}', capacity, capacity / window)
+        if wait:
+            registry().inc('django_login_throttled_total', (('scope', scope),))
+            return math.ceil(wait)
+    return 0
+
+
+def record_login(duration, succeeded):
+    labels = (('result', 'success' if succeeded else 'failure'),)
+    registry().observe('django_login_duration_seconds', labels, duration)
+
+
+def _take(tokens, updated_at, now, capacity, rate):
+    tokens = min(capacity, tokens + max(0, now - updated_at) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0
+    return tokens, (1 - tokens) / rate
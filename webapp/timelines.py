@@ -0,0 +1,85 @@
+from itertools import chain, islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+
+from webapp.models.follow import Follow
+from webapp.models.timeline_entry import TimelineEntry
+from webapp.models.tweet import Tweet
+from webapp.pagination import KeysetPaginator, Page
+from webapp.user_cache import forget_user
+
+BATCH_SIZE = 1000
+
+
+def is_heavy(user):
+    return user.follower_count > settings.TIMELINE_FANOUT_LIMIT
+
+
+def follow(follower, followee):
+    with transaction.atomic():
+        created = Follow.objects.get_or_create(follower=follower, followee=followee)[1]
+        if not created:
+            return False
+        _add_followers(followee, 1)
+
+        if not is_heavy(followee):
+            recent = Tweet.objects.filter(user=followee).order_by('-created_at', '-id')
+            _insert_entries([follower.pk], recent[:KeysetPaginator.PAGE_SIZE])
+    return True
+
+
+def unfollow(follower, followee):
+    with transaction.atomic():
+        if not Follow.objects.filter(follower=follower, followee=followee).delete()[0]:
+            return False
+        _add_followers(followee, -1)
+        TimelineEntry.objects.filter(owner=follower, tweet__user=followee).delete()
+    return True
+
+
+def fan_out(tweet):
+    owners = [tweet.user_id]
+    if not is_heavy(tweet.user):
+        followers = Follow.objects.filter(followee_id=tweet.user_id)
+        followers = followers.values_list('follower_id', flat=True).iterator(chunk_size=BATCH_SIZE)
+        owners = chain(owners, followers)
+    _insert_entries(owners, [tweet])
+
+
+def home_timeline(user, cursor=None, page_size=None):
+    page_size = page_size or KeysetPaginator.PAGE_SIZE
+    entries = TimelineEntry.objects.filter(owner=user).select_related('tweet__user')
+    pages = [KeysetPaginator(entries, page_size, id_field='tweet_id').page(cursor)]
+
+    heavy = Follow.objects.filter(
+        follower=user, followee__follower_count__gt=settings.TIMELINE_FANOUT_LIMIT
+    ).values('followee_id')
+    if heavy.exists():
+        tweets = Tweet.objects.filter(user__in=heavy).with_authors()
+        pages.append(KeysetPaginator(tweets, page_size).page(cursor))
+
+    tweets = {entry.tweet.id: entry.tweet for entry in pages[0]}
+    tweets.update({tweet.id: tweet for page in pages[1:] for tweet in page})
+    tweets = sorted(tweets.values(), key=lambda tweet: (tweet.created_at, tweet.id), reverse=True)
+    if len(tweets) <= page_size and not any(page.next_cursor for page in pages):
+        return Page(tweets, None)
+
+    tweets = tweets[:page_size]
+    return Page(tweets, KeysetPaginator.encode(tweets[-1]))
+
+
+def _add_followers(user, delta):
+    get_user_model().objects.filter(pk=user.pk).update(follower_count=F('follower_count') + delta)
+    forget_user(user.pk)
+
+
+def _insert_entries(owners, tweets):
+    entries = (
+        TimelineEntry(owner_id=owner, tweet_id=tweet.id, created_at=tweet.created_at)
+        for owner in owners for tweet in tweets
+    )
+    while batch := list(islice(entries, BATCH_SIZE)):
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
@@ -0,0 +1,142 @@
+import hashlib
+import math
+import os
+import uuid
+
+from django import forms
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+from django.utils.deconstruct import deconstructible
+from PIL import Image, ImageFile
+
+ADDRESSED_DIRECTORIES = ('attachments/', 'avatars/')
+PROBE_SIZE = 64 * 1024
+
+
+class RejectedUpload(SimpleUploadedFile):
+    def __init__(self, name, reason):
+        super().__init__(name, b'')
+        self.rejection = reason
+
+
+class _HashingMixin:
+    def new_file(self, *args, **kwargs):
+        self._digest = hashlib.sha256()
+        self._received = 0
+        self._parser = ImageFile.Parser()
+        self._rejection = None
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        if self._rejection is None:
+            self._received += len(raw_data)
+            self._rejection = _size_error(self._received) or self._probe(raw_data)
+        if self._rejection is not None:
+            return None
+        self._digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if self._rejection is not None:
+            return RejectedUpload(self.file_name, self._rejection)
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.content_hash = self._digest.hexdigest()
+        return file
+
+    def _probe(self, data):
+        if self._parser is None:
+            return None
+        try:
+            self._parser.feed(data)
+        except Image.DecompressionBombError:
+            self._parser = None
+            return _pixels_error(math.inf, 1)
+        except (OSError, SyntaxError, ValueError):
+            self._parser = None
+            return None
+        image = self._parser.image
+        if image is None and self._received < PROBE_SIZE:
+            return None
+        self._parser = None
+        return image and _pixels_error(*image.size)
+
+
+class HashingMemoryFileUploadHandler(_HashingMixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(_HashingMixin, TemporaryFileUploadHandler):
+    pass
+
+
+class UploadImageField(forms.ImageField):
+    def to_python(self, data):
+        if getattr(data, 'rejection', None):
+            raise forms.ValidationError(data.rejection, code='invalid_image')
+        if data and (error := _size_error(data.size)):
+            raise forms.ValidationError(error, code='invalid_image')
+
+        file = super().to_python(data)
+        if file is not None and (error := _pixels_error(*file.image.size)):
+            raise forms.ValidationError(error, code='invalid_image')
+        return file
+
+
+@deconstructible
+class ContentAddressed:
+    def __init__(self, directory, field_name):
+        self.directory = directory
+        self.field_name = field_name
+
+    def __call__(self, instance, filename):
+        digest = content_hash(getattr(instance, self.field_name).file)
+        extension = os.path.splitext(filename)[1].lower()
+        return f'{self.directory}/{digest[:2]}/{digest}{extension}'
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        if _addressed(name):
+            return name
+        return super().get_available_name(name, max_length)
+
+    def _save(self, name, content):
+        if not _addressed(name):
+            return super()._save(name, content)
+        if self.exists(name):
+            return name
+        temporary = super()._save(f'{name}.{uuid.uuid4().hex}.tmp', content)
+        os.replace(self.path(temporary), self.path(name))
+        return name
+
+
+def content_hash(file):
+    digest = getattr(file, 'content_hash', None)
+    if digest:
+        return digest
+
+    hash = hashlib.sha256()
+    for chunk in file.chunks():
+        hash.update(chunk)
+    file.seek(0)
+    file.content_hash = hash.hexdigest()
+    return file.content_hash
+
+
+def _addressed(name):
+    return name.startswith(ADDRESSED_DIRECTORIES) and name.count('/') == 2
+
+
+def _size_error(size):
+    if size > settings.MAX_UPLOAD_SIZE:
+        return f'The file is larger than {settings.MAX_UPLOAD_SIZE // (1024 * 1024)} MB.'
+    return None
+
+
+def _pixels_error(width, height):
+    if width * height > settings.MAX_UPLOAD_PIXELS:
+        return f'The image is larger than {settings.MAX_UPLOAD_PIXELS // 1000000} megapixels.'
+    return None
@@ -15,17 +15,23 @@ Including another URLconf
 """
 from django.conf import settings
 from django.urls import path
-from django.views.static import serve
 
+from .views import api
+from .views import assets
+from .views import media
+from .views import metrics
 from .views import tweets
 from .views import users
 
 urlpatterns = [
     path('', tweets.index, name='tweets_index'),
+    path('home', tweets.home, name='tweets_home'),
+    path('search', tweets.search, name='tweets_search'),
     path('tweets/new', tweets.new, name='tweets_new'),
     path('tweets', tweets.create, name='tweets_create'),
     path('tweets/<int:id>', tweets.show, name='tweets_show'),
     path('tweets/likes', tweets.likes, name='tweets_likes'),
+    path('tweets/likes/stream', tweets.likes_stream, name='tweets_likes_stream'),
 
     path('users/login', users.sign_in, name='users_login'),
     path('users/authentication', users.authentication, name='users_authentication'),
@@ -34,11 +40,13 @@ urlpatterns = [
     path('users/new', users.new, name='users_new'),
     path('users', users.create, name='users_create'),
     path('users/edit', users.edit, name='users_edit'),
+    path('users/archive', users.archive, name='users_archive'),
     path('users/<int:id>', users.update, name='users_update'),
     path('users/<str:username>', users.show, name='users_show'),
-]
+    path('users/<str:username>/follows', users.follows, name='users_follows'),
 
-if settings.DEBUG:
-    urlpatterns += [
-        path(f'{settings.MEDIA_URL[1:]}<path:path>', serve, {'document_root': settings.MEDIA_ROOT})
-    ]
+    path('api/tweets', api.tweets, name='api_tweets'),
+    path('metrics', metrics.index, name='metrics'),
+    path(f'{settings.STATIC_URL[1:]}<path:path>', assets.serve, name='assets'),
+    path(f'{settings.MEDIA_URL[1:]}<path:path>', media.serve, name='media'),
+]
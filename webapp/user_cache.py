@@ -0,0 +1,28 @@
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+def cached_user(id, load):
+    cache = caches[settings.USER_CACHE_ALIAS]
+    user = cache.get(_key(id))
+    if user is None:
+        user = load(id)
+        if user is not None:
+            cache.set(_key(id), user, settings.USER_CACHE_TIMEOUT)
+    return user
+
+
+def forget_user(id):
+    _delete(id)
+    transaction.on_commit(partial(_delete, id))
+
+
+def _delete(id):
+    caches[settings.USER_CACHE_ALIAS].delete(_key(id))
+
+
+def _key(id):
+    return f'user:{id}'
@@ -0,0 +1,63 @@
+from django.core.files.storage import default_storage
+from django.http import JsonResponse, StreamingHttpResponse
+
+from webapp.encoders import dumps
+from webapp.models.tweet import Tweet
+from webapp.pagination import KeysetPaginator
+
+MAX_PAGE_SIZE = 1000
+CHUNK_SIZE = 100
+FIELDS = [
+    'id', 'message', 'image', 'image_width', 'image_height', 'likes', 'created_at',
+    'user__username', 'user__display_name', 'user__avatar',
+]
+
+
+def tweets(request):
+    try:
+        page_size = int(request.GET.get('page_size', KeysetPaginator.PAGE_SIZE))
+    except ValueError:
+        page_size = 0
+    if not 0 < page_size <= MAX_PAGE_SIZE:
+        return JsonResponse({'error': 'Invalid page size'}, status=400)
+
+    paginator = KeysetPaginator(Tweet.objects.values(*FIELDS), page_size)
+    rows = paginator.query(request.GET.get('cursor')).iterator(chunk_size=CHUNK_SIZE)
+    return StreamingHttpResponse(
+        _stream(rows, page_size, dumps()), content_type='application/json'
+    )
+
+
+def _stream(rows, page_size, dumps):
+    yield b'{"tweets":['
+    chunk, separator, last, next_cursor = [], b'', None, None
+    for count, row in enumerate(rows):
+        if count == page_size:
+            next_cursor = KeysetPaginator.cursor(last['created_at'], last['id'])
+            break
+
+        chunk.append(dumps(_tweet(row)))
+        last = row
+        if len(chunk) == CHUNK_SIZE:
+            yield separator + b','.join(chunk)
+            chunk, separator = [], b','
+    if chunk:
+        yield separator + b','.join(chunk)
+    yield b'],"next_cursor":' + dumps(next_cursor) + b'}'
+
+
+def _tweet(row):
+    return {
+        'id': row['id'],
+        'message': row['message'],
+        'image': default_storage.url(row['image']) if row['image'] else None,
+        'image_width': row['image_width'],
+        'image_height': row['image_height'],
+        'likes': row['likes'],
+        'created_at': row['created_at'].isoformat(),
+        'user': {
+            'username': row['user__username'],
+            'display_name': row['user__display_name'],
+            'avatar': default_storage.url(row['user__avatar']),
+        },
+    }
@@ -0,0 +1,56 @@
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.http import FileResponse, Http404
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+ENCODINGS = {'.br': 'br', '.gz': 'gzip'}
+HASHED = re.compile(r'\.[0-9a-f]{12}\.[^/]+$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+@require_safe
+def serve(request, path):
+    fullpath = safe_join(settings.STATIC_ROOT, posixpath.normpath(path).lstrip('/'))
+    if not os.path.isfile(fullpath):
+        raise Http404
+
+    hashed = HASHED.search(path) is not None
+    last_modified = int(os.stat(fullpath).st_mtime)
+    if not hashed:
+        response = get_conditional_response(request, last_modified=last_modified)
+        if response is not None:
+            return response
+
+    content_type = mimetypes.guess_type(fullpath)[0] or 'application/octet-stream'
+    encoding, compressed = _compressed(request, fullpath)
+    response = FileResponse(open(compressed, 'rb'), content_type=content_type)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    patch_vary_headers(response, ['Accept-Encoding'])
+    response.headers['Last-Modified'] = http_date(last_modified)
+    response.headers['Cache-Control'] = IMMUTABLE if hashed else 'no-cache'
+    return response
+
+
+def _compressed(request, fullpath):
+    accepted = _accepted_encodings(request.headers.get('Accept-Encoding', ''))
+    for suffix, encoding in ENCODINGS.items():
+        if encoding in accepted and os.path.isfile(fullpath + suffix):
+            return encoding, fullpath + suffix
+    return None, fullpath
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for item in header.split(','):
+        coding, *parameters = [part.strip() for part in item.split(';')]
+        if not any(re.fullmatch(r'q=0(\.0*)?', parameter) for parameter in parameters):
+            accepted.add(coding.lower())
+    return accepted
@@ -0,0 +1,50 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404
+from django.shortcuts import render
+
+from webapp.conditional import add_validators, not_modified, tweet_validators
+from webapp.likes import aliked_ids, liked_by
+from webapp.models.tweet import Tweet
+from webapp.pagination import KeysetPaginator
+from webapp.presenters.tweet_presenter import TweetPresenter
+from webapp.views.async_users import current_user
+from webapp.views.tweets import likes_response
+
+
+async def index(request):
+    user = await current_user(request)
+    tweets = Tweet.objects.all().with_authors()
+    page = await KeysetPaginator(tweets).apage(request.GET.get('cursor'))
+    context = {
+        'tweets': map(TweetPresenter, page),
+        'next_cursor': page.next_cursor,
+        'liked_ids': await aliked_ids(user, page),
+    }
+    return render(request, 'tweets/index.html', context)
+
+
+async def show(request, id):
+    user = await current_user(request)
+    try:
+        tweet = await Tweet.objects.with_authors().annotate(liked=liked_by(user)).aget(pk=id)
+    except Tweet.DoesNotExist:
+        raise Http404
+    validators = tweet_validators(request, tweet)
+    if response := await sync_to_async(not_modified)(request, validators):
+        return response
+
+    liked = {tweet.id} if tweet.liked else set()
+    context = {'presenter': TweetPresenter(tweet), 'liked_ids': liked}
+    return add_validators(render(request, 'tweets/show.html', context), validators)
+
+
+async def likes(request):
+    user = await current_user(request)
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+
+    data = json.loads(request.body or '{}')
+    return await sync_to_async(likes_response)(user, data)
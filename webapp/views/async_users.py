@@ -0,0 +1,44 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.http import Http404
+from django.shortcuts import render
+
+from webapp.conditional import add_validators, not_modified, profile_validators, profiles
+from webapp.images import density_srcset
+from webapp.likes import aliked_ids
+from webapp.models.tweet import Tweet
+from webapp.pagination import KeysetPaginator
+from webapp.presenters.tweet_presenter import TweetPresenter
+
+
+async def current_user(request):
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
+
+
+async def show(request, username):
+    viewer = await current_user(request)
+    cursor = request.GET.get('cursor')
+    try:
+        user = await profiles(viewer, cursor).aget(username=username)
+    except get_user_model().DoesNotExist:
+        raise Http404
+
+    validators = profile_validators(request, user)
+    if response := await sync_to_async(not_modified)(request, validators):
+        return response
+
+    tweets = Tweet.objects.filter(user=user).with_authors()
+    page = await KeysetPaginator(tweets).apage(cursor)
+    can_follow = viewer.is_authenticated and viewer != user
+    is_following = can_follow and user.is_following
+    context = {
+        'user': user,
+        'avatar_srcset': density_srcset(user.avatar, user.avatar_hash, user.AVATAR_WIDTHS),
+        'can_follow': can_follow,
+        'is_following': is_following,
+        'tweets': map(TweetPresenter, page),
+        'next_cursor': page.next_cursor,
+        'liked_ids': await aliked_ids(viewer, page),
+    }
+    return add_validators(render(request, 'users/show.html', context), validators)
@@ -0,0 +1,109 @@
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+RANGE = re.compile(r'bytes=(\d*)-(\d*)')
+
+
+class FileRange:
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.name = file.name
+        self._file = file
+        self._remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def close(self):
+        self._file.close()
+
+
+@require_safe
+def serve(request, path):
+    path = posixpath.normpath(path).lstrip('/')
+    fullpath = safe_join(settings.MEDIA_ROOT, path)
+    try:
+        stat = os.stat(fullpath)
+    except OSError:
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = _accelerated(path, fullpath) or _file(request, fullpath, stat.st_size, etag)
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def _accelerated(path, fullpath):
+    if settings.MEDIA_ACCEL is None:
+        return None
+    response = HttpResponse(content_type=_content_type(fullpath))
+    if settings.MEDIA_ACCEL == 'x-accel-redirect':
+        response.headers['X-Accel-Redirect'] = quote(settings.MEDIA_ACCEL_PREFIX + path)
+    else:
+        response.headers['X-Sendfile'] = fullpath
+    return response
+
+
+def _file(request, fullpath, size, etag):
+    start, end = 0, size - 1
+    requested = _range(request, size, etag)
+    if requested is not None:
+        start, end = requested
+        if start >= size:
+            response = HttpResponse(status=416)
+            response.headers['Content-Range'] = f'bytes */{size}'
+            return response
+
+    length = max(0, end - start + 1)
+    response = FileResponse(
+        FileRange(open(fullpath, 'rb'), start, length), content_type=_content_type(fullpath)
+    )
+    response.headers['Content-Length'] = length
+    response.headers['Accept-Ranges'] = 'bytes'
+    if requested is not None:
+        response.status_code = 206
+        response.headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
+
+
+def _range(request, size, etag):
+    match = RANGE.fullmatch(request.headers.get('Range', '').strip())
+    if_range = request.headers.get('If-Range')
+    if match is None or not any(match.groups()):
+        return None
+    if if_range is not None and if_range != etag:
+        return None
+
+    first, last = match.groups()
+    if not first:
+        return max(0, size - int(last)), size - 1
+    if last and int(last) < int(first):
+        return None
+    return int(first), min(int(last), size - 1) if last else size - 1
+
+
+def _content_type(fullpath):
+    return mimetypes.guess_type(fullpath)[0] or 'application/octet-stream'
@@ -0,0 +1,26 @@
+import ipaddress
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from webapp.metrics import exposition, registry
+
+
+def index(request):
+    if not _allowed(request):
+        return HttpResponseForbidden()
+    body = exposition(registry().collect())
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def _allowed(request):
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        address = None
+    if address is not None and any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in settings.METRICS_ALLOWED_IPS
+    ):
+        return True
+    return request.user.is_staff
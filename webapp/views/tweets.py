@@ -2,17 +2,57 @@ import json
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseRedirect, JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseRedirect, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, render
 from django.urls import reverse
 
+from webapp.conditional import add_validators, not_modified, tweet_validators
+from webapp.events import LikeEvents, like_broker, like_snapshot
 from webapp.forms.tweet_forms import CreateTweetForm
+from webapp.images import schedule_derivatives
+from webapp.likes import like_counter, like_many, liked_by, liked_ids, toggle_like
 from webapp.models.tweet import Tweet
+from webapp.pagination import KeysetPaginator, RankPaginator
 from webapp.presenters.tweet_presenter import TweetPresenter
+from webapp.search import search_tweets
+from webapp.timelines import fan_out, home_timeline
+
+MAX_LIKES_BATCH = 100
+MAX_STREAM_IDS = 100
 
 
 def index(request):
-    return render(request, 'tweets/index.html', {'tweets': map(TweetPresenter, Tweet.objects.all())})
+    page = KeysetPaginator(Tweet.objects.all().with_authors()).page(request.GET.get('cursor'))
+    context = {
+        'tweets': map(TweetPresenter, page),
+        'next_cursor': page.next_cursor,
+        'liked_ids': liked_ids(request.user, page),
+    }
+    return render(request, 'tweets/index.html', context)
+
+
+@login_required
+def home(request):
+    page = home_timeline(request.user, request.GET.get('cursor'))
+    context = {
+        'tweets': map(TweetPresenter, page),
+        'next_cursor': page.next_cursor,
+        'liked_ids': liked_ids(request.user, page),
+    }
+    return render(request, 'tweets/home.html', context)
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page = RankPaginator(search_tweets(query)).page(request.GET.get('cursor'))
+    context = {
+        'query': query,
+        'tweets': map(TweetPresenter, page),
+        'next_cursor': page.next_cursor,
+        'liked_ids': liked_ids(request.user, page),
+    }
+    return render(request, 'tweets/search.html', context)
 
 
 def new(request):
@@ -29,6 +69,8 @@ def create(request):
     tweet = form.save(commit=False)
     tweet.user = request.user
     tweet.save()
+    fan_out(tweet)
+    schedule_derivatives(tweet, 'image', 'image_hash', Tweet.IMAGE_WIDTHS)
 
     url = reverse('tweets_show', kwargs={'id': tweet.id})
     messages.success(request, f'Success! <a href="{url}">See your tweet</a>.')
@@ -36,20 +78,89 @@ def create(request):
 
 
 def show(request, id):
-    tweet = get_object_or_404(Tweet, pk=id)
-    return render(request, 'tweets/show.html', {'presenter': TweetPresenter(tweet)})
+    tweets = Tweet.objects.with_authors().annotate(liked=liked_by(request.user))
+    tweet = get_object_or_404(tweets, pk=id)
+    validators = tweet_validators(request, tweet)
+    if response := not_modified(request, validators):
+        return response
+
+    liked = {tweet.id} if tweet.liked else set()
+    context = {'presenter': TweetPresenter(tweet), 'liked_ids': liked}
+    return add_validators(render(request, 'tweets/show.html', context), validators)
 
 
 @login_required
 def likes(request):
-    id = json.loads(request.body or '{}').get('id', None) or None
-    if id is None:
+    return likes_response(request.user, json.loads(request.body or '{}'))
+
+
+def likes_response(user, data):
+    if 'likes' in data:
+        return _batch_likes_response(user, data['likes'])
+
+    id = data.get('id', None) or None
+    liked = data.get('liked', None)
+    if id is None or liked not in (None, True, False):
         return JsonResponse({'error': 'Invalid data'}, status=400)
 
-    tweet = Tweet.objects.filter(pk=int(id)).first()
-    if tweet is None:
+    result = toggle_like(user, int(id), liked)
+    if result is None:
         return JsonResponse({'error': 'Tweet not found'}, status=404)
 
-    tweet.likes += 1
-    tweet.save()
-    return JsonResponse({'likes': tweet.likes})
+    likes, liked = result
+    return JsonResponse({'likes': likes, 'liked': liked})
+
+
+def likes_stream(request):
+    try:
+        ids = {int(id) for id in request.GET.get('ids', '').split(',') if id}
+    except ValueError:
+        ids = set()
+    if not 0 < len(ids) <= MAX_STREAM_IDS:
+        return HttpResponse('Invalid ids', status=400)
+
+    # A stream would hold a WSGI worker for its whole duration, so WSGI clients
+    # get the current counts and reconnect to poll again after POLL_RETRY.
+    if not isinstance(request, ASGIRequest):
+        likes = like_counter().likes_many(ids)
+        response = HttpResponse(like_snapshot(likes), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+    subscription = like_broker().subscribe(ids)
+    if subscription is None:
+        return HttpResponse('Too many streams', status=503, headers={'Retry-After': '60'})
+
+    response = StreamingHttpResponse(LikeEvents(subscription), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _batch_likes_response(user, entries):
+    deltas = _like_deltas(entries)
+    if deltas is None:
+        return JsonResponse({'error': 'Invalid data'}, status=400)
+
+    results = like_many(user, deltas)
+    tweets = [
+        {'id': id, 'likes': results[id][0], 'liked': results[id][1]} if id in results
+        else {'id': id, 'error': 'Tweet not found'}
+        for id in deltas
+    ]
+    return JsonResponse({'tweets': tweets})
+
+
+def _like_deltas(entries):
+    if not isinstance(entries, list) or not 0 < len(entries) <= MAX_LIKES_BATCH:
+        return None
+
+    deltas = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            return None
+        id, delta = entry.get('id'), entry.get('delta')
+        if type(id) is not int or type(delta) is not int:
+            return None
+        deltas[id] = deltas.get(id, 0) + delta
+    return deltas
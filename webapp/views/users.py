@@ -1,14 +1,26 @@
-from django.contrib.auth import authenticate, get_user_model, login, logout
+import time
+
+from django.contrib.auth import get_user_model, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import HttpResponseRedirect
+from django.http import HttpResponseRedirect, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, render
+from django.views.decorators.http import require_POST
 from django.urls import reverse
+from django.utils.http import content_disposition_header
 from django.utils.translation import gettext as _
 
+from webapp.archives import FORMATS, stream_archive
+from webapp.conditional import add_validators, not_modified, profile_validators, profiles
 from webapp.forms.user_forms import CreateUserForm, LoginUserForm, UpdateUserForm
+from webapp.images import density_srcset, schedule_derivatives
+from webapp.likes import liked_ids
 from webapp.models.tweet import Tweet
+from webapp.pagination import KeysetPaginator
 from webapp.presenters.tweet_presenter import TweetPresenter
+from webapp.throttling import client_address, record_login, throttle_login
+from webapp.timelines import follow, unfollow
+from webapp.user_cache import forget_user
 
 
 def new(request):
@@ -21,15 +33,60 @@ def create(request):
     if not form.is_valid():
         return render(request, 'users/new.html', {'form': form, 'action': reverse('users_create')})
 
-    form.save(commit=True)
+    user = form.save(commit=True)
+    schedule_derivatives(user, 'avatar', 'avatar_hash', user.AVATAR_WIDTHS)
     messages.success(request, _('join_success_message'))
     return HttpResponseRedirect(reverse('users_login'))
 
 
 def show(request, username):
+    cursor = request.GET.get('cursor')
+    user = get_object_or_404(profiles(request.user, cursor), username=username)
+    validators = profile_validators(request, user)
+    if response := not_modified(request, validators):
+        return response
+
+    tweets = Tweet.objects.filter(user=user).with_authors()
+    page = KeysetPaginator(tweets).page(cursor)
+    can_follow = request.user.is_authenticated and request.user != user
+    is_following = can_follow and user.is_following
+    context = {
+        'user': user,
+        'avatar_srcset': density_srcset(user.avatar, user.avatar_hash, user.AVATAR_WIDTHS),
+        'can_follow': can_follow,
+        'is_following': is_following,
+        'tweets': map(TweetPresenter, page),
+        'next_cursor': page.next_cursor,
+        'liked_ids': liked_ids(request.user, page),
+    }
+    return add_validators(render(request, 'users/show.html', context), validators)
+
+
+@login_required
+@require_POST
+def follows(request, username):
     user = get_object_or_404(get_user_model(), username=username)
-    tweets = Tweet.objects.filter(user=user)
-    return render(request, 'users/show.html', {'user': user, 'tweets': map(TweetPresenter, tweets)})
+    if user == request.user:
+        messages.error(request, 'You can not follow yourself.')
+    elif request.POST.get('follow') == 'false':
+        unfollow(request.user, user)
+    else:
+        follow(request.user, user)
+    return HttpResponseRedirect(reverse('users_show', kwargs={'username': username}))
+
+
+@login_required
+def archive(request):
+    format = request.GET.get('format', 'zip')
+    if format not in FORMATS:
+        format = 'zip'
+    response = StreamingHttpResponse(
+        stream_archive(request.user, format), content_type=FORMATS[format]
+    )
+    response['Content-Disposition'] = content_disposition_header(
+        True, f'{request.user.username}.{format}'
+    )
+    return response
 
 
 def edit(request):
@@ -44,14 +101,18 @@ def update(request, id):
         messages.error(request, 'Current user can not update this user')
         return HttpResponseRedirect(reverse('users_edit'))
 
-    form = UpdateUserForm(instance=request.user, data=request.POST, files=request.FILES)
+    # request.user may come from the user cache; edit a fresh copy of the row.
+    user = get_user_model().objects.get(pk=request.user.pk)
+    form = UpdateUserForm(instance=user, data=request.POST, files=request.FILES)
     if not form.is_valid():
         action = reverse('users_update', kwargs={'id': request.user.id})
         return render(request, 'users/edit.html', {'form': form, 'action': action})
 
     form.save(commit=True)
+    if 'avatar' in form.changed_data:
+        schedule_derivatives(user, 'avatar', 'avatar_hash', user.AVATAR_WIDTHS)
     messages.success(request, 'Details were updated.')
-    return HttpResponseRedirect(reverse('users_show', kwargs={'username': request.user.username}))
+    return HttpResponseRedirect(reverse('users_show', kwargs={'username': user.username}))
 
 
 def sign_in(request):
@@ -60,21 +121,26 @@ def sign_in(request):
 
 
 def authentication(request):
-    form = LoginUserForm(data=request.POST)
-    if not form.is_valid():
-        return render(request, 'users/login.html', {'form': form})
-
-    username = form.cleaned_data['username']
-    password = form.cleaned_data['password']
-    user = authenticate(username=username, password=password)
-    if user is None or not user.is_active:
-        messages.error(request, 'Incorrect login credentials.')
+    form = LoginUserForm(request, data=request.POST)
+    username = str(request.POST.get('username', ''))
+    wait = throttle_login(client_address(request), username)
+    if wait:
+        messages.error(request, 'Too many login attempts, please try again later.')
+        response = render(request, 'users/login.html', {'form': LoginUserForm()}, status=429)
+        response['Retry-After'] = str(wait)
+        return response
+
+    start = time.perf_counter()
+    valid = form.is_valid()
+    record_login(time.perf_counter() - start, valid)
+    if not valid:
         return render(request, 'users/login.html', {'form': form})
 
-    login(request, user)
+    login(request, form.get_user())
     return HttpResponseRedirect('/')
 
 
 def sign_out(request):
+    forget_user(request.user.pk)
     logout(request)
     return HttpResponseRedirect('/')